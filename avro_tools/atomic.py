@@ -0,0 +1,57 @@
+import os
+import uuid
+
+
+def temp_path(path: str) -> str:
+    """
+    Returns a unique hidden temporary path next to a file, on the same filesystem so that it can be renamed over it.
+    :param path: Path of the file.
+    :return: Temporary path.
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex[:12]}.tmp")
+
+
+def fsync_directory(path: str) -> None:
+    """
+    Flushes the entries of a directory (e.g. renamed files) to disk. Not supported on every platform, where it is a
+    no-op.
+    :param path: Path of the directory.
+    :return: None.
+    """
+    try:
+        fd = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, data: bytes, fsync: bool = False) -> None:
+    """
+    Writes a file atomically: the data is written to a temporary file which then replaces the file, so readers never
+    see a partially written file, even if the process is interrupted.
+    :param path: Path of the file.
+    :param data: Content of the file.
+    :param fsync: Flag to flush the data to disk before the file is replaced. The directory entry is not flushed
+    (see `fsync_directory`).
+    :return: None.
+    """
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, 'xb') as fh:
+            fh.write(data)
+            if fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -50,14 +50,16 @@ class AvroLogicalType(AvroType):
 
     def __init__(self, **props):
         self._props = props
-
-    def obj(self) -> dict:
-        return {
+        self._obj = {
             "type": self._PRIMITIVE_TYPE,
             **self._props,
             "logicalType": self._NAME
         }
 
+    def obj(self) -> dict:
+        # The dictionary is precomputed, but copied: it is shared by every field using an interned type.
+        return dict(self._obj)
+
 
 class AvroDate(AvroLogicalType):
     _NAME = "date"
@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+
+from avro_tools.fingerprint import content_fingerprint
+from avro_tools.manifest import SchemaManifest
+from avro_tools.validation import AvroValidator
+
+PRIMITIVES = ('null', 'boolean', 'int', 'long', 'float', 'double', 'bytes', 'string')
+
+# Writer type -> reader types it can be promoted to, as defined by the schema resolution rules of the Avro specification
+PROMOTIONS = {
+    'int': ('long', 'float', 'double'),
+    'long': ('float', 'double'),
+    'float': ('double',),
+    'string': ('bytes',),
+    'bytes': ('string',)
+}
+
+
+def _type_name(schema) -> str:
+    if isinstance(schema, dict):
+        return _type_name(schema['type']) if isinstance(schema['type'], (dict, list)) else schema['type']
+    return 'union' if isinstance(schema, list) else schema
+
+
+def _full_name(schema: dict) -> str:
+    name = schema.get('name', '')
+    return name if '.' in name or not schema.get('namespace') else f"{schema['namespace']}.{name}"
+
+
+def _names_match(reader: dict, writer: dict) -> bool:
+    # Named types resolve if their unqualified names match, or the writer is one of the aliases of the reader.
+    writer_name = writer.get('name', '')
+    return (reader.get('name', '').rpartition('.')[2] == writer_name.rpartition('.')[2]
+            or _full_name(writer) in reader.get('aliases', ()) or writer_name in reader.get('aliases', ()))
+
+
+def readable(reader, writer) -> bool:
+    """
+    Checks if data written with a schema can be read with another, following the schema resolution rules of the Avro
+    specification (type promotions, unions, names of named types, record fields with defaults, enum symbols). Decimals
+    only match if their precision and scale match; other logical types are resolved by their underlying type.
+    :param reader: Reader schema, as parsed JSON.
+    :param writer: Writer schema, as parsed JSON.
+    :return: True if the schemas are compatible in that direction.
+    """
+    if isinstance(writer, list):
+        return all(readable(reader, branch) for branch in writer)
+    if isinstance(reader, list):
+        return any(readable(branch, writer) for branch in reader)
+
+    reader_type, writer_type = _type_name(reader), _type_name(writer)
+    if reader_type != writer_type:
+        return reader_type in PROMOTIONS.get(writer_type, ())
+
+    if reader_type in PRIMITIVES:
+        reader_logical = reader.get('logicalType') if isinstance(reader, dict) else None
+        writer_logical = writer.get('logicalType') if isinstance(writer, dict) else None
+        if reader_logical == writer_logical == 'decimal':
+            return all(reader.get(key, 0) == writer.get(key, 0) for key in ('precision', 'scale'))
+        return True
+    if not isinstance(reader, dict) or not isinstance(writer, dict):
+        # References to named types
+        return reader == writer
+    if reader_type == 'array':
+        return readable(reader['items'], writer['items'])
+    if reader_type == 'map':
+        return readable(reader['values'], writer['values'])
+    if reader_type in ('fixed', 'enum', 'record', 'error') and not _names_match(reader, writer):
+        return False
+    if reader_type == 'fixed':
+        return reader['size'] == writer['size']
+    if reader_type == 'enum':
+        return 'default' in reader or set(writer['symbols']) <= set(reader['symbols'])
+    if reader_type in ('record', 'error'):
+        writer_fields = {field['name']: field for field in writer['fields']}
+        for field in reader['fields']:
+            writer_field = writer_fields.get(field['name'])
+            if writer_field is None:
+                if 'default' not in field:
+                    return False
+            elif not readable(field['type'], writer_field['type']):
+                return False
+        return True
+    return True
+
+
+def diff(previous: dict, current: dict) -> dict:
+    """
+    Compares two versions of a record schema field by field.
+    :param previous: Previous AVRO schema.
+    :param current: Current AVRO schema.
+    :return: Dictionary with the added, removed and type-changed fields, and flags indicating if the current schema is
+    BACKWARD (it can read data written with the previous one) and FORWARD (data written with it can be read with the
+    previous one) compatible.
+    """
+    previous_fields = {field['name']: field for field in previous.get('fields', [])}
+    current_fields = {field['name']: field for field in current.get('fields', [])}
+    added = [
+        {"name": name, "type": field['type'], "default": 'default' in field}
+        for name, field in current_fields.items() if name not in previous_fields
+    ]
+    removed = [
+        {"name": name, "type": field['type'], "default": 'default' in field}
+        for name, field in previous_fields.items() if name not in current_fields
+    ]
+    changed = []
+    for name, field in current_fields.items():
+        previous_field = previous_fields.get(name)
+        if previous_field is not None and previous_field['type'] != field['type']:
+            changed.append({
+                "name": name,
+                "from": previous_field['type'],
+                "to": field['type'],
+                "backward": readable(field['type'], previous_field['type']),
+                "forward": readable(previous_field['type'], field['type'])
+            })
+    return {
+        "backward": readable(current, previous),
+        "forward": readable(previous, current),
+        "added_fields": added,
+        "removed_fields": removed,
+        "changed_fields": changed
+    }
+
+
+class CompatibilityChecker:
+    """
+    Checks regenerated schemas against the schema files of the previous run in an output folder, before they are
+    overwritten. Schemas whose content did not change are recognised by their fingerprint, from the manifest of the
+    folder (see SchemaManifest) when the file is untouched, so only the changed schemas are read and diffed.
+    A schema is compared with the previous file of the same name or, if there is none (e.g. the namespace or the output
+    format changed), with the previous schema of the same Avro full name or else of the same unqualified name.
+    The result is a machine-readable report (see `report`).
+    """
+    AVRO_EXT = AvroValidator.AVRO_EXT
+
+    def __init__(self, output_path: str):
+        self._output_path = output_path
+        self._manifest = SchemaManifest.load(output_path)
+        self._previous_files = set()
+        for folder, _, files in os.walk(output_path):
+            relative = os.path.relpath(folder, output_path).replace(os.sep, '/')
+            self._previous_files.update(
+                file_name if relative == '.' else f"{relative}/{file_name}"
+                for file_name in files if os.path.splitext(file_name)[1] == self.AVRO_EXT)
+        # Unmatched previous files by Avro full name and by unqualified name, read when a schema has no previous file
+        # of the same name
+        self._names = None
+        self._short_names = None
+        self._file_names = {}
+        self._checked = set()
+        self._unchanged = 0
+        self._results = []
+
+    def _build_name_index(self) -> None:
+        self._names = {}
+        self._short_names = {}
+        for file_name in sorted(self._previous_files - self._checked):
+            try:
+                with open(os.path.join(self._output_path, file_name), 'rb') as fh:
+                    previous = json.loads(fh.read())
+            except (OSError, ValueError):
+                continue
+            if not isinstance(previous, dict) or not previous.get('name'):
+                continue
+            full_name = _full_name(previous)
+            if full_name in self._names:
+                continue
+            self._names[full_name] = file_name
+            self._short_names.setdefault(full_name.rpartition('.')[2], set()).add(file_name)
+            self._file_names[file_name] = full_name
+
+    def _claim(self, previous_file: str) -> None:
+        """Marks a previous file as matched, removing it from the name index."""
+        self._checked.add(previous_file)
+        full_name = self._file_names.pop(previous_file, None)
+        if full_name is not None:
+            del self._names[full_name]
+            short_name = full_name.rpartition('.')[2]
+            self._short_names[short_name].discard(previous_file)
+            if not self._short_names[short_name]:
+                del self._short_names[short_name]
+
+    def _previous_file(self, avro_schema: dict, file_name: str) -> str | None:
+        if file_name in self._previous_files:
+            return file_name
+        if self._names is None:
+            self._build_name_index()
+        full_name = _full_name(avro_schema)
+        previous_file = self._names.get(full_name)
+        if previous_file is not None:
+            return previous_file
+        matches = self._short_names.get(full_name.rpartition('.')[2], ())
+        return next(iter(matches)) if len(matches) == 1 else None
+
+    def _is_unchanged(self, file_name: str, digest: str) -> bool:
+        entry = self._manifest.entry(file_name)
+        if entry is None or entry['digest'] != digest:
+            return False
+        try:
+            stat = os.stat(os.path.join(self._output_path, file_name))
+        except OSError:
+            return False
+        return (entry['size'], entry['mtime_ns']) == (stat.st_size, stat.st_mtime_ns)
+
+    def check(self, avro_schema: dict, file_name: str) -> dict | None:
+        """
+        Compares a schema with its previous version.
+        :param avro_schema: Regenerated AVRO schema.
+        :param file_name: Name of its output file, relative to the output folder.
+        :return: Result of the comparison, or None if the schema did not change.
+        """
+        previous_file = self._previous_file(avro_schema, file_name)
+        self._checked.add(file_name)
+        if previous_file is None:
+            result = {"name": _full_name(avro_schema), "file": file_name, "status": "added",
+                      "backward": True, "forward": True}
+        elif self._is_unchanged(previous_file, content_fingerprint(avro_schema)):
+            self._claim(previous_file)
+            self._unchanged += 1
+            return None
+        else:
+            self._claim(previous_file)
+            with open(os.path.join(self._output_path, previous_file), 'rb') as fh:
+                content = fh.read()
+            success, e = AvroValidator.validate_schema_definition(content)
+            if not success:
+                result = {"name": _full_name(avro_schema), "file": file_name, "status": "invalid", "error": str(e),
+                          "backward": False, "forward": False}
+            else:
+                previous = json.loads(content)
+                if content_fingerprint(previous) == content_fingerprint(avro_schema):
+                    self._unchanged += 1
+                    return None
+                result = {"name": _full_name(avro_schema), "file": file_name, "status": "changed",
+                          **diff(previous, avro_schema)}
+            if previous_file != file_name:
+                result['previous_file'] = previous_file
+        self._results.append(result)
+        return result
+
+    def report(self, produced: set[str] | None = None) -> dict:
+        """
+        Returns the report of the checked schemas.
+        :param produced: Names of the files of every table, including those that were not checked; the other previous
+        files are reported as removed. If None, no file is reported as removed.
+        :return: Dictionary with a summary and the list of added, removed, changed and invalid schemas.
+        """
+        results = list(self._results)
+        if produced is not None:
+            results += [{"name": None, "file": file_name, "status": "removed", "backward": True, "forward": True}
+                        for file_name in sorted(self._previous_files - self._checked - produced)]
+        summary = {"unchanged": self._unchanged}
+        for status in ('added', 'removed', 'changed', 'invalid'):
+            summary[status] = sum(result['status'] == status for result in results)
+        summary['backward_incompatible'] = sum(not result['backward'] for result in results)
+        summary['forward_incompatible'] = sum(not result['forward'] for result in results)
+        return {"summary": summary, "schemas": sorted(results, key=lambda result: result['file'])}
+
+
+if __name__ == '__main__':
+
+    def parse_args() -> argparse.Namespace:
+        """
+        Parse input arguments.
+        :return: Namespace class object containing parsed arguments.
+        """
+        parser = argparse.ArgumentParser(prog="avro-compatibility-checker",
+                                         description="Compare AVRO schema definition files with a previous version.")
+        parser.add_argument('--previous', dest='previous', type=str, required=True,
+                            help="Folder with the previous AVRO schema definitions.")
+        parser.add_argument('--current', dest='current', type=str, required=True,
+                            help="Folder with the current AVRO schema definitions, with the same file names.")
+        parser.add_argument('-o', '--output', dest='output', type=str, default=None,
+                            help="Path of the JSON report. If not specified, the report is printed.")
+        return parser.parse_args()
+
+    args = parse_args()
+    checker = CompatibilityChecker(args.previous)
+    for folder, _, files in os.walk(args.current):
+        for name in sorted(files):
+            if os.path.splitext(name)[1] == CompatibilityChecker.AVRO_EXT:
+                path = os.path.join(folder, name)
+                with open(path, 'r') as fh:
+                    checker.check(json.load(fh), os.path.relpath(path, args.current).replace(os.sep, '/'))
+    compat_report = json.dumps(checker.report(set()), indent=2)
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(compat_report)
+    else:
+        print(compat_report)
@@ -0,0 +1,111 @@
+import hashlib
+import json
+
+PRIMITIVES = frozenset(('null', 'boolean', 'int', 'long', 'float', 'double', 'bytes', 'string'))
+NAMED = frozenset(('record', 'error', 'enum', 'fixed'))
+
+# CRC-64-AVRO (Rabin) fingerprint of the empty string, which is also the polynomial of the lookup table
+EMPTY = 0xc15d213aa4d7a795
+
+
+def _crc64_table() -> tuple[int, ...]:
+    table = []
+    for i in range(256):
+        fp = i
+        for _ in range(8):
+            fp = (fp >> 1) ^ (EMPTY & -(fp & 1))
+        table.append(fp)
+    return tuple(table)
+
+
+_TABLE = _crc64_table()
+
+
+def crc64_avro(data: bytes) -> int:
+    """
+    Computes the CRC-64-AVRO (Rabin) fingerprint defined by the Avro specification.
+    :param data: Bytes to fingerprint.
+    :return: 64 bit fingerprint.
+    """
+    fp = EMPTY
+    table = _TABLE
+    for byte in data:
+        fp = (fp >> 8) ^ table[(fp ^ byte) & 0xff]
+    return fp
+
+
+def _string(value: str) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _fullname(name: str, namespace: str | None) -> str:
+    return name if '.' in name or not namespace else f"{namespace}.{name}"
+
+
+def _canonical(schema, namespace: str | None) -> str:
+    if isinstance(schema, str):
+        return _string(schema if schema in PRIMITIVES else _fullname(schema, namespace))
+    if isinstance(schema, list):
+        return '[' + ','.join(_canonical(branch, namespace) for branch in schema) + ']'
+
+    typ = schema['type']
+    if not isinstance(typ, str):
+        return _canonical(typ, namespace)
+    if typ in PRIMITIVES:
+        # Logical type attributes are stripped, leaving the bare primitive.
+        return _string(typ)
+
+    parts = []
+    if typ in NAMED:
+        name = _fullname(schema['name'], schema.get('namespace', namespace))
+        namespace = name.rpartition('.')[0] or None
+        parts.append('"name":' + _string(name))
+    elif typ not in ('array', 'map'):
+        # Reference to a named type
+        return _string(_fullname(typ, namespace))
+    parts.append('"type":' + _string(typ))
+
+    if typ in ('record', 'error'):
+        fields = ','.join('{"name":' + _string(field['name']) + ',"type":' + _canonical(field['type'], namespace) + '}'
+                          for field in schema['fields'])
+        parts.append('"fields":[' + fields + ']')
+    elif typ == 'enum':
+        parts.append('"symbols":[' + ','.join(_string(symbol) for symbol in schema['symbols']) + ']')
+    elif typ == 'array':
+        parts.append('"items":' + _canonical(schema['items'], namespace))
+    elif typ == 'map':
+        parts.append('"values":' + _canonical(schema['values'], namespace))
+    elif typ == 'fixed':
+        parts.append('"size":' + str(int(schema['size'])))
+    return '{' + ','.join(parts) + '}'
+
+
+def parsing_canonical_form(avro_schema: dict | list | str) -> str:
+    """
+    Returns the Parsing Canonical Form of an AVRO schema, as defined by the Avro specification: full names, only the
+    attributes relevant to parsing (name, type, fields, symbols, items, values, size) in that order, and no whitespace.
+    Two schemas with the same canonical form read and write the same binary data.
+    :param avro_schema: AVRO schema as parsed JSON.
+    :return: Canonical form.
+    """
+    return _canonical(avro_schema, None)
+
+
+def schema_fingerprint(avro_schema: dict | list | str) -> int:
+    """
+    Computes the CRC-64-AVRO fingerprint of the Parsing Canonical Form of an AVRO schema.
+    :param avro_schema: AVRO schema as parsed JSON.
+    :return: 64 bit fingerprint.
+    """
+    return crc64_avro(parsing_canonical_form(avro_schema).encode('utf-8'))
+
+
+def content_fingerprint(avro_schema: dict) -> str:
+    """
+    Computes a fingerprint of the whole content of an AVRO schema, independent of key order and JSON formatting.
+    Unlike the canonical form, it covers logical types, defaults and documentation.
+    :param avro_schema: AVRO schema as a dictionary.
+    :return: Hexadecimal digest.
+    """
+    canonical = json.dumps(avro_schema, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
@@ -1,6 +1,15 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from avro_tools.field import AvroField
 from configuration import Configuration
 from connectors.generic_connector import GenericConnector
 
+if TYPE_CHECKING:
+    from connectors.async_connector import AsyncConnector
+
 
 class AvroGenerator:
     """
@@ -19,10 +28,76 @@ class AvroGenerator:
         :param config: Configuration properties.
         :return: Dictionary with AVRO schema.
         """
-        self._dict = {
+        self._dict = self._compose(self._connector.get_columns(table, config), avro_schema_name, config)
+        return self._dict
+
+    def iter_schemas(self, tables: Iterable[tuple[str, str]], config: Configuration, workers: int = 1,
+                     prefetch: int | None = None,
+                     on_error: Callable[[tuple[str, str], Exception], None] | None = None
+                     ) -> Iterator[tuple[tuple[str, str], dict]]:
+        """
+        Generates the AVRO schemas of several tables lazily, in the order of the tables. The columns of the next tables
+        are read by `workers` threads while the current schema is consumed, and at most `prefetch` schemas are pending
+        at any time, so memory use does not depend on the number of tables. The tables are consumed as the schemas are
+        requested, so they can be a generator (e.g. `connector.get_tables`). The schema name is the table name.
+        The connector must support concurrent calls when using more than one worker.
+        :param tables: Iterable of tuples containing DB schema and table name.
+        :param config: Configuration properties.
+        :param workers: Number of threads reading columns from the connector.
+        :param prefetch: Maximum number of schemas generated ahead of the consumer; defaults to twice the workers.
+        :param on_error: Function called with the table and the exception when a schema cannot be generated, after
+        which the table is skipped; if None, the exception is raised.
+        :return: Iterator of tuples - the table and its AVRO schema.
+        """
+        def generate(table: tuple[str, str]) -> dict:
+            return self._compose(self._connector.get_columns(table, config), table[1], config)
+
+        tables = iter(tables)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='generator')
+        try:
+            window = deque((t, executor.submit(generate, t)) for t in islice(tables, max(prefetch or 2 * workers, 1)))
+            while window:
+                table, future = window.popleft()
+                for t in islice(tables, 1):
+                    window.append((t, executor.submit(generate, t)))
+                try:
+                    avro_schema = future.result()
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    on_error(table, e)
+                    continue
+                yield table, avro_schema
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _compose(fields: list[AvroField], avro_schema_name: str, config: Configuration) -> dict:
+        return {
             "type": "record",
             "name": avro_schema_name,
             "namespace": config.avro_namespace,
-            "fields": [column.to_dict() for column in self._connector.get_columns(table, config)]
+            "fields": [column.to_dict() for column in fields]
         }
+
+
+class AsyncAvroGenerator(AvroGenerator):
+    """
+    Abstracts the generation of an AVRO schema as a dictionary, reading the table columns through an AsyncConnector.
+    """
+
+    def __init__(self, connector: 'AsyncConnector'):
+        super().__init__(connector.connector)
+        self._async_connector = connector
+
+    async def get_schema_async(self, table: tuple[str, str], avro_schema_name: str, config: Configuration) -> dict:
+        """
+        Generates AVRO schema for specified table without blocking the event loop.
+        :param table: Tuple containing DB schema and table name.
+        :param avro_schema_name: Name of AVRO schema.
+        :param config: Configuration properties.
+        :return: Dictionary with AVRO schema.
+        """
+        fields = await self._async_connector.get_columns(table, config)
+        self._dict = self._compose(fields, avro_schema_name, config)
         return self._dict
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+from typing import Callable
+
+from avro_tools.atomic import atomic_write
+from avro_tools.fingerprint import content_fingerprint, schema_fingerprint
+from configuration import Configuration
+
+
+class SchemaManifest:
+    """
+    Record of the schema files in an output folder, keyed by file name. Each entry holds the (server, database, schema)
+    the file was generated from, the CRC-64-AVRO fingerprint of the Parsing Canonical Form of the schema, a digest of
+    its whole content, and the size and modification time of the file when it was written.
+    Files are only rewritten when the content of their schema changes, so that unchanged files keep their modification
+    time. Files whose size or modification time no longer match their entry are read back and compared by content.
+    """
+    FILE_NAME = '.avro_manifest.json'
+    _VERSION = 1
+
+    def __init__(self, output_path: str, entries: dict[str, dict] | None = None):
+        self._output_path = output_path
+        self._entries = entries or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, output_path: str) -> 'SchemaManifest':
+        """
+        Reads the manifest of an output folder. A missing or unreadable manifest results in an empty one.
+        :param output_path: Location of the output files.
+        :return: SchemaManifest instance.
+        """
+        try:
+            with open(os.path.join(output_path, cls.FILE_NAME), 'r') as fh:
+                content = json.load(fh)
+        except (OSError, ValueError):
+            return cls(output_path)
+        if content.get('version') != cls._VERSION:
+            return cls(output_path)
+        return cls(output_path, {e['file']: e for e in content.get('files', [])})
+
+    def save(self) -> None:
+        """Writes the manifest file."""
+        content = {
+            "version": self._VERSION,
+            "files": [self._entries[file_name] for file_name in sorted(self._entries)]
+        }
+        atomic_write(os.path.join(self._output_path, self.FILE_NAME), json.dumps(content, indent=2).encode('utf-8'))
+
+    def entry(self, file_name: str) -> dict | None:
+        """
+        Returns the entry of a file, if recorded.
+        :param file_name: Name of the file, relative to the output folder.
+        :return: Dictionary with the file name, scope, fingerprint, digest, size and modification time.
+        """
+        with self._lock:
+            return self._entries.get(file_name)
+
+    def _is_current(self, file_path: str, entry: dict | None, digest: str) -> bool:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if entry is not None and (entry['size'], entry['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            return entry['digest'] == digest
+        # Files touched since they were written, or written before the manifest existed, are compared by content.
+        try:
+            with open(file_path, 'r') as fh:
+                return content_fingerprint(json.load(fh)) == digest
+        except (OSError, ValueError):
+            return False
+
+    def update(self, avro_schema: dict, file_name: str, scope: tuple[str, str, str],
+               write: Callable[[str], None]) -> bool:
+        """
+        Writes the file of a schema unless it already holds the same schema, and records it.
+        :param avro_schema: AVRO schema.
+        :param file_name: Name of the output file.
+        :param scope: Tuple - server, database and DB schema the schema was generated from.
+        :param write: Function that writes the schema to the given path.
+        :return: True if the file was written; False if it was unchanged.
+        """
+        file_path = os.path.join(self._output_path, file_name)
+        digest = content_fingerprint(avro_schema)
+        with self._lock:
+            entry = self._entries.get(file_name)
+        written = not self._is_current(file_path, entry, digest)
+        if written:
+            write(file_path)
+        stat = os.stat(file_path)
+        recorded = {
+            "file": file_name,
+            "scope": list(scope),
+            "fingerprint": entry['fingerprint'] if entry and entry['digest'] == digest
+            else f"{schema_fingerprint(avro_schema):016x}",
+            "digest": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+        if recorded != entry:
+            with self._lock:
+                self._entries[file_name] = recorded
+        return written
+
+    def stale(self, config: Configuration, produced: set[str]) -> list[str]:
+        """
+        Returns the files that were not produced by the current run, within the server, database and (if configured)
+        DB schema of the run.
+        :param config: Configuration properties.
+        :param produced: Names of the files of the tables of the current run.
+        :return: Sorted list of file names.
+        """
+        return sorted(
+            file_name for file_name, entry in self._entries.items()
+            if file_name not in produced
+            and tuple(entry['scope'][:2]) == (config.db_server or '', config.db_name or '')
+            and (not config.db_schema or entry['scope'][2] == config.db_schema)
+        )
+
+    def remove(self, file_names: list[str]) -> None:
+        """
+        Deletes files and their entries.
+        :param file_names: Names of the files.
+        :return: None.
+        """
+        for file_name in file_names:
+            try:
+                os.remove(os.path.join(self._output_path, file_name))
+            except FileNotFoundError:
+                pass
+            self._entries.pop(file_name, None)
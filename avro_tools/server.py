@@ -0,0 +1,259 @@
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from avro_tools.generator import AvroGenerator
+from avro_tools.validation import SchemaValidator
+from configuration import Configuration
+from connectors.generic_connector import GenericConnector, InvalidMapperException
+
+
+class SchemaCache:
+    """
+    Bounded cache of generated schemas, with least-recently-used eviction and a time to live. Concurrent requests for
+    a key that is being generated wait for that generation instead of generating it again. Failed generations are not
+    cached. Thread-safe.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300, clock: Callable[[], float] = time.monotonic):
+        """
+        :param max_size: Maximum number of cached schemas.
+        :param ttl: Seconds a schema is served from the cache after it was generated.
+        :param clock: Function returning the current time in seconds.
+        """
+        if max_size < 1:
+            raise ValueError(f"The size of the cache must be at least 1. {max_size} provided.")
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "coalesced": 0, "expired": 0, "evicted": 0, "errors": 0}
+
+    def get(self, key: tuple, load: Callable[[], dict]) -> dict:
+        """
+        Returns the cached schema of a key, generating it if it is not cached or has expired.
+        :param key: Cache key.
+        :param load: Function that generates the schema.
+        :return: AVRO schema. Callers must not modify it.
+        :raises Exception: The exception raised by `load`, also to the requests waiting for it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._clock() - entry[0] < self._ttl:
+                    self._entries.move_to_end(key)
+                    self._counts['hits'] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._counts['expired'] += 1
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                self._counts['misses'] += 1
+                future = self._pending[key] = Future()
+            else:
+                self._counts['coalesced'] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            value = load()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+                self._counts['errors'] += 1
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._pending[key]
+            self._entries[key] = (self._clock(), value)
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._counts['evicted'] += 1
+        future.set_result(value)
+        return value
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    def now(self) -> float:
+        """Returns the current time of the clock of the cache, in seconds."""
+        return self._clock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the cache: hits, misses (generated schemas), coalesced requests (that waited for a
+        schema being generated), expired and evicted entries, and failed generations.
+        :return: Dictionary with the counters, and the size, maximum size and time to live of the cache.
+        """
+        with self._lock:
+            return {**self._counts, "size": len(self._entries), "max_size": self._max_size, "ttl": self._ttl}
+
+
+class SchemaServer(ThreadingHTTPServer):
+    """
+    HTTP server generating AVRO schemas on demand, from the catalog of the configured source:
+
+    - `GET /schemas/<connector>/<db schema>/<table>[?mapper=<mapper>]` returns the schema of a table, with the mapper of
+      the configuration by default.
+    - `GET /stats` returns the counters of the schema cache (see SchemaCache.stats).
+
+    One connector is opened per (connector, mapper) when first requested, and kept open until the server is closed. Its
+    catalog is refreshed (see GenericConnector.refresh) when a schema is generated after the time to live of the cache,
+    so that expired schemas are generated from the current catalog. Schemas are cached by (connector, db schema, table,
+    mapper). With `avro_validate`, invalid schemas are rejected.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: Configuration,
+                 connectors: Mapping[str, type[GenericConnector]], cache: SchemaCache | None = None):
+        """
+        :param address: Tuple - host and port to listen on (0 for any free port).
+        :param config: Configuration properties of the source (server, database, CSV path, namespace, ...).
+        :param connectors: Connector classes by name (e.g. CONNECTORS_MAP).
+        :param cache: Cache of generated schemas.
+        """
+        super().__init__(address, SchemaRequestHandler)
+        self.config = config
+        self.cache = cache or SchemaCache()
+        self._connector_classes = connectors
+        self._connectors = {}
+        # Time at which each connector last read its catalog
+        self._refreshed = {}
+        self._connectors_lock = threading.Lock()
+        self._validator = SchemaValidator() if config.avro_validate else None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def server_close(self) -> None:
+        super().server_close()
+        with self._connectors_lock:
+            for connector in self._connectors.values():
+                connector.__exit__(None, None, None)
+            self._connectors = {}
+            self._refreshed = {}
+
+    def _connector(self, config: Configuration) -> GenericConnector:
+        key = (config.connector, config.connector_mapper)
+        with self._connectors_lock:
+            connector = self._connectors.get(key)
+            if connector is None:
+                connector_class = self._connector_classes.get(config.connector)
+                if connector_class is None:
+                    raise InvalidConnectorException(config.connector)
+                connector = connector_class(config)
+                connector.__enter__()
+                self._connectors[key] = connector
+                self._refreshed[key] = self.cache.now()
+            elif self.cache.now() - self._refreshed[key] >= self.cache.ttl:
+                connector.refresh(config)
+                self._refreshed[key] = self.cache.now()
+        return connector
+
+    def get_schema(self, connector: str, db_schema: str, table: str, mapper: str | None = None) -> dict:
+        """
+        Returns the schema of a table, from the cache if it was recently generated.
+        :param connector: Name of the connector.
+        :param db_schema: DB schema of the table.
+        :param table: Table name.
+        :param mapper: Data type mapper; defaults to the mapper of the configuration.
+        :return: AVRO schema.
+        """
+        config = copy.copy(self.config)
+        config.connector = connector
+        config.connector_mapper = mapper or self.config.connector_mapper
+        config.db_schema = db_schema
+        return self.cache.get((connector, db_schema, table, config.connector_mapper),
+                              lambda: self._generate(config, (db_schema, table)))
+
+    def _generate(self, config: Configuration, table: tuple[str, str]) -> dict:
+        try:
+            avro_schema = AvroGenerator(self._connector(config)).get_schema(table, table[1], config)
+        except KeyError as e:
+            # Connectors raise KeyError for unknown tables (and schemas), but also for unsupported data types.
+            if e.args and e.args[0] in (table, table[0], table[1]):
+                raise TableNotFoundException(table) from e
+            raise
+        if not avro_schema['fields']:
+            raise TableNotFoundException(table)
+        if self._validator:
+            is_valid, e = self._validator.validate(avro_schema)
+            if not is_valid:
+                raise InvalidSchemaException(table, e)
+        return avro_schema
+
+
+class InvalidConnectorException(Exception):
+    def __init__(self, connector: str):
+        self.msg = f"Connector not recognized: {connector}."
+
+    def __str__(self):
+        return f"ERROR {self.msg}"
+
+
+class TableNotFoundException(Exception):
+    def __init__(self, table: tuple[str, str]):
+        self.msg = f"Table not found: {table[0]}.{table[1]}."
+
+    def __str__(self):
+        return f"ERROR {self.msg}"
+
+
+class InvalidSchemaException(Exception):
+    def __init__(self, table: tuple[str, str], e: Exception):
+        self.msg = f"The schema of table {table[0]}.{table[1]} is not valid: {e}"
+
+    def __str__(self):
+        return f"ERROR {self.msg}"
+
+
+class SchemaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: SchemaServer
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        if parts == ['stats']:
+            return self.reply(200, self.server.cache.stats())
+        if len(parts) != 4 or parts[0] != 'schemas':
+            return self.reply(404, {"error": f"Not found: {url.path}. Expected /schemas/<connector>/<schema>/<table>"})
+        mapper = parse_qs(url.query).get('mapper', [None])[0]
+        try:
+            avro_schema = self.server.get_schema(parts[1], parts[2], parts[3], mapper)
+        except TableNotFoundException as e:
+            return self.reply(404, {"error": e.msg})
+        except (InvalidConnectorException, InvalidMapperException) as e:
+            return self.reply(400, {"error": e.msg})
+        except InvalidSchemaException as e:
+            return self.reply(422, {"error": e.msg})
+        except Exception as e:
+            return self.reply(500, {"error": str(e)})
+        self.reply(200, avro_schema)
@@ -0,0 +1,160 @@
+import json
+import os
+
+from avro_tools.atomic import atomic_write
+from avro_tools.fingerprint import content_fingerprint
+from configuration import Configuration
+
+
+class GenerationState:
+    """
+    Persistent record of the generated AVRO schemas, keyed by (server, database, schema, table). Each entry holds the
+    modification date of the table definition (if reported by the connector), the signature of the generation settings,
+    the fingerprint of the generated schema and the name of the output file. It is used to regenerate only the tables
+    whose definition (or the settings they were generated with) changed.
+    """
+    FILE_NAME = '.avro_state.json'
+    _VERSION = 2
+
+    def __init__(self, path: str, entries: dict | None = None):
+        self._path = path
+        self._entries = entries or {}
+
+    @classmethod
+    def load(cls, path: str) -> 'GenerationState':
+        """
+        Reads the state file. A missing file results in an empty state.
+        :param path: Path of the state file.
+        :return: GenerationState instance.
+        """
+        if not os.path.isfile(path):
+            return cls(path)
+        with open(path, 'r') as fh:
+            content = json.load(fh)
+        entries = {
+            (e['server'], e['database'], e['schema'], e['table']): e
+            for e in content.get('tables', [])
+        }
+        return cls(path, entries)
+
+    def save(self) -> None:
+        """Writes the state file."""
+        content = {
+            "version": self._VERSION,
+            "tables": [self._entries[key] for key in sorted(self._entries)]
+        }
+        atomic_write(self._path, json.dumps(content, indent=2).encode('utf-8'))
+
+    @staticmethod
+    def key(config: Configuration, table: tuple[str, str]) -> tuple[str, str, str, str]:
+        return config.db_server or '', config.db_name or '', table[0] or '', table[1]
+
+    @staticmethod
+    def signature(config: Configuration) -> str:
+        """
+        Returns the signature of the settings that change the generated schemas and their files: connector, mapper,
+        type rules (and the modification time of their file), namespace, nullable handling and output format.
+        :param config: Configuration properties.
+        :return: Fingerprint of the settings.
+        """
+        rules_mtime = None
+        if config.connector_type_rules:
+            try:
+                rules_mtime = os.stat(config.connector_type_rules).st_mtime_ns
+            except OSError:
+                pass
+        return content_fingerprint({
+            "connector": config.connector,
+            "mapper": config.connector_mapper,
+            "type_rules": [config.connector_type_rules, rules_mtime],
+            "namespace": config.avro_namespace,
+            "all_nullable": bool(config.avro_all_nullable),
+            "output_format": config.avro_output_format,
+            "compact": bool(config.avro_compact)
+        })
+
+    def is_current(self, key: tuple, modify_date: str | None, output_path: str, signature: str | None = None) -> bool:
+        """
+        Checks if the schema of a table is up-to-date, i.e., the table definition has the same modification date as
+        when its schema was last generated, with the same settings, and the output file still exists.
+        :param key: State key of the table.
+        :param modify_date: Current modification date of the table definition; None if unknown.
+        :param output_path: Location of the output files.
+        :param signature: Signature of the current generation settings (see `signature`).
+        :return: True if the table does not need to be introspected again.
+        """
+        entry = self._entries.get(key)
+        return (
+            modify_date is not None
+            and entry is not None
+            and entry.get('modify_date') == modify_date
+            and entry.get('signature') == signature
+            and os.path.isfile(os.path.join(output_path, entry['file']))
+        )
+
+    def record(self, key: tuple, modify_date: str | None, avro_schema: dict, file_name: str,
+               output_path: str, signature: str | None = None) -> bool:
+        """
+        Records a generated schema.
+        :param key: State key of the table.
+        :param modify_date: Modification date of the table definition; None if unknown.
+        :param avro_schema: Generated AVRO schema.
+        :param file_name: Name of the output file.
+        :param output_path: Location of the output files.
+        :param signature: Signature of the generation settings (see `signature`).
+        :return: True if the schema changed (or its file is missing) and has to be written.
+        """
+        fingerprint = content_fingerprint(avro_schema)
+        previous = self._entries.get(key)
+        self._entries[key] = {
+            "server": key[0],
+            "database": key[1],
+            "schema": key[2],
+            "table": key[3],
+            "modify_date": modify_date,
+            "signature": signature,
+            "fingerprint": fingerprint,
+            "file": file_name
+        }
+        return (
+            previous is None
+            or previous.get('fingerprint') != fingerprint
+            or previous.get('file') != file_name
+            or not os.path.isfile(os.path.join(output_path, file_name))
+        )
+
+    def forget(self, key: tuple) -> None:
+        """
+        Removes the entry of a table, e.g. when its schema could not be written, so that it is generated again.
+        :param key: State key of the table.
+        :return: None.
+        """
+        self._entries.pop(key, None)
+
+    def file_name(self, key: tuple) -> str | None:
+        """
+        Returns the name of the output file recorded for a table.
+        :param key: State key of the table.
+        :return: File name, or None if the table is not recorded.
+        """
+        entry = self._entries.get(key)
+        return entry['file'] if entry else None
+
+    def drop_missing(self, config: Configuration, existing: set[tuple]) -> list[dict]:
+        """
+        Removes the entries of tables that no longer exist, within the server, database and (if configured) DB schema
+        of the current run.
+        :param config: Configuration properties.
+        :param existing: State keys of the tables that currently exist.
+        :return: List of removed entries.
+        """
+        dropped = []
+        for key in sorted(self._entries):
+            server, database, db_schema, _ = key
+            if (server, database) != (config.db_server or '', config.db_name or ''):
+                continue
+            if config.db_schema and db_schema != config.db_schema:
+                continue
+            if key not in existing:
+                dropped.append(self._entries.pop(key))
+        return dropped
@@ -0,0 +1,34 @@
+import threading
+
+from avro_tools.avro_type import AvroType
+
+
+class AvroTypeRegistry:
+    """
+    Flyweight registry of AvroType instances. Types are immutable, so identical types (same class and properties, e.g.
+    decimal(18, 2)) are created once and shared by every field that uses them.
+    """
+
+    def __init__(self):
+        self._types = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def get(self, avro_class: type[AvroType], **props) -> AvroType:
+        """
+        Returns the interned instance of a type.
+        :param avro_class: AvroType class.
+        :param props: Type properties (e.g. precision and scale).
+        :return: AvroType instance.
+        """
+        key = (avro_class, *sorted(props.items()))
+        try:
+            return self._types[key]
+        except KeyError:
+            with self._lock:
+                return self._types.setdefault(key, avro_class(**props))
+
+
+TYPE_REGISTRY = AvroTypeRegistry()
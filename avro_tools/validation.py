@@ -1,9 +1,19 @@
 import argparse
+import contextlib
+import hashlib
+import importlib.util
+import itertools
 import json
 import os
+import sys
+import threading
+from collections import deque
+from typing import Iterable, Iterator
 
-import avro.errors
-import avro.schema
+from avro_tools.atomic import atomic_write
+
+# The `avro` package is imported when a schema is first parsed, as it is slow to import: runs where every file is
+# cached, or that only print the usage, do not pay for it.
 
 
 class AvroValidationError(Exception):
@@ -11,6 +21,7 @@ class AvroValidationError(Exception):
     AVRO_ERROR = "Input could not be parsed as AVRO"
 
     def __init__(self, e):
+        import avro.errors
         if type(e) is json.JSONDecodeError:
             self.msg = self.JSON_ERROR + f":\n{e.msg}"
         elif type(e) is avro.errors.SchemaParseException:
@@ -25,13 +36,15 @@ class AvroValidationError(Exception):
 class AvroValidator:
 
     AVRO_EXT = '.avsc'
+    # Number of files sent at once to a worker process when validating in a pool
+    BATCH_SIZE = 32
 
     @classmethod
     def validate_schema_definition(cls, schema: str | bytes | dict) -> (bool, AvroValidationError | None):
         """
         Checks if AVRO schema definition is syntactically valid, i.e, parsable. The schema representation can be of type
         string, bytes, or dict. If it is string or bytes, an additional validation step is carried out to ensure that it
-        is parsable as a JSON.
+        is parsable as a JSON. The parsed JSON is validated directly, without serializing it again.
         :param schema: schema definition as string, bytes or dict.
         :return: Tuple - first element is boolean indicating if validation was successful; if successful, the second
         element is None; otherwise, it is an AvroValidationError instance with details about the failure.
@@ -40,53 +53,418 @@ class AvroValidator:
         if type(schema) not in (str, bytes, dict):
             raise TypeError(f"Input schema must be of type `str`, `dict`, or bytes. {type(schema)} provided.")
 
+        import avro.name
+        import avro.schema
         try:
             if type(schema) in (str, bytes):
                 schema = json.loads(schema)
-            avro.schema.parse(json.dumps(schema))
+            avro.schema.make_avsc_object(schema, avro.name.Names())
         except Exception as e:
             return False, AvroValidationError(e)
         return True, None
 
     @classmethod
-    def validate_avro_schema_file(cls, file_path: str, quiet: bool = False) -> bool:
+    def validate_avro_schema_file(cls, file_path: str, quiet: bool = False,
+                                  cache: 'ValidationCache | None' = None) -> bool:
         """
         Checks if file contains a valid AVRO schema definition.
         :param file_path: Absolute path of file to check.
         :param quiet: Flag to suppress printouts of successful validations.
+        :param cache: Cache of validation outcomes. If specified, the file is only validated if it changed since its
+        outcome was recorded.
         :return: True if validation is successful. False otherwise.
         """
-        with open(file_path, 'rb') as fp:
-            success, e = cls.validate_schema_definition(schema=fp.read())
-            if not success:
-                print(f"FAIL: file {os.path.basename(file_path)} is not valid.\n\t{e}")
-            elif not quiet:
-                print(f"SUCCESS: AVRO schema in file {os.path.basename(file_path)} is valid.")
-        return success
+        entry = cache.get(file_path) if cache is not None else None
+        if entry is None:
+            entry = _validate_file(file_path)
+            if cache is not None:
+                cache.put(file_path, entry)
+        cls._print_result(file_path, entry['valid'], entry['error'], quiet)
+        return entry['valid']
+
+    @staticmethod
+    def _print_result(file_path: str, success: bool, error: str | None, quiet: bool) -> None:
+        if not success:
+            print(f"FAIL: file {os.path.basename(file_path)} is not valid.\n\t{error}")
+        elif not quiet:
+            print(f"SUCCESS: AVRO schema in file {os.path.basename(file_path)} is valid.")
 
     @classmethod
     def validate_all_in_folder(cls, folder_path: str, include_str: str | None = None, avro_extension: str = AVRO_EXT,
-                               quiet: bool = False) -> int:
+                               quiet: bool = False, jobs: int = 1, cache: 'ValidationCache | None' = None) -> int:
         """
         Recursively searches for files with the specified extension `avro_extension` and checks if each contains a valid
-        AVRO schema definition.
+        AVRO schema definition. With several jobs, files are validated in a pool of processes; results are still
+        printed in the order the files were found.
         :param folder_path: Absolute path of folder to check.
         :param include_str: If specified, only files including this expression will be checked (case-sensitive).
         :param avro_extension: Extension of files to be validated.
         :param quiet: Flag to suppress printouts of successful validations.
+        :param jobs: Number of processes validating files.
+        :param cache: Cache of validation outcomes. If specified, only the files that changed since their outcome was
+        recorded are validated.
         :return: Number of successful validations.
         """
-        schema_files = []
-        for folder, _, files in os.walk(folder_path):
-            schema_files += [os.path.join(folder, f) for f in files if os.path.splitext(f)[1] == avro_extension]
-
         success_count = 0
-        for f in schema_files:
-            if include_str and include_str not in f:
-                continue
-            success_count += cls.validate_avro_schema_file(file_path=f, quiet=quiet)
+        for result in cls.iter_validate_folder(folder_path, include_str, avro_extension, jobs, cache):
+            cls._print_result(result.source, result.valid, result.error, quiet)
+            success_count += result.valid
         return success_count
 
+    @classmethod
+    def iter_schema_files(cls, folder_path: str, include_str: str | None = None,
+                          avro_extension: str = AVRO_EXT) -> Iterator[str]:
+        """
+        Recursively searches for files with the specified extension, yielding them as they are found: the files of a
+        folder, by name, then the files of each of its subfolders. Symbolic links to folders are not followed, and
+        folders that cannot be read are skipped.
+        :param folder_path: Path of folder to search.
+        :param include_str: If specified, only files including this expression are returned (case-sensitive).
+        :param avro_extension: Extension of files to search.
+        :return: Iterator of file paths.
+        """
+        folders = [folder_path]
+        while folders:
+            try:
+                with os.scandir(folders.pop()) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subfolders = []
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        subfolders.append(entry.path)
+                elif os.path.splitext(entry.name)[1] == avro_extension and (
+                        not include_str or include_str in entry.path):
+                    yield entry.path
+            folders += reversed(subfolders)
+
+    @classmethod
+    def iter_validate_folder(cls, folder_path: str, include_str: str | None = None, avro_extension: str = AVRO_EXT,
+                             jobs: int = 1, cache: 'ValidationCache | None' = None,
+                             max_errors: int | None = None) -> Iterator['ValidationResult']:
+        """
+        Validates the schema files of a folder (see `iter_schema_files`), yielding the results in order as files are
+        found and validated. With several jobs, files are validated in batches by a pool of processes.
+        :param folder_path: Path of folder to check.
+        :param include_str: If specified, only files including this expression will be checked (case-sensitive).
+        :param avro_extension: Extension of files to be validated.
+        :param jobs: Number of processes validating files.
+        :param cache: Cache of validation outcomes. If specified, only the files that changed since their outcome was
+        recorded are validated.
+        :param max_errors: If specified, validation stops after this number of invalid files (1 to fail fast).
+        :return: Iterator of ValidationResult instances.
+        """
+        if jobs < 1:
+            raise ValueError(f"The number of jobs must be at least 1. {jobs} provided.")
+        schema_files = cls.iter_schema_files(folder_path, include_str, avro_extension)
+        if jobs == 1:
+            results = (cls._validate_cached(f, cache) for f in schema_files)
+        else:
+            results = cls._iter_pool(schema_files, jobs, cache)
+        return _limit_errors(results, max_errors)
+
+    @classmethod
+    def iter_validate_lines(cls, lines: Iterable[str | bytes], source: str, names: list[str] | None = None,
+                            max_errors: int | None = None) -> Iterator['ValidationResult']:
+        """
+        Validates schemas given one per line, e.g. a JSON Lines bundle or the standard input. Empty lines are skipped.
+        :param lines: Lines of text.
+        :param source: Name of the input, used to identify each schema as `<source>:<line number>`.
+        :param names: Names of the schemas, in order (e.g. from the index of a bundle); if specified, they are used
+        instead of the line numbers.
+        :param max_errors: If specified, validation stops after this number of invalid schemas (1 to fail fast).
+        :return: Iterator of ValidationResult instances.
+        """
+        def results():
+            position = 0
+            for line_number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                success, e = cls.validate_schema_definition(line)
+                name = names[position] if names and position < len(names) else f"{source}:{line_number}"
+                position += 1
+                yield ValidationResult(name, success, None if success else str(e))
+
+        return _limit_errors(results(), max_errors)
+
+    @classmethod
+    def iter_validate_bundle(cls, bundle_path: str, max_errors: int | None = None) -> Iterator['ValidationResult']:
+        """
+        Validates the schemas of a JSON Lines bundle, one schema per line. If the bundle has an index (see
+        JsonLinesWriter), schemas are identified by their file name; otherwise, by their line number.
+        :param bundle_path: Path of the bundle.
+        :param max_errors: If specified, validation stops after this number of invalid schemas (1 to fail fast).
+        :return: Iterator of ValidationResult instances.
+        """
+        try:
+            with open(bundle_path + '.index.json', 'r') as fh:
+                names = [schema[0] for schema in json.load(fh)['schemas']]
+        except (OSError, ValueError, KeyError):
+            names = None
+
+        def results():
+            with open(bundle_path, 'rb') as fh:
+                yield from cls.iter_validate_lines(fh, os.path.basename(bundle_path), names)
+
+        return _limit_errors(results(), max_errors)
+
+    @classmethod
+    def _validate_cached(cls, file_path: str, cache: 'ValidationCache | None') -> 'ValidationResult':
+        entry = cache.get(file_path) if cache is not None else None
+        if entry is not None:
+            return ValidationResult.from_entry(file_path, entry, cached=True)
+        entry = _validate_file(file_path)
+        if cache is not None:
+            cache.put(file_path, entry)
+        return ValidationResult.from_entry(file_path, entry)
+
+    @classmethod
+    def _iter_pool(cls, schema_files: Iterator[str], jobs: int,
+                   cache: 'ValidationCache | None') -> Iterator['ValidationResult']:
+        """Validates files in batches in a pool of processes, keeping a bounded number of batches in flight."""
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        window = deque()
+        try:
+            while True:
+                batch = list(itertools.islice(schema_files, cls.BATCH_SIZE))
+                if batch:
+                    entries = [cache.get(f) if cache is not None else None for f in batch]
+                    pending = [f for f, entry in zip(batch, entries) if entry is None]
+                    future = executor.submit(_validate_files, pending) if pending else None
+                    window.append((batch, entries, future))
+                    if len(window) < 2 * jobs:
+                        continue
+                elif not window:
+                    return
+                batch, entries, future = window.popleft()
+                validated = iter(future.result() if future is not None else ())
+                for f, entry in zip(batch, entries):
+                    if entry is not None:
+                        yield ValidationResult.from_entry(f, entry, cached=True)
+                        continue
+                    entry = next(validated)
+                    if cache is not None:
+                        cache.put(f, entry)
+                    yield ValidationResult.from_entry(f, entry)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+class ValidationResult:
+    """
+    Outcome of the validation of a schema.
+    """
+
+    def __init__(self, source: str, valid: bool, error: str | None = None, cached: bool = False):
+        """
+        :param source: Path of the schema file, or name of the schema in a bundle.
+        :param valid: Flag indicating if the schema is valid.
+        :param error: Error message, if the schema is not valid.
+        :param cached: Flag indicating if the outcome was taken from a ValidationCache.
+        """
+        self.source = source
+        self.valid = valid
+        self.error = error
+        self.cached = cached
+
+    @classmethod
+    def from_entry(cls, source: str, entry: dict, cached: bool = False) -> 'ValidationResult':
+        return cls(source, entry['valid'], entry['error'], cached)
+
+    def to_dict(self) -> dict:
+        return {"source": self.source, "valid": self.valid, "error": self.error, "cached": self.cached}
+
+    def __repr__(self):
+        return f"ValidationResult({self.source!r}, valid={self.valid})"
+
+
+def _limit_errors(results: Iterator[ValidationResult], max_errors: int | None) -> Iterator[ValidationResult]:
+    """Stops an iterator of results after a number of invalid schemas, closing it so that its resources are freed."""
+    if max_errors is None:
+        return results
+    if max_errors < 1:
+        raise ValueError(f"The maximum number of errors must be at least 1. {max_errors} provided.")
+
+    def limited():
+        errors = 0
+        try:
+            for result in results:
+                yield result
+                errors += not result.valid
+                if errors >= max_errors:
+                    return
+        finally:
+            results.close()
+
+    return limited()
+
+
+class SchemaValidator:
+    """
+    Validates AVRO schemas in memory, e.g. as they are generated, before they are written. The name and namespace of a
+    record are validated on their own, with an empty record; the outcome of the rest of the schema is cached by its
+    content fingerprint without them, so records structurally identical to one already validated (e.g. tables with
+    the same columns) are not parsed again. Thread-safe.
+    """
+    # Top-level properties of a record that are validated separately or ignored by the cache key
+    _NAME_KEYS = ('name', 'namespace', 'doc')
+
+    def __init__(self):
+        self._outcomes = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def validate(self, avro_schema: dict) -> (bool, AvroValidationError | None):
+        """
+        Checks if an AVRO schema is valid (see AvroValidator.validate_schema_definition).
+        :param avro_schema: AVRO schema.
+        :return: Tuple - flag indicating if validation was successful, and the AvroValidationError if it was not.
+        """
+        from avro_tools.fingerprint import content_fingerprint
+        structure = avro_schema
+        if avro_schema.get('type') in ('record', 'error'):
+            outcome = AvroValidator.validate_schema_definition(
+                {"type": avro_schema['type'], "fields": [],
+                 **{k: avro_schema[k] for k in self._NAME_KEYS if k in avro_schema}})
+            if not outcome[0]:
+                return outcome
+            structure = {k: v for k, v in avro_schema.items() if k not in self._NAME_KEYS}
+        key = content_fingerprint(structure)
+        with self._lock:
+            outcome = self._outcomes.get(key)
+            if outcome is not None:
+                self.hits += 1
+                return outcome
+        outcome = AvroValidator.validate_schema_definition(avro_schema)
+        with self._lock:
+            self._outcomes[key] = outcome
+        return outcome
+
+
+class ValidationCache:
+    """
+    Persistent record of the validation outcome of schema files, keyed by path (relative to the cache file). Each entry
+    holds the size, modification time and SHA-256 digest of the file when it was validated. Files whose size and
+    modification time match their entry are not validated again; files with the same size but a different modification
+    time (e.g. after a fresh checkout) are hashed and only validated if their content changed.
+    Outcomes are discarded when the version of the `avro` library changes.
+    """
+    _VERSION = 1
+
+    def __init__(self, path: str, force: bool = False):
+        """
+        :param path: Path of the cache file. A missing or unreadable file results in an empty cache.
+        :param force: Flag to ignore the recorded outcomes, so that every file is validated (and recorded) again.
+        """
+        self._path = path
+        self._base = os.path.dirname(os.path.abspath(path))
+        self._entries = {}
+        self._touched = set()
+        self.hits = 0
+        if force:
+            return
+        try:
+            with open(path, 'r') as fh:
+                content = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if content.get('version') == self._VERSION and content.get('avro') == _avro_version():
+            self._entries = content.get('files', {})
+
+    def __enter__(self) -> 'ValidationCache':
+        return self
+
+    def __exit__(self, *args):
+        self.save()
+
+    def _key(self, file_path: str) -> str:
+        return os.path.relpath(os.path.abspath(file_path), self._base).replace(os.sep, '/')
+
+    def get(self, file_path: str) -> dict | None:
+        """
+        Returns the recorded outcome of a file, if it did not change since it was validated.
+        :param file_path: Path of the file.
+        :return: Dictionary with the outcome (`valid`, `error`) and the size, modification time and digest of the file;
+        None if the file must be validated.
+        """
+        key = self._key(file_path)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if stat.st_size != entry['size']:
+            return None
+        if stat.st_mtime_ns != entry['mtime_ns']:
+            with open(file_path, 'rb') as fh:
+                if hashlib.sha256(fh.read()).hexdigest() != entry['sha256']:
+                    return None
+            entry['mtime_ns'] = stat.st_mtime_ns
+        self._touched.add(key)
+        self.hits += 1
+        return entry
+
+    def put(self, file_path: str, entry: dict) -> None:
+        """
+        Records the outcome of a file.
+        :param file_path: Path of the file.
+        :param entry: Outcome, as returned by `get`.
+        :return: None.
+        """
+        key = self._key(file_path)
+        self._entries[key] = entry
+        self._touched.add(key)
+
+    def save(self) -> None:
+        """Writes the cache file. Entries of files that no longer exist are dropped."""
+        files = {
+            key: entry for key, entry in sorted(self._entries.items())
+            if key in self._touched or os.path.isfile(os.path.join(self._base, key))
+        }
+        content = {"version": self._VERSION, "avro": _avro_version(), "files": files}
+        atomic_write(self._path, json.dumps(content, indent=1).encode('utf-8'))
+
+
+def _avro_version() -> str:
+    """Returns the version of the `avro` library, without importing it."""
+    spec = importlib.util.find_spec('avro')
+    try:
+        with open(os.path.join(spec.submodule_search_locations[0], 'VERSION.txt'), 'r') as fh:
+            return fh.read().strip()
+    except (AttributeError, IndexError, OSError, TypeError):
+        return 'unknown'
+
+
+def _validate_files(file_paths: list[str]) -> list[dict]:
+    return [_validate_file(file_path) for file_path in file_paths]
+
+
+def _validate_file(file_path: str) -> dict:
+    """
+    Validates the AVRO schema definition in a file. Defined at module level so that it can run in a worker process;
+    the error is returned as text, since it holds the original exception.
+    :param file_path: Path of the file.
+    :return: Dictionary with the outcome (`valid`, `error`) and the size, modification time and SHA-256 digest of the
+    file that was validated (see ValidationCache).
+    """
+    with open(file_path, 'rb') as fp:
+        stat = os.fstat(fp.fileno())
+        content = fp.read()
+    success, e = AvroValidator.validate_schema_definition(schema=content)
+    return {
+        "valid": success,
+        "error": None if success else str(e),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": hashlib.sha256(content).hexdigest()
+    }
+
 
 if __name__ == '__main__':
 
@@ -99,7 +477,9 @@ if __name__ == '__main__':
                                          description="Check validity of Avro schema definition files.")
         parser.add_argument('-p', '--path', dest='path', type=str, default=os.getcwd(),
                             help=' '.join(["Absolute path of file or folder with AVRO schema definition(s) to be",
-                                           "validated. If not specified, defaults to current working directory."]))
+                                           "validated. If not specified, defaults to current working directory.",
+                                           "A JSON Lines bundle (.jsonl) is validated line by line; `-` reads",
+                                           "schemas from the standard input, one per line."]))
         parser.add_argument('-f', '--filter', dest='include', type=str, default='',
                             help=' '.join(["Expression to restrict the files to be validated when scanning a",
                                            "directory; only files that contain the expression will be validated.",
@@ -108,24 +488,65 @@ if __name__ == '__main__':
                                            "file, --filter is ignored."]))
         parser.add_argument('-q', '--quiet', dest='quiet', action='store_true',
                             help="If passed when scanning a folder, all successful validations are omitted.")
+        parser.add_argument('-j', '--jobs', dest='jobs', type=int, default=1,
+                            help="Number of processes validating files when scanning a folder. Defaults to 1.")
+        parser.add_argument('-c', '--cache', dest='cache', type=str, default=None,
+                            help=' '.join(["Path of a cache file with the outcome of previous validations. Files that",
+                                           "did not change since they were last validated are not validated again."]))
+        parser.add_argument('--force', dest='force', action='store_true',
+                            help="If passed with --cache, every file is validated again and the cache is rewritten.")
+        parser.add_argument('--fail-fast', dest='fail_fast', action='store_true',
+                            help="If passed, validation stops at the first invalid schema.")
+        parser.add_argument('--max-errors', dest='max_errors', type=int, default=None,
+                            help="Number of invalid schemas after which validation stops.")
+        parser.add_argument('-o', '--report', dest='report', type=str, default=None,
+                            help="Path of a JSON report with the outcome of every validated schema.")
 
         return parser.parse_args()
 
 
-    def run(arguments: dict):
+    def run(arguments: dict) -> int:
         """Run validator"""
         print("STARTING...")
         path = arguments.get('path')
         include = arguments.get('include')
         quiet = arguments.get('quiet') or False
-        if path and os.path.isfile(path):
-            AvroValidator.validate_avro_schema_file(file_path=path, quiet=quiet)
-        elif path and os.path.isdir(path):
-            success_count = AvroValidator.validate_all_in_folder(folder_path=path, include_str=include, quiet=quiet)
-            print(f"{success_count} files successfully validated")
-        else:
-            print(f"ERROR Invalid path: {path}")
+        jobs = arguments.get('jobs') or 1
+        max_errors = 1 if arguments.get('fail_fast') else arguments.get('max_errors')
+        cache = ValidationCache(arguments['cache'], force=arguments.get('force')) if arguments.get('cache') else None
+        counts = {"validated": 0, "valid": 0, "invalid": 0, "cached": 0}
+        results = []
+        with cache if cache is not None else contextlib.nullcontext():
+            if path == '-':
+                validation = AvroValidator.iter_validate_lines(sys.stdin.buffer, '<stdin>', max_errors=max_errors)
+            elif path and os.path.isfile(path) and path.endswith('.jsonl'):
+                validation = AvroValidator.iter_validate_bundle(path, max_errors=max_errors)
+            elif path and os.path.isfile(path):
+                validation = [AvroValidator._validate_cached(path, cache)]
+            elif path and os.path.isdir(path):
+                validation = AvroValidator.iter_validate_folder(path, include_str=include, jobs=jobs, cache=cache,
+                                                                max_errors=max_errors)
+            else:
+                print(f"ERROR Invalid path: {path}")
+                return 2
+            for result in validation:
+                AvroValidator._print_result(result.source, result.valid, result.error, quiet)
+                counts['validated'] += 1
+                counts['valid' if result.valid else 'invalid'] += 1
+                counts['cached'] += result.cached
+                if arguments.get('report'):
+                    results.append(result.to_dict())
+        stopped = max_errors is not None and counts['invalid'] >= max_errors
+        print(f"{counts['valid']} files successfully validated")
+        if cache is not None:
+            print(f"{cache.hits} unchanged files skipped")
+        if stopped:
+            print(f"Validation stopped after {counts['invalid']} invalid files")
+        if arguments.get('report'):
+            with open(arguments['report'], 'w') as out:
+                json.dump({"summary": {**counts, "stopped": stopped}, "results": results}, out, indent=2)
         print("ALL DONE!")
+        return 1 if counts['invalid'] else 0
 
     args = parse_args()
-    run(vars(args))
+    sys.exit(run(vars(args)))
@@ -0,0 +1,353 @@
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from avro_tools.atomic import atomic_write, fsync_directory, temp_path
+from avro_tools.manifest import SchemaManifest
+from configuration import Configuration
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def schema_file_name(avro_schema: dict) -> str:
+    """
+    Returns the name of the file of an AVRO schema.
+    :param avro_schema: AVRO schema.
+    :return: File name.
+    """
+    return f"{avro_schema['namespace']}_{avro_schema['name']}".replace('.', '_') + '.avsc'
+
+
+class SchemaWriter:
+    """
+    Writes generated AVRO schemas to an output folder. Subclasses define the layout of the output; schemas are
+    serialized in memory and written with a single call. Outputs are committed atomically (written to a temporary
+    file that is then renamed), so partially written outputs are never visible. With `fsync`, the data is flushed to
+    disk before it is committed.
+    Writers are used as context managers and are thread-safe.
+    """
+    # Output formats that support incremental runs, which only write the schemas that changed
+    INCREMENTAL = False
+
+    def __init__(self, output_path: str, indent: int | None = 4, compact: bool = False, fsync: bool = False):
+        self._output_path = output_path
+        self._indent = None if compact else indent
+        self._compact = compact
+        self._fsync = fsync
+
+    def __enter__(self) -> 'SchemaWriter':
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def file_name(self, avro_schema: dict) -> str:
+        """
+        Returns the name of the output file of a schema, relative to the output folder.
+        :param avro_schema: AVRO schema.
+        :return: Relative path.
+        """
+        return schema_file_name(avro_schema)
+
+    def serialize(self, avro_schema: dict) -> bytes:
+        """
+        Serializes a schema to JSON, with `orjson` in compact mode if it is installed.
+        :param avro_schema: AVRO schema.
+        :return: UTF-8 encoded JSON.
+        """
+        if self._compact:
+            if orjson is not None:
+                return orjson.dumps(avro_schema)
+            return json.dumps(avro_schema, separators=(',', ':')).encode('utf-8')
+        return json.dumps(avro_schema, indent=self._indent).encode('utf-8')
+
+    def write(self, avro_schema: dict, scope: tuple[str, str, str] = ('', '', '')) -> bool:
+        """
+        Writes a schema.
+        :param avro_schema: AVRO schema.
+        :param scope: Tuple - server, database and DB schema the schema was generated from.
+        :return: True if the schema was written; False if its output was already up-to-date.
+        """
+        raise NotImplementedError
+
+    def stale(self, config: Configuration, produced: set[str]) -> list[str]:
+        """
+        Returns the outputs of previous runs that were not produced by the current run (see SchemaManifest.stale).
+        :param config: Configuration properties.
+        :param produced: Names of the files of the tables of the current run.
+        :return: Sorted list of file names.
+        """
+        return []
+
+    def remove(self, file_names: list[str]) -> None:
+        pass
+
+
+class DirectoryWriter(SchemaWriter):
+    """
+    Writes each schema to its own file. Files are only rewritten when their schema changes (see SchemaManifest).
+    With `fsync`, the directories of the renamed files are flushed once, when the writer is closed.
+    """
+    INCREMENTAL = True
+
+    def __init__(self, output_path: str, indent: int | None = 4, compact: bool = False, fsync: bool = False):
+        super().__init__(output_path, indent, compact, fsync)
+        self._manifest = None
+        self._directories = set()
+
+    def open(self) -> None:
+        self._manifest = SchemaManifest.load(self._output_path)
+        self._directories = set()
+
+    def close(self) -> None:
+        self._manifest.save()
+        if self._fsync:
+            for directory in sorted(self._directories | {self._output_path}):
+                fsync_directory(directory)
+
+    def _write_file(self, file_path: str, data: bytes) -> None:
+        atomic_write(file_path, data, fsync=self._fsync)
+        self._directories.add(os.path.dirname(file_path))
+
+    def write(self, avro_schema: dict, scope: tuple[str, str, str] = ('', '', '')) -> bool:
+        return self._manifest.update(avro_schema, self.file_name(avro_schema), scope,
+                                     lambda file_path: self._write_file(file_path, self.serialize(avro_schema)))
+
+    def stale(self, config: Configuration, produced: set[str]) -> list[str]:
+        return self._manifest.stale(config, produced)
+
+    def remove(self, file_names: list[str]) -> None:
+        self._manifest.remove(file_names)
+
+
+class ShardedWriter(DirectoryWriter):
+    """
+    Writes each schema to its own file, spread over 256 subdirectories (00 to ff) by a hash of the file name, to keep
+    directories small on filesystems where large directories are slow.
+    """
+
+    def file_name(self, avro_schema: dict) -> str:
+        file_name = schema_file_name(avro_schema)
+        return f"{zlib.crc32(file_name.encode('utf-8')) & 0xff:02x}/{file_name}"
+
+    def _write_file(self, file_path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        super()._write_file(file_path, data)
+
+
+class BundleWriter(SchemaWriter):
+    """
+    Writes all schemas to a single bundle file, replacing the bundle of the previous run, together with an index of
+    the position of each schema in the bundle: `<bundle>.index.json`, with the list of [file name, offset, length].
+    The bundle is written to a temporary file, which replaces the previous bundle when the writer is closed.
+    """
+    BUNDLE_NAME = None
+    BUFFER_SIZE = 1 << 20
+
+    def __init__(self, output_path: str, indent: int | None = 4, compact: bool = False, fsync: bool = False):
+        super().__init__(output_path, indent, compact, fsync)
+        self._lock = threading.Lock()
+        self._fh = None
+        self._tmp_path = None
+        self._index = []
+
+    @property
+    def bundle_path(self) -> str:
+        return os.path.join(self._output_path, self.BUNDLE_NAME)
+
+    def open(self) -> None:
+        self._tmp_path = temp_path(self.bundle_path)
+        self._fh = open(self._tmp_path, 'xb', buffering=self.BUFFER_SIZE)
+        self._index = []
+
+    def close(self) -> None:
+        self._fh.flush()
+        if self._fsync:
+            os.fsync(self._fh.fileno())
+        self._fh.close()
+        os.replace(self._tmp_path, self.bundle_path)
+        index = json.dumps({"version": 1, "schemas": self._index}).encode('utf-8')
+        atomic_write(self.bundle_path + '.index.json', index, fsync=self._fsync)
+        if self._fsync:
+            fsync_directory(self._output_path)
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+            return
+        # A failed run leaves the previous bundle in place.
+        self._fh.close()
+        os.remove(self._tmp_path)
+
+    def write(self, avro_schema: dict, scope: tuple[str, str, str] = ('', '', '')) -> bool:
+        file_name = self.file_name(avro_schema)
+        data = self.serialize(avro_schema)
+        with self._lock:
+            offset = self._append(file_name, data)
+            self._index.append([file_name, offset, len(data)])
+        return True
+
+    def _append(self, file_name: str, data: bytes) -> int:
+        """Appends a schema to the bundle and returns the offset of its data."""
+        raise NotImplementedError
+
+
+class JsonLinesWriter(BundleWriter):
+    """
+    Writes all schemas to `schemas.jsonl`, one compact schema per line.
+    """
+    BUNDLE_NAME = 'schemas.jsonl'
+
+    def __init__(self, output_path: str, indent: int | None = 4, compact: bool = False, fsync: bool = False):
+        # A line holds a whole schema.
+        super().__init__(output_path, None, True, fsync)
+
+    def _append(self, file_name: str, data: bytes) -> int:
+        offset = self._fh.tell()
+        self._fh.write(data + b'\n')
+        return offset
+
+
+class TarWriter(BundleWriter):
+    """
+    Writes all schemas to `schemas.tar`, as one member per schema file.
+    """
+    BUNDLE_NAME = 'schemas.tar'
+
+    def open(self) -> None:
+        super().open()
+        self._tar = tarfile.open(fileobj=self._fh, mode='w', format=tarfile.PAX_FORMAT)
+
+    def close(self) -> None:
+        self._tar.close()
+        super().close()
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is not None:
+            self._tar.close()
+        super().__exit__(exc_type, *args)
+
+    def _append(self, file_name: str, data: bytes) -> int:
+        info = tarfile.TarInfo(file_name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        # The member data follows its header.
+        offset = self._tar.offset + len(info.tobuf(self._tar.format, self._tar.encoding, self._tar.errors))
+        self._tar.addfile(info, io.BytesIO(data))
+        return offset
+
+
+class BackgroundWriter:
+    """
+    Writes schemas through another SchemaWriter (or a SchemaPublisher) in a pool of background threads, so that the
+    generation of the next tables overlaps the I/O of the previous ones. At most `queue_size` schemas are queued;
+    `submit` blocks when the queue is full, bounding memory use.
+    """
+
+    def __init__(self, writer: SchemaWriter, workers: int = 1, queue_size: int | None = None):
+        if workers < 1:
+            raise ValueError(f"The number of writers must be at least 1. {workers} provided.")
+        self._writer = writer
+        self._workers = workers
+        self._slots = threading.BoundedSemaphore(queue_size or 4 * workers)
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._executor = None
+
+    @property
+    def writer(self) -> SchemaWriter:
+        return self._writer
+
+    def __enter__(self) -> 'BackgroundWriter':
+        self._writer.open()
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='writer')
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+        self._executor.shutdown()
+        self._writer.__exit__(*args)
+
+    def submit(self, avro_schema: dict, scope: tuple[str, str, str] = ('', '', ''),
+               callback: Callable[[bool | None, Exception | None], None] | None = None) -> Future:
+        """
+        Queues a schema to be written (see SchemaWriter.write).
+        :param avro_schema: AVRO schema.
+        :param scope: Tuple - server, database and DB schema the schema was generated from.
+        :param callback: Function called from the writer thread with the result of SchemaWriter.write, or with None
+        and the exception raised. Callbacks have completed when `flush` returns.
+        :return: Future with the result of SchemaWriter.write.
+        """
+        self._slots.acquire()
+        with self._condition:
+            self._pending += 1
+        try:
+            return self._executor.submit(self._write, avro_schema, scope, callback)
+        except BaseException:
+            self._finish()
+            raise
+
+    def _write(self, avro_schema: dict, scope: tuple[str, str, str], callback) -> bool:
+        try:
+            try:
+                written = self._writer.write(avro_schema, scope)
+            except Exception as e:
+                if callback is not None:
+                    callback(None, e)
+                raise
+            if callback is not None:
+                callback(written, None)
+            return written
+        finally:
+            self._finish()
+
+    def _finish(self) -> None:
+        self._slots.release()
+        with self._condition:
+            self._pending -= 1
+            if not self._pending:
+                self._condition.notify_all()
+
+    def flush(self) -> None:
+        """Waits until every queued schema is written."""
+        with self._condition:
+            self._condition.wait_for(lambda: not self._pending)
+
+
+# Supported output formats
+WRITERS = {
+    "files": DirectoryWriter,
+    "sharded": ShardedWriter,
+    "jsonl": JsonLinesWriter,
+    "tar": TarWriter
+}
+
+
+def get_writer(config: Configuration) -> SchemaWriter:
+    """
+    Returns the writer of the configured output format.
+    :param config: Configuration properties.
+    :return: SchemaWriter instance.
+    """
+    writer_class = WRITERS.get(config.avro_output_format)
+    if writer_class is None:
+        raise ValueError(f"Invalid output format: {config.avro_output_format}. Valid options: {tuple(WRITERS)}")
+    if config.avro_incremental and not writer_class.INCREMENTAL:
+        raise ValueError(f"Incremental runs are not supported by the {config.avro_output_format} output format.")
+    return writer_class(config.avro_output_path, compact=config.avro_compact, fsync=config.avro_fsync)
@@ -0,0 +1,58 @@
+"""
+Measures the memory used by the CsvConnector to hold a synthetic catalog CSV, and the time taken to load it.
+
+    $ python -m benchmark.csv_catalog_memory --rows 5000000
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from configuration import Configuration, ConfigProperties
+from connectors.csv.column import Column
+from connectors.csv.connector import CsvConnector
+
+DATA_TYPES = [('NUMBER', 38, 0, None), ('NUMBER', 18, 2, None), ('TEXT', None, None, 16777216),
+              ('BOOLEAN', None, None, None), ('FLOAT', None, None, None), ('TIMESTAMP_TZ', None, None, None)]
+
+
+def write_catalog(path: str, rows: int, columns_per_table: int = 25, schemas: int = 10) -> None:
+    rng = random.Random(0)
+    with open(path, 'w', newline='') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(Column.Headers.ALL)
+        for i in range(rows):
+            table, ordinal = divmod(i, columns_per_table)
+            data_type, precision, scale, length = rng.choice(DATA_TYPES)
+            writer.writerow([f"SCHEMA_{table % schemas}", f"TABLE_{table}", ordinal + 1, f"COLUMN_{ordinal}",
+                             data_type, precision, scale, rng.choice(('YES', 'NO')), length])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'catalog.csv')
+        write_catalog(path, args.rows)
+        config = Configuration(props={ConfigProperties.CONNECTOR: 'csv', ConfigProperties.MAPPER: 'jdbc',
+                                      ConfigProperties.DB_SYSTEM: 'snowflake', ConfigProperties.CSV_PATH: path})
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with CsvConnector(config) as connector:
+            elapsed = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            tables = sum(len(t) for t in connector.get_catalog(config).values())
+        tracemalloc.stop()
+
+    print(f"rows={args.rows} tables={tables} load={elapsed:.2f}s "
+          f"retained={current / 2 ** 20:.1f}MiB ({current / args.rows:.0f}B/row) peak={peak / 2 ** 20:.1f}MiB")
+
+
+if __name__ == '__main__':
+    main()
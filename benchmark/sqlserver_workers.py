@@ -0,0 +1,75 @@
+"""
+Benchmarks the generation of AVRO schemas with the SqlServerConnector for different numbers of workers. The pyodbc
+module is replaced by a stand-in whose catalog calls sleep for a fixed latency, so no SQL Server instance is needed.
+
+    $ python -m benchmark.sqlserver_workers --tables 200 --latency 0.02 --workers 1 4 8
+"""
+import argparse
+import sys
+import tempfile
+import time
+import types
+from collections import namedtuple
+
+ColumnRow = namedtuple('ColumnRow', 'column_name type_name column_size decimal_digits nullable ordinal_position')
+
+
+class _SlowCursor:
+    def __init__(self, latency: float):
+        self._latency = latency
+
+    def columns(self, table: str, schema: str):
+        time.sleep(self._latency)
+        self._rows = [ColumnRow('id', 'int', 10, 0, 0, 1), ColumnRow('amount', 'decimal', 18, 2, 1, 2)]
+        return self
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class _SlowConnection:
+    def __init__(self, latency: float):
+        self._latency = latency
+
+    def cursor(self):
+        return _SlowCursor(self._latency)
+
+    def close(self):
+        pass
+
+
+def install_pyodbc_stand_in(latency: float) -> None:
+    pyodbc = types.ModuleType('pyodbc')
+    pyodbc.connect = lambda *args, **kwargs: _SlowConnection(latency)
+    sys.modules['pyodbc'] = pyodbc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tables', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds per catalog call.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    install_pyodbc_stand_in(args.latency)
+    import main as generator_main
+    from configuration import Configuration, ConfigProperties
+
+    tables = ','.join(f"table_{i}" for i in range(args.tables))
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as output:
+            config = Configuration(props={ConfigProperties.CONNECTOR: 'sqlserver', ConfigProperties.MAPPER: 'jdbc',
+                                          ConfigProperties.DB_SCHEMA: 'dbo', ConfigProperties.TABLES: tables,
+                                          ConfigProperties.NAMESPACE: 'bench', ConfigProperties.OUTPUT_DIR: output,
+                                          ConfigProperties.WORKERS: workers})
+            start = time.perf_counter()
+            generator_main.run(config)
+            elapsed = time.perf_counter() - start
+        print(f"workers={workers:<3} tables={args.tables} elapsed={elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
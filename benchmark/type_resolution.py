@@ -0,0 +1,78 @@
+"""
+Counts the memory blocks allocated and retained when mapping a synthetic catalog to AvroField's, with interned types
+and compiled resolvers, compared to creating a new AvroType instance per column.
+
+    $ python -m benchmark.type_resolution --columns 1000000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from avro_tools.avro_type import AvroDecimal
+from avro_tools.field import AvroField
+from configuration import Configuration, ConfigProperties
+from connectors.csv.column import Column
+from connectors.csv.connector import CsvConnector
+from connectors.sql_server.data_types import SqlServerTypes
+from connectors.sql_server.type_mappers import DEBEZIUM_DATATYPE_MAP
+
+DATA_TYPES = [('int', 10, 0), ('bigint', 19, 0), ('decimal', 18, 2), ('decimal', 38, 6), ('nvarchar', None, None),
+              ('datetime2', None, None), ('bit', None, None), ('money', 19, 4)]
+
+
+def make_columns(count: int) -> list[Column]:
+    rng = random.Random(0)
+    return [Column.from_values('dbo', 'table', i + 1, f"column_{i}", *rng.choice(DATA_TYPES), True)
+            for i in range(count)]
+
+
+def per_column_types(columns: list[Column]) -> list[AvroField]:
+    """Previous behaviour: two mapper lookups and a new AvroType instance per column."""
+    mapper = DEBEZIUM_DATATYPE_MAP
+    fields = []
+    for col in columns:
+        data_type = SqlServerTypes(col.data_type)
+        if mapper[data_type] is AvroDecimal:
+            avro_type = AvroDecimal(precision=col.numeric_precision, scale=col.numeric_scale)
+        else:
+            avro_type = mapper[data_type]()
+        fields.append(AvroField(name=col.column_name, typ=avro_type, nullable=col.is_nullable))
+    return fields
+
+
+def interned_types(columns: list[Column]) -> list[AvroField]:
+    config = Configuration(props={ConfigProperties.CONNECTOR: 'csv', ConfigProperties.MAPPER: 'debezium',
+                                  ConfigProperties.DB_SYSTEM: 'sqlserver'})
+    return CsvConnector(config)._avro_fields(columns, config)
+
+
+def measure(name: str, func, columns: list[Column]) -> None:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    fields = func(columns)
+    schema_fields = [field.to_dict() for field in fields]
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    print(f"{name:<18} columns={len(columns)} blocks={blocks} retained={size / 2 ** 20:.1f}MiB "
+          f"time={elapsed:.2f}s")
+    del fields, schema_fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--columns', type=int, default=200_000)
+    args = parser.parse_args()
+
+    columns = make_columns(args.columns)
+    measure("per-column types", per_column_types, columns)
+    measure("interned types", interned_types, columns)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,9 @@ class ConfigProperties:
     CONNECTOR = 'connector'
     MAPPER = 'connector_mapper'
     CSV_PATH = 'connector_csv_path'
+    CSV_INDEX = 'connector_csv_index'
+    CSV_JOBS = 'connector_csv_jobs'
+    TYPE_RULES = 'connector_type_rules'
     TABLES = 'connector_tables'
     DB_SYSTEM = 'db_system'
     DB_SERVER = 'db_server'
@@ -14,6 +17,36 @@ class ConfigProperties:
     NAMESPACE = 'avro_namespace'
     OUTPUT_DIR = 'avro_output_path'
     ALL_NULLABLE = 'avro_all_nullable'
+    BULK = 'connector_bulk'
+    WORKERS = 'connector_workers'
+    INCLUDE = 'connector_include'
+    EXCLUDE = 'connector_exclude'
+    MIN_ROWS = 'connector_min_rows'
+    MODIFIED_SINCE = 'connector_modified_since'
+    PAGE_SIZE = 'connector_page_size'
+    CACHE_PATH = 'connector_cache_path'
+    CACHE_TTL = 'connector_cache_ttl'
+    CACHE_REFRESH = 'connector_cache_refresh'
+    OFFLINE = 'connector_offline'
+    INCREMENTAL = 'avro_incremental'
+    STATE_PATH = 'avro_state_path'
+    PRUNE = 'avro_prune'
+    OUTPUT_FORMAT = 'avro_output_format'
+    COMPACT = 'avro_compact'
+    WRITERS = 'avro_writers'
+    FSYNC = 'avro_fsync'
+    COMPAT_REPORT = 'avro_compat_report'
+    VALIDATE = 'avro_validate'
+    REGISTRY_URL = 'registry_url'
+    REGISTRY_SUBJECT = 'registry_subject'
+    REGISTRY_WORKERS = 'registry_workers'
+    REGISTRY_REFRESH = 'registry_refresh'
+    WATCH = 'watch'
+    WATCH_INTERVAL = 'watch_interval'
+    WATCH_DEBOUNCE = 'watch_debounce'
+    SERVE = 'serve'
+    SERVE_CACHE_SIZE = 'serve_cache_size'
+    SERVE_CACHE_TTL = 'serve_cache_ttl'
 
 
 class Configuration:
@@ -26,6 +59,9 @@ class Configuration:
         self.connector = props.get(ConfigProperties.CONNECTOR)
         self.connector_mapper = props.get(ConfigProperties.MAPPER)
         self.connector_csv_path = props.get(ConfigProperties.CSV_PATH) or None
+        self.connector_csv_index = props.get(ConfigProperties.CSV_INDEX) or False
+        self.connector_csv_jobs = int(props.get(ConfigProperties.CSV_JOBS) or 1)
+        self.connector_type_rules = props.get(ConfigProperties.TYPE_RULES) or None
         self.connector_tables = props.get(ConfigProperties.TABLES) or None
         self.db_system = props.get(ConfigProperties.DB_SYSTEM) or None
         self.db_server = props.get(ConfigProperties.DB_SERVER) or None
@@ -34,6 +70,41 @@ class Configuration:
         self.avro_namespace = props.get(ConfigProperties.NAMESPACE) or None
         self.avro_output_path = props.get(ConfigProperties.OUTPUT_DIR) or os.getcwd()
         self.avro_all_nullable = props.get(ConfigProperties.ALL_NULLABLE) or False
+        self.connector_bulk = props.get(ConfigProperties.BULK) or None
+        self.connector_workers = int(props.get(ConfigProperties.WORKERS) or 1)
+        self.connector_include = props.get(ConfigProperties.INCLUDE) or None
+        self.connector_exclude = props.get(ConfigProperties.EXCLUDE) or None
+        self.connector_min_rows = int(props.get(ConfigProperties.MIN_ROWS) or 0) or None
+        self.connector_modified_since = props.get(ConfigProperties.MODIFIED_SINCE) or None
+        self.connector_page_size = int(props.get(ConfigProperties.PAGE_SIZE) or 1000)
+        self.connector_cache_path = props.get(ConfigProperties.CACHE_PATH) or None
+        self.connector_cache_ttl = self._float(props.get(ConfigProperties.CACHE_TTL), 3600)
+        self.connector_cache_refresh = props.get(ConfigProperties.CACHE_REFRESH) or False
+        self.connector_offline = props.get(ConfigProperties.OFFLINE) or False
+        self.avro_incremental = props.get(ConfigProperties.INCREMENTAL) or False
+        self.avro_state_path = props.get(ConfigProperties.STATE_PATH) or None
+        self.avro_prune = props.get(ConfigProperties.PRUNE) or False
+        self.avro_output_format = props.get(ConfigProperties.OUTPUT_FORMAT) or 'files'
+        self.avro_compact = props.get(ConfigProperties.COMPACT) or False
+        self.avro_writers = int(props.get(ConfigProperties.WRITERS) or 1)
+        self.avro_fsync = props.get(ConfigProperties.FSYNC) or False
+        self.avro_compat_report = props.get(ConfigProperties.COMPAT_REPORT) or None
+        self.avro_validate = props.get(ConfigProperties.VALIDATE) or False
+        self.registry_url = props.get(ConfigProperties.REGISTRY_URL) or None
+        self.registry_subject = props.get(ConfigProperties.REGISTRY_SUBJECT) or None
+        self.registry_workers = int(props.get(ConfigProperties.REGISTRY_WORKERS) or 4)
+        self.registry_refresh = props.get(ConfigProperties.REGISTRY_REFRESH) or False
+        self.watch = props.get(ConfigProperties.WATCH) or False
+        self.watch_interval = self._float(props.get(ConfigProperties.WATCH_INTERVAL), 5)
+        self.watch_debounce = self._float(props.get(ConfigProperties.WATCH_DEBOUNCE), 2)
+        self.serve = props.get(ConfigProperties.SERVE) or None
+        self.serve_cache_size = int(props.get(ConfigProperties.SERVE_CACHE_SIZE) or 1024)
+        self.serve_cache_ttl = self._float(props.get(ConfigProperties.SERVE_CACHE_TTL), 300)
+
+    @staticmethod
+    def _float(value, default: float) -> float:
+        # 0 is a valid duration: only missing values take the default.
+        return float(value) if value is not None else default
 
     @staticmethod
     def parse_config(path: str) -> dict:
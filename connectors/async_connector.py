@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable
+
+from avro_tools.field import AvroField
+from configuration import Configuration
+from connectors.generic_connector import GenericConnector
+
+
+class AsyncConnector:
+    """
+    Asyncio wrapper around a (blocking) connector. Every connector call runs in a dedicated thread pool, and at most
+    `concurrency` catalog queries are outstanding at any time, so the event loop is never blocked by the connector.
+    """
+
+    def __init__(self, connector: GenericConnector, concurrency: int = 1):
+        if concurrency < 1:
+            raise ValueError(f"Concurrency must be at least 1. {concurrency} provided.")
+        self._connector = connector
+        self._concurrency = concurrency
+        self._executor = None
+        self._semaphore = None
+
+    @property
+    def connector(self) -> GenericConnector:
+        return self._connector
+
+    async def __aenter__(self) -> 'AsyncConnector':
+        self._executor = ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix='connector')
+        self._semaphore = asyncio.Semaphore(self._concurrency)
+        entered = await self._run(self._connector.__enter__)
+        if entered is not None:
+            self._connector = entered
+        return self
+
+    async def __aexit__(self, *args):
+        try:
+            await self._run(self._connector.__exit__, *args)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def _run(self, func: Callable, *args):
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def get_tables(self, config: Configuration) -> AsyncIterator[tuple[str, str]]:
+        """
+        Asynchronously iterates over the tables returned by the connector. Iterators returned by the connector are
+        advanced in the thread pool, so tables are yielded while the connector is still discovering them.
+        :param config: Configuration properties.
+        :return: Async iterator of tuples - (db_schema, table_name).
+        """
+        tables = await self._run(self._connector.get_tables, config)
+        iterator = iter(tables or [])
+        done = object()
+        while (table := await self._run(next, iterator, done)) is not done:
+            yield table
+
+    async def get_columns(self, table: tuple[str, str], config: Configuration) -> list[AvroField]:
+        """
+        Asynchronously returns the AvroField's that correspond to the columns in the specified table.
+        :param table: Tuple with DB schema and table name.
+        :param config: Configuration properties.
+        :return: List of AvroField instances.
+        """
+        return await self._run(self._connector.get_columns, table, config)
@@ -1,3 +1,6 @@
+from sys import intern
+
+
 class Column:
     class Headers:
         TABLE_NAME = 'TABLE_NAME'
@@ -8,20 +11,71 @@ class Column:
         PRECISION = 'NUMERIC_PRECISION'
         SCALE = 'NUMERIC_SCALE'
         NULLABLE = 'IS_NULLABLE'
+        LENGTH = 'CHARACTER_MAXIMUM_LENGTH'
+        ALL = (TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION, COLUMN_NAME, DATA_TYPE, PRECISION, SCALE, NULLABLE, LENGTH)
+
+    # Catalogs may hold millions of columns: no per-instance __dict__, and the strings repeated across rows (schema,
+    # table and data type names) are interned so that every row references the same string objects.
+    __slots__ = ('_table_name', '_table_schema', '_ordinal_position', '_column_name', '_data_type',
+                 '_numeric_precision', '_numeric_scale', '_is_nullable', '_character_maximum_length')
 
     def __init__(self, **values):
-        self._table_name = values.get(self.Headers.TABLE_NAME)
-        self._table_schema = values.get(self.Headers.TABLE_SCHEMA)
-        self._ordinal_position = int(values.get(self.Headers.ORDINAL_POSITION))
-        self._column_name = values.get(self.Headers.COLUMN_NAME)
-        self._data_type = values.get(self.Headers.DATA_TYPE)
-        self._numeric_precision = int(values.get(self.Headers.PRECISION)) \
-            if values.get(self.Headers.PRECISION) \
-            else None
-        self._numeric_scale = int(values.get(self.Headers.SCALE)) \
-            if values.get(self.Headers.SCALE) \
-            else None
-        self._is_nullable = values.get(self.Headers.NULLABLE).upper() in ('YES', 'TRUE', '1')
+        self._init(*(values.get(header) for header in self.Headers.ALL))
+
+    @classmethod
+    def positions(cls, headers: list[str]) -> tuple[int | None, ...]:
+        """
+        Returns the position of each known header (in the order of Headers.ALL) in a list of CSV headers.
+        :param headers: CSV headers.
+        :return: Tuple of positions; None for the headers that are missing.
+        """
+        return tuple(headers.index(header) if header in headers else None for header in cls.Headers.ALL)
+
+    @classmethod
+    def from_row(cls, row: list[str], positions: tuple[int | None, ...]) -> 'Column':
+        """
+        Creates a Column from a CSV row without building an intermediate dictionary. Missing trailing values are None,
+        as with csv.DictReader.
+        :param row: List of CSV values.
+        :param positions: Positions of the headers, as returned by `positions`.
+        :return: Column instance.
+        """
+        column = cls.__new__(cls)
+        size = len(row)
+        column._init(*(row[i] if i is not None and i < size else None for i in positions))
+        return column
+
+    @classmethod
+    def from_values(cls, table_schema: str, table_name: str, ordinal_position: int, column_name: str, data_type: str,
+                    numeric_precision: int | None, numeric_scale: int | None, is_nullable: bool,
+                    character_maximum_length: int | None = None) -> 'Column':
+        """
+        Creates a Column from already converted values. Strings are used as they are (not interned).
+        """
+        column = cls.__new__(cls)
+        column._table_schema = table_schema
+        column._table_name = table_name
+        column._ordinal_position = ordinal_position
+        column._column_name = column_name
+        column._data_type = data_type
+        column._numeric_precision = numeric_precision
+        column._numeric_scale = numeric_scale
+        column._is_nullable = is_nullable
+        column._character_maximum_length = character_maximum_length
+        return column
+
+    def _init(self, table_schema, table_name, ordinal_position, column_name, data_type, precision, scale, nullable,
+              length):
+        self._table_name = intern(table_name) if table_name is not None else None
+        self._table_schema = intern(table_schema) if table_schema is not None else None
+        self._ordinal_position = int(ordinal_position)
+        self._column_name = column_name
+        self._data_type = intern(data_type) if data_type is not None else None
+        self._numeric_precision = int(precision) if precision not in (None, '') else None
+        self._numeric_scale = int(scale) if scale not in (None, '') else None
+        self._is_nullable = str(nullable).upper() in ('YES', 'TRUE', '1')
+        # -1 stands for (max) types
+        self._character_maximum_length = int(length) if length not in (None, '') else None
 
     @property
     def table_name(self):
@@ -54,3 +108,7 @@ class Column:
     @property
     def is_nullable(self):
         return self._is_nullable
+
+    @property
+    def character_maximum_length(self):
+        return self._character_maximum_length
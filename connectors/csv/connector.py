@@ -1,10 +1,10 @@
-from csv import DictReader
-
 from avro_tools.field import AvroField
-from avro_tools.avro_type import AvroDecimal
 from configuration import Configuration
 from connectors.csv.column import Column
-from connectors.generic_connector import GenericConnector, InvalidMapperException
+from connectors.csv.index import CsvTableIndex
+from connectors.csv.parallel import load_catalog
+from connectors.csv.sources import is_compressed, load_shards, read_catalog, resolve_paths
+from connectors.generic_connector import GenericConnector
 from connectors.snowflake.type_mappers import JDBC_DATATYPE_MAP as SNOWFLAKE_JDBC_MAPPER
 from connectors.sql_server.type_mappers import DEBEZIUM_DATATYPE_MAP as SQLSERVER_DEBEZIUM_MAPPER
 from connectors.sql_server.type_mappers import JDBC_DATATYPE_MAP as SQLSERVER_JDBC_MAPPER
@@ -24,39 +24,65 @@ class CsvConnector(GenericConnector):
     def __init__(self, config: Configuration):
         super().__init__()
         self._csv_path = config.connector_csv_path
+        self._indexed = config.connector_csv_index
+        self._jobs = config.connector_csv_jobs
+        self._index = None
         db_system = config.db_system
         mapper = config.connector_mapper
 
         if db_system and mapper:
-            try:
-                self._mapper = self.TYPE_MAPPER[db_system][mapper]
-            except KeyError as e:
-                raise InvalidMapperException(str(e))
+            self._resolver = self.get_resolver(db_system, mapper, config.connector_type_rules)
 
     def __enter__(self) -> GenericConnector:
         """
         Method executed when the connector is called as a context manager.
-        Reads the CSV file and composes the list of tables defined therein as an instance attribute (_tables).
+        Reads the CSV file(s) and composes the list of tables defined therein as an instance attribute (_tables).
+        The CSV path can also be a directory or a glob pattern; the files, which may be gzip or zstd compressed, are
+        then read concurrently and a table may only be defined in one of them.
         The _tables attribute is a two layer dictionary. The first layer contains the db schemas; the second layer
         contains the tables; the values in the second layer are lists of Column instances that correspond to the
         table columns defined in the CSV file.
+        In indexed mode, only the byte ranges of each table are indexed (see CsvTableIndex) and the columns are read
+        when a table is requested.
         """
-        self._tables = {}
-        with open(self._csv_path, newline='') as csv:
-            csv_reader = DictReader(csv)
-            for row in csv_reader:
-                column = Column(**row)
-                if column.table_schema in self._tables:
-                    if column.table_name in self._tables[column.table_schema]:
-                        self._tables[column.table_schema][column.table_name].append(column)
-                    else:
-                        self._tables[column.table_schema].update({column.table_name: [column]})
-                else:
-                    self._tables.update({column.table_schema: {column.table_name: [column]}})
+        self._tables, self._index = self._read()
         return self
 
+    def _read(self) -> tuple[dict[str, dict[str, list[Column]]], CsvTableIndex | None]:
+        """Reads the CSV file(s) into a catalog, or an open index in indexed mode, without changing the connector."""
+        paths = resolve_paths(self._csv_path)
+        if self._indexed:
+            if len(paths) > 1 or is_compressed(paths[0]):
+                raise ValueError("The CSV index requires a single uncompressed CSV file.")
+            index = CsvTableIndex.load(paths[0], persist=True)
+            index.open()
+            return {}, index
+        if len(paths) > 1:
+            return load_shards(paths, self._jobs), None
+        if self._jobs > 1 and not is_compressed(paths[0]):
+            return load_catalog(paths[0], self._jobs), None
+        return read_catalog(paths[0]), None
+
     def __exit__(self, *args):
-        pass
+        if self._index is not None:
+            self._index.close()
+
+    def get_source_paths(self, config: Configuration) -> list[str]:
+        return resolve_paths(self._csv_path)
+
+    def refresh(self, config: Configuration) -> None:
+        """
+        Reads the CSV file(s) again. The new catalog (or index) is read aside and then replaces the current one, so
+        calls in progress on other threads keep reading the previous one; a previous index is released once they are
+        done.
+        :param config: Configuration properties.
+        :return: None.
+        """
+        tables, index = self._read()
+        if index is not None:
+            self._index = index
+        else:
+            self._tables = tables
 
     def get_tables(self, config: Configuration) -> list:
         """
@@ -69,6 +95,10 @@ class CsvConnector(GenericConnector):
         tables = []
         db_schema = config.db_schema
 
+        index = self._index
+        if index is not None:
+            return [(schema, table) for schema, table in index.tables() if schema == db_schema]
+
         for schema in self._tables:
             if schema != db_schema:
                 continue
@@ -85,22 +115,27 @@ class CsvConnector(GenericConnector):
         """
         db_schema = table[0]
         table_name = table[1]
-        all_nullable = config.avro_all_nullable
-
-        table_columns = self._tables[db_schema][table_name]
 
-        # Sort columns by ordinal position
-        table_columns.sort(key=lambda x: x.ordinal_position)
+        index = self._index
+        if index is not None:
+            if table not in index:
+                raise KeyError(table)
+            return self._avro_fields(index.columns(table), config)
+        return self._avro_fields(self._tables[db_schema][table_name], config)
 
-        avro_columns = []
-        for col in table_columns:
-            if self._mapper[col.data_type] is AvroDecimal:
-                avro_type = AvroDecimal(precision=col.numeric_precision, scale=col.numeric_scale)
-            else:
-                avro_type = self._mapper[col.data_type]()
-            avro_columns.append(
-                AvroField(name=col.column_name,
-                          typ=avro_type,
-                          nullable=all_nullable or col.is_nullable)
-            )
-        return avro_columns
+    def get_catalog(self, config: Configuration) -> dict[str, dict[str, list[Column]]]:
+        """
+        Returns the columns defined in the CSV file. If the database schema is specified in the configuration
+        properties, only the tables belonging to that schema are included.
+        :param config: Configuration properties.
+        :return: Two layer dictionary (db schema -> table name -> list of Column instances).
+        """
+        db_schema = config.db_schema
+        index = self._index
+        if index is not None:
+            catalog = {}
+            for schema, table in index.tables():
+                if not db_schema or schema == db_schema:
+                    catalog.setdefault(schema, {})[table] = index.columns((schema, table))
+            return catalog
+        return {schema: tables for schema, tables in self._tables.items() if not db_schema or schema == db_schema}
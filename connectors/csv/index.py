@@ -0,0 +1,158 @@
+import csv
+import io
+import json
+import mmap
+import os
+
+from connectors.csv.column import Column
+
+
+class CsvTableIndex:
+    """
+    Index of a catalog CSV file from (TABLE_SCHEMA, TABLE_NAME) to the byte ranges of the rows of each table. Rows are
+    then read on demand through a memory map, so only the requested tables are ever parsed into Column instances.
+    The index can be persisted as a sidecar file next to the CSV, which is reused while the CSV is not modified.
+    """
+    SIDECAR_EXT = '.idx.json'
+    _VERSION = 1
+
+    def __init__(self, csv_path: str, headers: list[str], ranges: dict[tuple[str, str], list[list[int]]],
+                 size: int, mtime_ns: int):
+        self._csv_path = csv_path
+        self._headers = headers
+        self._positions = Column.positions(headers)
+        self._ranges = ranges
+        self._size = size
+        self._mtime_ns = mtime_ns
+        self._mm = None
+
+    @property
+    def headers(self) -> list[str]:
+        return self._headers
+
+    @classmethod
+    def sidecar_path(cls, csv_path: str) -> str:
+        return csv_path + cls.SIDECAR_EXT
+
+    @classmethod
+    def build(cls, csv_path: str) -> 'CsvTableIndex':
+        """
+        Scans the CSV file once, recording the byte range of every row. Consecutive rows of the same table are merged
+        into a single range. Quoted fields spanning several lines are supported.
+        :param csv_path: Path of the CSV file.
+        :return: CsvTableIndex instance.
+        """
+        stat = os.stat(csv_path)
+        ranges = {}
+        with open(csv_path, 'rb') as fh:
+            header = fh.readline()
+            if not header.strip():
+                # An empty file has no tables.
+                return cls(csv_path, [], ranges, stat.st_size, stat.st_mtime_ns)
+            headers = next(csv.reader([header.decode('utf-8-sig')]))
+            schema_idx = headers.index(Column.Headers.TABLE_SCHEMA)
+            table_idx = headers.index(Column.Headers.TABLE_NAME)
+
+            last_key = None
+            while True:
+                start = fh.tell()
+                record = fh.readline()
+                if not record:
+                    break
+                # A record continues on the next line while it has an odd number of quotes.
+                while record.count(b'"') % 2:
+                    line = fh.readline()
+                    if not line:
+                        break
+                    record += line
+                end = fh.tell()
+                if not record.strip():
+                    continue
+
+                if b'"' in record:
+                    values = next(csv.reader(io.StringIO(record.decode('utf-8'), newline='')))
+                else:
+                    values = record.decode('utf-8').rstrip('\r\n').split(',')
+                key = (values[schema_idx], values[table_idx])
+
+                table_ranges = ranges.setdefault(key, [])
+                if key == last_key and table_ranges[-1][1] == start:
+                    table_ranges[-1][1] = end
+                else:
+                    table_ranges.append([start, end])
+                last_key = key
+
+        return cls(csv_path, headers, ranges, stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def load(cls, csv_path: str, persist: bool = False) -> 'CsvTableIndex':
+        """
+        Loads the index from the sidecar file if it matches the current CSV file; otherwise, builds it.
+        :param csv_path: Path of the CSV file.
+        :param persist: Flag to use a sidecar file (read it if valid, write it after building the index).
+        :return: CsvTableIndex instance.
+        """
+        if persist:
+            stat = os.stat(csv_path)
+            try:
+                with open(cls.sidecar_path(csv_path), 'r') as fh:
+                    content = json.load(fh)
+                if (content.get('version'), content.get('size'), content.get('mtime_ns')) \
+                        == (cls._VERSION, stat.st_size, stat.st_mtime_ns):
+                    ranges = {(schema, table): table_ranges for schema, table, table_ranges in content['tables']}
+                    return cls(csv_path, content['headers'], ranges, stat.st_size, stat.st_mtime_ns)
+            except (OSError, ValueError, KeyError):
+                pass
+
+        index = cls.build(csv_path)
+        if persist:
+            index.save()
+        return index
+
+    def save(self) -> None:
+        """Writes the sidecar file."""
+        content = {
+            "version": self._VERSION,
+            "size": self._size,
+            "mtime_ns": self._mtime_ns,
+            "headers": self._headers,
+            "tables": [[schema, table, table_ranges] for (schema, table), table_ranges in self._ranges.items()]
+        }
+        with open(self.sidecar_path(self._csv_path), 'w') as fh:
+            json.dump(content, fh, separators=(',', ':'))
+
+    def open(self) -> None:
+        """
+        Memory maps the CSV file. The map does not keep the file open, and is released when the index is no longer
+        referenced if it is not closed. An empty file, which cannot be mapped, has no tables to read.
+        """
+        with open(self._csv_path, 'rb') as fh:
+            if os.fstat(fh.fileno()).st_size:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = None
+
+    def tables(self) -> list[tuple[str, str]]:
+        """
+        Returns the tables in the CSV file, in order of first appearance.
+        :return: List of tuples - (db_schema, table_name).
+        """
+        return list(self._ranges)
+
+    def __contains__(self, table: tuple[str, str]) -> bool:
+        return table in self._ranges
+
+    def columns(self, table: tuple[str, str]) -> list[Column]:
+        """
+        Reads the rows of a table from the memory mapped CSV file.
+        :param table: Tuple with DB schema and table name.
+        :return: List of Column instances.
+        """
+        columns = []
+        for start, end in self._ranges[table]:
+            data = io.StringIO(self._mm[start:end].decode('utf-8'), newline='')
+            columns += [Column.from_row(row, self._positions) for row in csv.reader(data) if row]
+        return columns
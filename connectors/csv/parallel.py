@@ -0,0 +1,125 @@
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from sys import intern
+from typing import Iterable
+
+from connectors.csv.column import Column
+
+
+class _Interned(dict):
+    """Cache of interned strings, to intern each distinct value only once."""
+
+    def __missing__(self, key: str) -> str:
+        value = self[key] = intern(key)
+        return value
+
+
+def chunk_ranges(csv_path: str, chunks: int) -> tuple[list[str], list[tuple[int, int]]]:
+    """
+    Splits the data rows of a CSV file into byte ranges of similar size, aligned to line boundaries.
+    :param csv_path: Path of the CSV file.
+    :param chunks: Number of ranges.
+    :return: Tuple - the CSV headers and the list of (start, end) byte ranges.
+    """
+    size = os.path.getsize(csv_path)
+    with open(csv_path, 'rb') as fh:
+        headers = next(csv.reader([fh.readline().decode('utf-8-sig')]), [])
+        data_start = fh.tell()
+        step = max(1, (size - data_start) // chunks)
+
+        boundaries = [data_start]
+        for i in range(1, chunks):
+            fh.seek(max(data_start + i * step, boundaries[-1]))
+            fh.readline()
+            boundaries.append(min(fh.tell(), size))
+        boundaries.append(size)
+
+    ranges = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+    return headers, ranges
+
+
+def parse_chunk(csv_path: str, start: int, end: int, headers: list[str]) -> dict[str, dict[str, list[tuple]]]:
+    """
+    Parses the rows in a byte range of a CSV file. Rows are returned as plain tuples, which are much cheaper to send
+    back to the parent process than Column instances.
+    :param csv_path: Path of the CSV file.
+    :param start: First byte of the range.
+    :param end: Byte after the end of the range.
+    :param headers: CSV headers.
+    :return: Two layer dictionary (db schema -> table name -> list of tuples with the ordinal position, column name,
+    data type, numeric precision, numeric scale and nullable flag of each column).
+    """
+    with open(csv_path, 'rb') as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+
+    return group_rows(csv.reader(io.StringIO(data.decode('utf-8'), newline='')), headers)
+
+
+def group_rows(rows: Iterable[list[str]], headers: list[str]) -> dict[str, dict[str, list[tuple]]]:
+    """
+    Groups CSV rows by table, as plain tuples.
+    :param rows: CSV rows, without the header row.
+    :param headers: CSV headers.
+    :return: Two layer dictionary (db schema -> table name -> list of tuples with the ordinal position, column name,
+    data type, numeric precision, numeric scale, nullable flag and maximum length of each column).
+    """
+    positions = Column.positions(headers)
+    tables = {}
+    for row in rows:
+        if not row:
+            continue
+        if len(row) != len(headers):
+            raise ValueError(f"Unexpected number of values in CSV row {row}. Quoted values spanning several lines "
+                             + "are not supported by the parallel loader.")
+        col = Column.from_row(row, positions)
+        tables.setdefault(col.table_schema, {}).setdefault(col.table_name, []).append(
+            (col.ordinal_position, col.column_name, col.data_type, col.numeric_precision, col.numeric_scale,
+             col.is_nullable, col.character_maximum_length))
+    return tables
+
+
+def to_columns(grouped: dict[str, dict[str, list[tuple]]], tables: dict[str, dict[str, list[Column]]],
+               data_types: dict[str, str] | None = None) -> dict[str, dict[str, list[Column]]]:
+    """
+    Converts rows grouped by `group_rows` into Column instances, appending them to a catalog.
+    :param grouped: Rows grouped by table.
+    :param tables: Catalog to extend (db schema -> table name -> list of Column instances).
+    :param data_types: Cache of interned data type names.
+    :return: The extended catalog.
+    """
+    data_types = data_types if data_types is not None else _Interned()
+    for schema, schema_tables in grouped.items():
+        schema = intern(schema)
+        merged = tables.setdefault(schema, {})
+        for table, rows in schema_tables.items():
+            table = intern(table)
+            merged.setdefault(table, []).extend(
+                Column.from_values(schema, table, ordinal_position, column_name, data_types[data_type], precision,
+                                   scale, nullable, length)
+                for ordinal_position, column_name, data_type, precision, scale, nullable, length in rows
+            )
+    return tables
+
+
+def load_catalog(csv_path: str, jobs: int, min_chunk_size: int = 1 << 20) -> dict[str, dict[str, list[Column]]]:
+    """
+    Parses a catalog CSV file in a pool of processes. The file is split into line aligned chunks (several per process,
+    to balance the load), and the columns of each table are merged in file order.
+    :param csv_path: Path of the CSV file.
+    :param jobs: Number of processes.
+    :param min_chunk_size: Minimum size of a chunk, in bytes.
+    :return: Two layer dictionary (db schema -> table name -> list of Column instances).
+    """
+    chunks = max(1, min(jobs * 4, os.path.getsize(csv_path) // min_chunk_size))
+    headers, ranges = chunk_ranges(csv_path, chunks)
+
+    tables = {}
+    data_types = _Interned()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(ranges) or 1)) as executor:
+        results = executor.map(parse_chunk, *zip(*[(csv_path, start, end, headers) for start, end in ranges]))
+        for grouped in results:
+            to_columns(grouped, tables, data_types)
+    return tables
@@ -0,0 +1,138 @@
+import csv
+import glob
+import gzip
+import io
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TextIO
+
+from connectors.csv.column import Column
+from connectors.csv.parallel import group_rows, to_columns
+
+GZIP_EXTENSIONS = ('.gz', '.gzip')
+ZSTD_EXTENSIONS = ('.zst', '.zstd')
+CSV_EXTENSIONS = ('.csv',) + tuple('.csv' + ext for ext in GZIP_EXTENSIONS + ZSTD_EXTENSIONS)
+
+
+class DuplicateTableException(Exception):
+    def __init__(self, duplicates: list[tuple[str, str, str, str]]):
+        self.duplicates = duplicates
+        self.msg = "Tables defined in more than one CSV file:" + "".join(
+            f"\n\t{schema}.{table}: {first} and {second}" for schema, table, first, second in duplicates)
+
+    def __str__(self):
+        return f"ERROR {self.msg}"
+
+
+def resolve_paths(csv_path: str) -> list[str]:
+    """
+    Resolves the CSV source into a list of files. The source can be a file, a directory (all CSV files in it, plain or
+    compressed) or a glob pattern.
+    :param csv_path: Path, directory or glob pattern.
+    :return: Sorted list of file paths.
+    """
+    if os.path.isdir(csv_path):
+        paths = [entry.path for entry in os.scandir(csv_path)
+                 if entry.is_file() and entry.name.lower().endswith(CSV_EXTENSIONS)]
+    elif glob.has_magic(csv_path):
+        paths = [path for path in glob.glob(csv_path) if os.path.isfile(path)]
+    else:
+        return [csv_path]
+    if not paths:
+        raise FileNotFoundError(f"No CSV files found in {csv_path}")
+    return sorted(paths)
+
+
+def is_compressed(path: str) -> bool:
+    return path.lower().endswith(GZIP_EXTENSIONS + ZSTD_EXTENSIONS)
+
+
+def open_csv(path: str) -> TextIO:
+    """
+    Opens a CSV file for reading as text, decompressing gzip (.gz) and zstd (.zst) files while streaming. zstd requires
+    the optional `zstandard` package.
+    :param path: Path of the file.
+    :return: Text file object.
+    """
+    lower = path.lower()
+    if lower.endswith(GZIP_EXTENSIONS):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    if lower.endswith(ZSTD_EXTENSIONS):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(f"The `zstandard` package is required to read {path}: pip install zstandard")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8', newline='')
+    return open(path, newline='')
+
+
+def read_catalog(path: str) -> dict[str, dict[str, list[Column]]]:
+    """
+    Reads a CSV file into a catalog.
+    :param path: Path of the file.
+    :return: Two layer dictionary (db schema -> table name -> list of Column instances).
+    """
+    tables = {}
+    with open_csv(path) as fh:
+        csv_reader = csv.reader(fh)
+        headers = next(csv_reader, None)
+        if headers is None:
+            # An empty file has no tables.
+            return tables
+        positions = Column.positions(headers)
+        for row in csv_reader:
+            if not row:
+                continue
+            column = Column.from_row(row, positions)
+            tables.setdefault(column.table_schema, {}).setdefault(column.table_name, []).append(column)
+    return tables
+
+
+def read_grouped(path: str) -> dict[str, dict[str, list[tuple]]]:
+    """
+    Reads a CSV file into rows grouped by table, as plain tuples (see `group_rows`), to be sent between processes.
+    :param path: Path of the file.
+    :return: Two layer dictionary (db schema -> table name -> list of tuples).
+    """
+    with open_csv(path) as fh:
+        csv_reader = csv.reader(fh)
+        headers = next(csv_reader, None)
+        return group_rows(csv_reader, headers) if headers is not None else {}
+
+
+def load_shards(paths: list[str], jobs: int = 1) -> dict[str, dict[str, list[Column]]]:
+    """
+    Reads several CSV files concurrently and merges them into a single catalog. Files are read in threads (decompression
+    releases the GIL) or, with more than one job, in a pool of processes.
+    :param paths: Paths of the files.
+    :param jobs: Number of processes; 1 to read the files in threads.
+    :return: Two layer dictionary (db schema -> table name -> list of Column instances).
+    :raises DuplicateTableException: If a table is defined in more than one file.
+    """
+    executor: Executor
+    if jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=min(jobs, len(paths)))
+        loader = read_grouped
+    else:
+        executor = ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1, 8))
+        loader = read_catalog
+
+    tables = {}
+    owners = {}
+    duplicates = []
+    with executor:
+        for path, shard in zip(paths, executor.map(loader, paths)):
+            if jobs > 1:
+                shard = to_columns(shard, {})
+            for schema, schema_tables in shard.items():
+                merged = tables.setdefault(schema, {})
+                for table, columns in schema_tables.items():
+                    if table in merged:
+                        duplicates.append((schema, table, owners[(schema, table)], path))
+                        continue
+                    merged[table] = columns
+                    owners[(schema, table)] = path
+    if duplicates:
+        raise DuplicateTableException(duplicates)
+    return tables
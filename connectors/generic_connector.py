@@ -1,5 +1,14 @@
+from typing import Iterable
+
 from avro_tools.field import AvroField
 from configuration import Configuration
+from connectors.csv.column import Column
+from connectors.type_resolver import TypeResolver
+from connectors.type_rules import TypeRules
+
+# Type resolvers compiled per (connector class, db system, mapper, type rules file), with the rules they were compiled
+# with
+_RESOLVERS = {}
 
 
 class GenericConnector:
@@ -9,7 +18,7 @@ class GenericConnector:
     TYPE_MAPPER = {}
 
     def __init__(self):
-        pass
+        self._resolver = None
 
     def __enter__(self):
         pass
@@ -17,12 +26,82 @@ class GenericConnector:
     def __exit__(self, *args):
         pass
 
-    def get_tables(self, config: Configuration) -> list[str]:
+    def get_tables(self, config: Configuration) -> Iterable[tuple[str, str]]:
         pass
 
     def get_columns(self, table: tuple[str, str], config: Configuration) -> list[AvroField]:
         pass
 
+    def get_catalog(self, config: Configuration) -> dict[str, dict[str, list[Column]]] | None:
+        """
+        Returns the raw column metadata of every table, restricted to the DB schema if one is configured, for
+        connectors that support it.
+        :param config: Configuration properties.
+        :return: Two layer dictionary (db schema -> table name -> list of Column instances), or None if not supported.
+        """
+        return None
+
+    def get_modify_dates(self, config: Configuration) -> dict[tuple[str, str], str] | None:
+        """
+        Returns the last modification date of the definition of each table, for connectors that support it.
+        :param config: Configuration properties.
+        :return: Dictionary of (db_schema, table_name) to ISO formatted date, or None if not supported.
+        """
+        return None
+
+    def get_source_paths(self, config: Configuration) -> list[str] | None:
+        """
+        Returns the files the catalog is read from, for connectors that read files.
+        :param config: Configuration properties.
+        :return: List of file paths, or None if the catalog is not read from files.
+        """
+        return None
+
+    def refresh(self, config: Configuration) -> None:
+        """
+        Discards the catalog metadata read so far, so that it is read again from the source.
+        :param config: Configuration properties.
+        :return: None.
+        """
+        pass
+
+    @classmethod
+    def get_resolver(cls, db_system: str, mapper: str, rules_path: str | None = None) -> TypeResolver:
+        """
+        Returns the type resolver of a data type mapper of a DB system. Resolvers are compiled once and shared,
+        until the type rules file is modified.
+        :param db_system: DB system.
+        :param mapper: Name of the data type mapper.
+        :param rules_path: Path of a type rules file (see TypeRules), if any.
+        :return: TypeResolver instance.
+        """
+        key = (cls, db_system, mapper, rules_path)
+        rules = TypeRules.load(rules_path) if rules_path else None
+        cached = _RESOLVERS.get(key)
+        if cached is not None and cached[0] is rules:
+            return cached[1]
+        try:
+            type_map = cls.TYPE_MAPPER[db_system][mapper]
+        except KeyError as e:
+            raise InvalidMapperException(str(e))
+        resolver = TypeResolver(type_map, rules=rules)
+        _RESOLVERS[key] = (rules, resolver)
+        return resolver
+
+    def _avro_fields(self, columns: list[Column], config: Configuration) -> list[AvroField]:
+        """
+        Maps the column metadata of a table to AvroField's, ordered by ordinal position.
+        :param columns: List of Column instances.
+        :param config: Configuration properties.
+        :return: List of AvroField instances.
+        """
+        all_nullable = config.avro_all_nullable
+        resolve_column = self._resolver.resolve_column
+        return [
+            AvroField(name=col.column_name, typ=resolve_column(col), nullable=all_nullable or col.is_nullable)
+            for col in sorted(columns, key=lambda x: x.ordinal_position)
+        ]
+
 
 class InvalidMapperException(Exception):
     def __init__(self, mapper: str, valid: tuple = ()):
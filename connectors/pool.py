@@ -0,0 +1,57 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of connections (e.g. DB or HTTP connections). Connections are opened lazily with the factory, up to
+    the pool size, and each connection is handed out to a single thread at a time.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 1):
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1. {size} provided.")
+        self._factory = factory
+        self._size = size
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Borrows a connection from the pool for the duration of the context. If all connections are in use and the
+        pool is full, waits until one is returned.
+        """
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def _acquire(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._connections) < self._size:
+                connection = self._factory()
+                self._connections.append(connection)
+                return connection
+        return self._idle.get()
+
+    def close(self) -> None:
+        """Closes every connection opened by the pool."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+            self._idle = queue.LifoQueue()
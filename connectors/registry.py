@@ -0,0 +1,74 @@
+import importlib
+from collections.abc import Mapping
+from typing import Iterator
+
+from connectors.generic_connector import GenericConnector
+
+
+class ConnectorRegistry(Mapping):
+    """
+    Registry of the supported connectors, by name. Connectors are registered as `module:class` paths and their module
+    (and with it, the database driver) is only imported when the connector is first looked up, so that a run does not
+    pay for the drivers of the connectors it does not use.
+    Other packages can provide connectors through the `avro_schema_generator.connectors` entry point group, e.g.
+    `oracle = my_package.oracle:OracleConnector`. Entry points are only read if a name is not registered.
+    """
+    ENTRY_POINT_GROUP = 'avro_schema_generator.connectors'
+
+    def __init__(self, connectors: dict[str, str] | None = None):
+        self._paths = dict(connectors or {})
+        self._classes = {}
+        self._entry_points_loaded = False
+
+    def register(self, name: str, connector: str | type[GenericConnector]) -> None:
+        """
+        Registers a connector, replacing any connector with the same name.
+        :param name: Name of the connector.
+        :param connector: Connector class, or its `module:class` path.
+        :return: None.
+        """
+        self._classes.pop(name, None)
+        if isinstance(connector, str):
+            self._paths[name] = connector
+        else:
+            self._paths[name] = f"{connector.__module__}:{connector.__qualname__}"
+            self._classes[name] = connector
+
+    def _load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=self.ENTRY_POINT_GROUP):
+            # Connectors registered explicitly take precedence over plugins.
+            self._paths.setdefault(entry_point.name, entry_point.value)
+
+    def __getitem__(self, name: str) -> type[GenericConnector]:
+        connector = self._classes.get(name)
+        if connector is not None:
+            return connector
+        if name not in self._paths:
+            self._load_entry_points()
+        path = self._paths[name]
+        module_name, _, class_name = path.partition(':')
+        if not class_name:
+            raise ValueError(f"Invalid connector path for {name}: {path}. Expected `module:class`.")
+        connector = importlib.import_module(module_name)
+        for attribute in class_name.split('.'):
+            connector = getattr(connector, attribute)
+        self._classes[name] = connector
+        return connector
+
+    def __contains__(self, name) -> bool:
+        if name not in self._paths:
+            self._load_entry_points()
+        return name in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        self._load_entry_points()
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        self._load_entry_points()
+        return len(self._paths)
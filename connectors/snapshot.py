@@ -0,0 +1,223 @@
+import fnmatch
+import os
+import sqlite3
+import time
+
+from avro_tools.field import AvroField
+from configuration import Configuration
+from connectors.csv.column import Column
+from connectors.generic_connector import GenericConnector
+
+
+class SnapshotNotFoundException(Exception):
+    def __init__(self, connection: str, db_schema: str):
+        self.msg = f"No catalog snapshot found for {connection} (schema: {db_schema or '<all>'})."
+
+    def __str__(self):
+        return f"ERROR {self.msg}"
+
+
+def _matches(patterns: str, table: tuple[str, str]) -> bool:
+    """
+    Checks if a table matches any of the comma separated wildcard patterns (* and ?), case-insensitively. A pattern
+    with a dot is matched against the schema and table names (schema.table); otherwise, against the table name only.
+    """
+    for pattern in (p.strip().upper().replace('[', '[[]') for p in patterns.split(',')):
+        if not pattern:
+            continue
+        if '.' in pattern:
+            schema_pattern, table_pattern = pattern.split('.', 1)
+            if (fnmatch.fnmatchcase(table[0].upper(), schema_pattern)
+                    and fnmatch.fnmatchcase(table[1].upper(), table_pattern)):
+                return True
+        elif fnmatch.fnmatchcase(table[1].upper(), pattern):
+            return True
+    return False
+
+
+class CatalogSnapshot:
+    """
+    Local SQLite store of raw catalog metadata (the Column definitions of every table), keyed by connection and DB
+    schema. Snapshots are independent of the data type mapper and the AVRO namespace, so they can be reused by runs with
+    different settings.
+    """
+    FILE_NAME = '.avro_catalog.sqlite'
+    _DDL = (
+        "CREATE TABLE IF NOT EXISTS snapshots ("
+        + "connection TEXT NOT NULL, db_schema TEXT NOT NULL, created_at REAL NOT NULL, "
+        + "PRIMARY KEY (connection, db_schema))",
+        "CREATE TABLE IF NOT EXISTS columns ("
+        + "connection TEXT NOT NULL, db_schema TEXT NOT NULL, table_schema TEXT, table_name TEXT, "
+        + "ordinal_position INTEGER, column_name TEXT, data_type TEXT, numeric_precision INTEGER, "
+        + "numeric_scale INTEGER, is_nullable INTEGER, character_maximum_length INTEGER)",
+        "CREATE INDEX IF NOT EXISTS columns_snapshot ON columns (connection, db_schema)"
+    )
+
+    _VERSION = 2
+
+    def __init__(self, path: str):
+        self._path = path
+        # The connector may be entered and exited from different threads (e.g. by the AsyncConnector).
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != self._VERSION:
+                # Snapshots written by another version are discarded.
+                self._db.execute("DROP TABLE IF EXISTS columns")
+                self._db.execute("DROP TABLE IF EXISTS snapshots")
+                self._db.execute(f"PRAGMA user_version = {self._VERSION}")
+            for statement in self._DDL:
+                self._db.execute(statement)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def created_at(self, connection: str, db_schema: str | None) -> float | None:
+        """
+        Returns the creation time of a snapshot.
+        :param connection: Connection key.
+        :param db_schema: DB schema of the snapshot; None for the whole database.
+        :return: Creation time as a POSIX timestamp, or None if the snapshot does not exist.
+        """
+        row = self._db.execute("SELECT created_at FROM snapshots WHERE connection = ? AND db_schema = ?",
+                               (connection, db_schema or '')).fetchone()
+        return row[0] if row else None
+
+    def load(self, connection: str, db_schema: str | None) -> dict[str, dict[str, list[Column]]]:
+        """
+        Reads a snapshot.
+        :param connection: Connection key.
+        :param db_schema: DB schema of the snapshot; None for the whole database.
+        :return: Two layer dictionary (db schema -> table name -> list of Column instances).
+        """
+        catalog = {}
+        rows = self._db.execute(
+            "SELECT table_schema, table_name, ordinal_position, column_name, data_type, numeric_precision, "
+            + "numeric_scale, is_nullable, character_maximum_length "
+            + "FROM columns WHERE connection = ? AND db_schema = ?",
+            (connection, db_schema or ''))
+        for row in rows:
+            column = Column(**dict(zip(Column.Headers.ALL, row)))
+            catalog.setdefault(column.table_schema, {}).setdefault(column.table_name, []).append(column)
+        return catalog
+
+    def save(self, connection: str, db_schema: str | None, catalog: dict[str, dict[str, list[Column]]]) -> None:
+        """
+        Stores a snapshot, replacing the previous one.
+        :param connection: Connection key.
+        :param db_schema: DB schema of the snapshot; None for the whole database.
+        :param catalog: Two layer dictionary (db schema -> table name -> list of Column instances).
+        :return: None.
+        """
+        rows = (
+            (connection, db_schema or '', col.table_schema, col.table_name, col.ordinal_position, col.column_name,
+             col.data_type, col.numeric_precision, col.numeric_scale, int(col.is_nullable),
+             col.character_maximum_length)
+            for tables in catalog.values() for columns in tables.values() for col in columns
+        )
+        with self._db:
+            self.invalidate(connection, db_schema or '')
+            self._db.executemany("INSERT INTO columns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute("INSERT INTO snapshots VALUES (?, ?, ?)", (connection, db_schema or '', time.time()))
+
+    def invalidate(self, connection: str | None = None, db_schema: str | None = None) -> None:
+        """
+        Deletes snapshots. If no connection is specified, every snapshot is deleted; if no DB schema is specified,
+        every snapshot of the connection is deleted.
+        :param connection: Connection key.
+        :param db_schema: DB schema of the snapshot.
+        :return: None.
+        """
+        condition, params = "", ()
+        if connection is not None and db_schema is not None:
+            condition, params = " WHERE connection = ? AND db_schema = ?", (connection, db_schema)
+        elif connection is not None:
+            condition, params = " WHERE connection = ?", (connection,)
+        with self._db:
+            self._db.execute("DELETE FROM columns" + condition, params)
+            self._db.execute("DELETE FROM snapshots" + condition, params)
+
+
+class SnapshotConnector(GenericConnector):
+    """
+    Connector that serves the catalog from a local snapshot. The wrapped connector is only opened when there is no
+    snapshot for the connection and DB schema, when it is older than the TTL or when a refresh is requested; in offline
+    mode it is never opened.
+    Tables are filtered by the include and exclude patterns like in the discovery of the source. Filters on the row
+    count and modification date are not supported, as the snapshot does not hold them.
+    """
+
+    def __init__(self, connector_class: type[GenericConnector], config: Configuration):
+        if config.connector_min_rows or config.connector_modified_since:
+            raise ValueError("The minimum row count and modification date filters cannot be used with the catalog "
+                             + "snapshot (--cache, --offline).")
+        super().__init__()
+        self._connector_class = connector_class
+        self._config = config
+        self._connection = self.connection_key(config)
+        self._db_schema = config.db_schema
+        self._resolver = connector_class.get_resolver(
+            config.db_system or getattr(connector_class, 'DB_SYSTEM', None), config.connector_mapper,
+            config.connector_type_rules)
+
+    @staticmethod
+    def connection_key(config: Configuration) -> str:
+        """
+        Identifies the source of a catalog.
+        :param config: Configuration properties.
+        :return: Connection key.
+        """
+        if config.connector_csv_path:
+            return f"{config.connector}://{os.path.abspath(config.connector_csv_path)}"
+        return f"{config.connector}://{config.db_server or ''}/{config.db_name or ''}"
+
+    def __enter__(self) -> GenericConnector:
+        config = self._config
+        self._store = CatalogSnapshot(config.connector_cache_path or CatalogSnapshot.FILE_NAME)
+        if config.connector_cache_refresh:
+            self._store.invalidate(self._connection, self._db_schema or '')
+
+        created_at = self._store.created_at(self._connection, self._db_schema)
+        expired = created_at is None or time.time() - created_at > config.connector_cache_ttl
+        if config.connector_offline:
+            if created_at is None:
+                raise SnapshotNotFoundException(self._connection, self._db_schema)
+        elif expired:
+            with self._connector_class(config) as connector:
+                catalog = connector.get_catalog(config)
+            if catalog is None:
+                raise NotImplementedError(f"Connector {config.connector} does not support catalog snapshots.")
+            self._store.save(self._connection, self._db_schema, catalog)
+
+        self._tables = self._store.load(self._connection, self._db_schema)
+        return self
+
+    def __exit__(self, *args):
+        self._store.close()
+
+    def get_tables(self, config: Configuration) -> list[tuple[str, str]]:
+        """
+        Returns the tables in the snapshot. If the database schema is specified in the configuration properties, only
+        the tables belonging to that schema are included; tables are also filtered by the include and exclude
+        patterns.
+        :param config: Configuration properties.
+        :return: List of tuples - (db_schema, table_name).
+        """
+        return [
+            (schema, table)
+            for schema in sorted(self._tables) if not config.db_schema or schema == config.db_schema
+            for table in sorted(self._tables[schema])
+            if (not config.connector_include or _matches(config.connector_include, (schema, table)))
+            and not (config.connector_exclude and _matches(config.connector_exclude, (schema, table)))
+        ]
+
+    def get_catalog(self, config: Configuration) -> dict[str, dict[str, list[Column]]]:
+        return self._tables
+
+    def get_columns(self, table: tuple[str, str], config: Configuration) -> list[AvroField]:
+        """
+        Returns list of AvroField's that correspond to the columns in the specified table.
+        :param table: Tuple with DB schema and table name.
+        :param config: Configuration properties.
+        :return: List of AvroField instances.
+        """
+        return self._avro_fields(self._tables[table[0]][table[1]], config)
@@ -1,10 +1,16 @@
+import threading
+from typing import Iterator
+
 import pyodbc
 
 from avro_tools.field import AvroField
-from avro_tools.avro_type import AvroDecimal
 from configuration import Configuration
-from connectors.generic_connector import GenericConnector, InvalidMapperException
+from connectors.csv.column import Column
+from connectors.generic_connector import GenericConnector
+from connectors.pool import ConnectionPool
+from connectors.sql_server.data_types import SqlServerTypes
 from connectors.sql_server.type_mappers import DEBEZIUM_DATATYPE_MAP, JDBC_DATATYPE_MAP
+from connectors.type_resolver import TypeResolver
 
 
 class SqlServerConnector(GenericConnector):
@@ -18,28 +24,266 @@ class SqlServerConnector(GenericConnector):
         }
     }
 
+    # Types that have a character maximum length and a numeric precision in INFORMATION_SCHEMA.COLUMNS
+    CHARACTER_TYPES = frozenset(t.value for t in (
+        SqlServerTypes.BINARY, SqlServerTypes.CHAR, SqlServerTypes.IMAGE, SqlServerTypes.NCHAR, SqlServerTypes.NTEXT,
+        SqlServerTypes.NVARCHAR, SqlServerTypes.TEXT, SqlServerTypes.VARBINARY, SqlServerTypes.VARCHAR,
+        SqlServerTypes.XML))
+    NUMERIC_TYPES = frozenset(t.value for t in (
+        SqlServerTypes.BIGINT, SqlServerTypes.DECIMAL, SqlServerTypes.FLOAT, SqlServerTypes.INT, SqlServerTypes.MONEY,
+        SqlServerTypes.NUMERIC, SqlServerTypes.REAL, SqlServerTypes.SMALLINT, SqlServerTypes.SMALLMONEY,
+        SqlServerTypes.TINYINT))
+
+    # Bulk catalog scopes
+    BULK_SCHEMA = 'schema'
+    BULK_DATABASE = 'database'
+
+    # The selected columns match the headers of the CSV catalog, so that rows can be loaded as Column instances.
+    # Like table discovery, the catalog only holds tables, not views.
+    BULK_COLUMNS_QUERY = (
+        "SELECT c.TABLE_SCHEMA, c.TABLE_NAME, c.ORDINAL_POSITION, c.COLUMN_NAME, c.DATA_TYPE, "
+        + "c.NUMERIC_PRECISION, c.NUMERIC_SCALE, c.IS_NULLABLE, c.CHARACTER_MAXIMUM_LENGTH "
+        + "FROM INFORMATION_SCHEMA.COLUMNS c "
+        + "JOIN INFORMATION_SCHEMA.TABLES t ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME "
+        + "WHERE t.TABLE_TYPE = 'BASE TABLE'"
+    )
+
+    # Table discovery. Pages are read with keyset pagination on (schema, table), so every page is an index seek.
+    TABLES_QUERY = (
+        "SELECT TOP (?) s.name, t.name "
+        + "FROM sys.tables t "
+        + "JOIN sys.schemas s ON s.schema_id = t.schema_id"
+    )
+    ROW_COUNT_EXPRESSION = (
+        "(SELECT SUM(p.rows) FROM sys.partitions p WHERE p.object_id = t.object_id AND p.index_id IN (0, 1))"
+    )
+
+    MODIFY_DATES_QUERY = (
+        "SELECT s.name, o.name, o.modify_date "
+        + "FROM sys.objects o "
+        + "JOIN sys.schemas s ON s.schema_id = o.schema_id "
+        + "WHERE o.type IN ('U', 'V')"
+    )
+
     def __init__(self, config: Configuration):
         super().__init__()
 
         self._server = config.db_server
         self._database = config.db_name
-        try:
-            self._mapper = self.TYPE_MAPPER[self.DB_SYSTEM][config.connector_mapper]
-        except KeyError as e:
-            raise InvalidMapperException(str(e))
+        self._bulk = config.connector_bulk
+        self._workers = config.connector_workers
+        if config.connector_page_size < 1:
+            raise ValueError(f"Page size must be at least 1. {config.connector_page_size} provided.")
+        self._resolver = self.get_resolver(self.DB_SYSTEM, config.connector_mapper, config.connector_type_rules)
+        if self._bulk not in (None, self.BULK_SCHEMA, self.BULK_DATABASE):
+            raise ValueError(
+                f"Invalid bulk mode: {self._bulk}. Valid options: {(self.BULK_SCHEMA, self.BULK_DATABASE)}")
+
+        # Bulk catalog: two layer dictionary (db schema -> table name -> list of Column instances)
+        self._catalog = {}
+        self._loaded_schemas = set()
+        self._loaded_database = False
+        self._catalog_lock = threading.Lock()
 
     def __enter__(self):
+        # pyodbc connections must not be shared between threads, so each worker borrows its own from the pool.
+        self._pool = ConnectionPool(self._connect, size=self._workers)
+        return self
+
+    def __exit__(self, *args):
+        self._pool.close()
+
+    def refresh(self, config: Configuration) -> None:
+        """
+        Discards the bulk catalog read so far, so that columns are queried again.
+        :param config: Configuration properties.
+        :return: None.
+        """
+        with self._catalog_lock:
+            self._catalog = {}
+            self._loaded_schemas = set()
+            self._loaded_database = False
+
+    def _connect(self):
         connection_string = (
             f"DRIVER={self.DRIVER};"
             + f"SERVER={self._server};"
             + f"DATABASE={self._database};"
             + "Trusted_connection=yes"
         )
-        self._connection = pyodbc.connect(connection_string, autocommit=True, readonly=True)
-        return self
+        return pyodbc.connect(connection_string, autocommit=True, readonly=True)
 
-    def __exit__(self, *args):
-        self._connection.close()
+    def _load_catalog(self, db_schema: str | None) -> None:
+        """
+        Reads the column definitions of every table in a DB schema (or in the whole database, if db_schema is None)
+        with a single query and groups them by table in the _catalog attribute.
+        :param db_schema: DB schema to load. If None, all schemas are loaded.
+        :return: None.
+        """
+        query = self.BULK_COLUMNS_QUERY
+        params = ()
+        if db_schema is not None:
+            query += " AND c.TABLE_SCHEMA = ?"
+            params = (db_schema,)
+        query += " ORDER BY c.TABLE_SCHEMA, c.TABLE_NAME, c.ORDINAL_POSITION"
+
+        catalog = {}
+        with self._pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, *params)
+            headers = [description[0] for description in cursor.description]
+            for row in cursor:
+                column = Column(**dict(zip(headers, row)))
+                catalog.setdefault(column.table_schema, {}).setdefault(column.table_name, []).append(column)
+            cursor.close()
+
+        if db_schema is None:
+            self._catalog = catalog
+            self._loaded_database = True
+        else:
+            self._catalog[db_schema] = catalog.get(db_schema, {})
+            self._loaded_schemas.add(db_schema)
+
+    def _get_bulk_columns(self, db_schema: str, table_name: str) -> list[Column]:
+        """
+        Returns the catalog columns of the specified table, loading the catalog on first use.
+        :param db_schema: DB schema of the table.
+        :param table_name: Name of the table.
+        :return: List of Column instances.
+        """
+        with self._catalog_lock:
+            if not self._loaded_database and db_schema not in self._loaded_schemas:
+                self._load_catalog(db_schema if self._bulk == self.BULK_SCHEMA else None)
+        return self._catalog.get(db_schema, {}).get(table_name, [])
+
+    def get_catalog(self, config: Configuration) -> dict[str, dict[str, list[Column]]]:
+        """
+        Returns the column metadata of every table in the configured DB schema (or in the whole database, if no DB
+        schema is configured), read with a single query.
+        :param config: Configuration properties.
+        :return: Two layer dictionary (db schema -> table name -> list of Column instances).
+        """
+        db_schema = config.db_schema
+        with self._catalog_lock:
+            if not self._loaded_database and (db_schema is None or db_schema not in self._loaded_schemas):
+                self._load_catalog(db_schema)
+        if db_schema is None:
+            return self._catalog
+        return {db_schema: self._catalog.get(db_schema, {})}
+
+    @staticmethod
+    def _like_pattern(pattern: str) -> str:
+        """
+        Translates a wildcard pattern (* and ?) into a T-SQL LIKE pattern, escaping the LIKE special characters.
+        :param pattern: Wildcard pattern.
+        :return: LIKE pattern.
+        """
+        escaped = pattern.replace('[', '[[]').replace('%', '[%]').replace('_', '[_]')
+        return escaped.replace('*', '%').replace('?', '_')
+
+    @classmethod
+    def _pattern_condition(cls, patterns: str) -> tuple[str, list]:
+        """
+        Builds a condition matching any of the comma separated patterns. A pattern with a dot is matched against the
+        schema and table names (schema.table); otherwise, against the table name only.
+        :param patterns: Comma separated wildcard patterns.
+        :return: Tuple - SQL condition and its parameters.
+        """
+        conditions = []
+        params = []
+        for pattern in (p.strip() for p in patterns.split(',')):
+            if not pattern:
+                continue
+            if '.' in pattern:
+                schema_pattern, table_pattern = pattern.split('.', 1)
+                conditions.append("(s.name LIKE ? AND t.name LIKE ?)")
+                params += [cls._like_pattern(schema_pattern), cls._like_pattern(table_pattern)]
+            else:
+                conditions.append("t.name LIKE ?")
+                params.append(cls._like_pattern(pattern))
+        return "(" + " OR ".join(conditions) + ")", params
+
+    def _tables_filter(self, config: Configuration) -> tuple[list[str], list]:
+        """
+        Builds the discovery filters from the configuration properties.
+        :param config: Configuration properties.
+        :return: Tuple - list of SQL conditions and their parameters.
+        """
+        conditions = ["t.is_ms_shipped = 0"]
+        params = []
+        if config.db_schema:
+            conditions.append("s.name = ?")
+            params.append(config.db_schema)
+        if config.connector_include:
+            condition, condition_params = self._pattern_condition(config.connector_include)
+            conditions.append(condition)
+            params += condition_params
+        if config.connector_exclude:
+            condition, condition_params = self._pattern_condition(config.connector_exclude)
+            conditions.append("NOT " + condition)
+            params += condition_params
+        if config.connector_min_rows:
+            conditions.append(f"{self.ROW_COUNT_EXPRESSION} >= ?")
+            params.append(config.connector_min_rows)
+        if config.connector_modified_since:
+            conditions.append("t.modify_date >= ?")
+            params.append(config.connector_modified_since)
+        return conditions, params
+
+    def get_tables(self, config: Configuration) -> Iterator[tuple[str, str]]:
+        """
+        Discovers the user tables in the database, filtered on the server by the DB schema, the include and exclude
+        patterns, the minimum row count and the modification date in the configuration properties. Tables are
+        fetched in pages and yielded as they arrive, ordered by schema and table name.
+        :param config: Configuration properties.
+        :return: Iterator of tuples - (db_schema, table_name).
+        """
+        conditions, params = self._tables_filter(config)
+        page_size = config.connector_page_size
+        last = None
+        while True:
+            page_conditions = list(conditions)
+            page_params = [page_size] + params
+            if last is not None:
+                page_conditions.append("(s.name > ? OR (s.name = ? AND t.name > ?))")
+                page_params += [last[0], last[0], last[1]]
+            query = (
+                self.TABLES_QUERY
+                + " WHERE " + " AND ".join(page_conditions)
+                + " ORDER BY s.name, t.name"
+            )
+
+            with self._pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(query, *page_params)
+                rows = cursor.fetchall()
+                cursor.close()
+
+            for row in rows:
+                yield row[0], row[1]
+            if len(rows) < page_size:
+                return
+            last = (rows[-1][0], rows[-1][1])
+
+    def get_modify_dates(self, config: Configuration) -> dict[tuple[str, str], str]:
+        """
+        Returns the modification date (sys.objects.modify_date) of every table and view, restricted to the DB schema
+        if one is configured.
+        :param config: Configuration properties.
+        :return: Dictionary of (db_schema, table_name) to ISO formatted date.
+        """
+        query = self.MODIFY_DATES_QUERY
+        params = ()
+        if config.db_schema:
+            query += " AND s.name = ?"
+            params = (config.db_schema,)
+
+        with self._pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query, *params)
+            rows = cursor.fetchall()
+            cursor.close()
+        return {(row[0], row[1]): row[2].isoformat() for row in rows}
 
     def get_columns(self, table: tuple[str], config: Configuration) -> list[AvroField]:
         """
@@ -50,28 +294,35 @@ class SqlServerConnector(GenericConnector):
         """
         db_schema = table[0]
         table_name = table[1]
-        all_nullable = config.avro_all_nullable
-
-        columns_dict = {}
-        cursor = self._connection.cursor()
-        rows = cursor.columns(table=table_name, schema=db_schema)
 
-        for row in rows:
-            if self._mapper[row.type_name] is AvroDecimal:
-                avro_type = AvroDecimal(row.column_size, row.decimal_digits)
-            else:
-                avro_type = self._mapper[row.type_name]()
-            columns_dict.update({row.ordinal_position: AvroField(
-                    name=row.column_name,
-                    typ=avro_type,
-                    nullable=all_nullable or bool(row.nullable)
-            )})
+        if self._bulk:
+            return self._avro_fields(self._get_bulk_columns(db_schema, table_name), config)
 
-        i = 1
-        columns = []
-        while columns_dict:
-            columns.append(columns_dict.pop(i))
-            i += 1
+        with self._pool.connection() as connection:
+            cursor = connection.cursor()
+            rows = cursor.columns(table=table_name, schema=db_schema).fetchall()
+            cursor.close()
 
-        return columns
+        columns = [self._odbc_column(db_schema, table_name, row) for row in rows]
+        return self._avro_fields(columns, config)
 
+    @classmethod
+    def _odbc_column(cls, db_schema: str, table_name: str, row) -> Column:
+        """
+        Converts a row of the ODBC columns catalog into a Column, with the same values as the bulk catalog query: the
+        column size is the precision of numeric types and the maximum length of character and binary types, and is
+        NULL for the other types.
+        :param db_schema: DB schema of the table.
+        :param table_name: Name of the table.
+        :param row: Row returned by cursor.columns().
+        :return: Column instance.
+        """
+        data_type = TypeResolver.normalise(row.type_name)
+        precision = scale = length = None
+        if data_type in cls.NUMERIC_TYPES:
+            precision, scale = row.column_size, row.decimal_digits
+        elif data_type in cls.CHARACTER_TYPES:
+            # ODBC reports 0 as the column size of (max) types, which INFORMATION_SCHEMA reports as -1.
+            length = row.column_size or -1
+        return Column.from_values(db_schema, table_name, row.ordinal_position, row.column_name, row.type_name,
+                                  precision, scale, bool(row.nullable), length)
@@ -0,0 +1,79 @@
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from avro_tools.avro_type import AvroDecimal, AvroType
+from avro_tools.type_registry import AvroTypeRegistry, TYPE_REGISTRY
+
+if TYPE_CHECKING:
+    from connectors.csv.column import Column
+    from connectors.type_rules import TypeRules
+
+
+class TypeResolver:
+    """
+    Resolves source data type names to interned AvroType instances, compiled once from a type mapper (a dictionary of
+    data type, as a string or an Enum member such as SqlServerTypes, to AvroType class).
+    Type names are normalised (case, surrounding spaces, length/precision arguments and the `identity` suffix reported
+    by ODBC), and each distinct raw name is normalised only once.
+    Optional TypeRules take precedence over the type mapper for the columns they match.
+    """
+    # AvroType classes whose instances depend on the column (precision and scale)
+    PARAMETERIZED = (AvroDecimal,)
+
+    def __init__(self, type_map: dict, registry: AvroTypeRegistry = TYPE_REGISTRY, rules: 'TypeRules' = None):
+        self._registry = registry
+        self._rules = rules
+        self._types = {}
+        for data_type, avro_class in type_map.items():
+            name = self.normalise(data_type)
+            self._types[name] = avro_class if avro_class in self.PARAMETERIZED else registry.get(avro_class)
+        # Raw type name -> AvroType instance, or AvroType class for parameterized types
+        self._resolved = {}
+
+    @staticmethod
+    def normalise(data_type: str | Enum) -> str:
+        """
+        Normalises a data type name, e.g. `SqlServerTypes.INT`, `INT`, `int identity` and `int` are all `int`.
+        :param data_type: Data type name or Enum member.
+        :return: Normalised name.
+        """
+        name = data_type.value if isinstance(data_type, Enum) else data_type
+        name = name.split('(')[0].strip().lower()
+        if name.endswith(' identity'):
+            name = name[:-len(' identity')].rstrip()
+        return name
+
+    def __contains__(self, data_type: str | Enum) -> bool:
+        return self.normalise(data_type) in self._types
+
+    def resolve(self, data_type: str | Enum, precision: int | None = None, scale: int | None = None) -> AvroType:
+        """
+        Returns the AvroType of a column.
+        :param data_type: Data type name or Enum member.
+        :param precision: Numeric precision of the column, if any.
+        :param scale: Numeric scale of the column, if any.
+        :return: Interned AvroType instance.
+        :raises KeyError: If the data type is not supported by the mapper.
+        """
+        resolved = self._resolved.get(data_type)
+        if resolved is None:
+            try:
+                resolved = self._resolved[data_type] = self._types[self.normalise(data_type)]
+            except KeyError:
+                raise KeyError(f"Data type not supported by the mapper: {data_type}")
+        if isinstance(resolved, AvroType):
+            return resolved
+        return self._registry.get(resolved, precision=precision, scale=scale)
+
+    def resolve_column(self, column: 'Column') -> AvroType:
+        """
+        Returns the AvroType of a column, applying the type rules before the type mapper.
+        :param column: Column instance.
+        :return: Interned AvroType instance.
+        :raises KeyError: If no rule applies and the data type is not supported by the mapper.
+        """
+        if self._rules is not None:
+            avro_type = self._rules.match(column)
+            if avro_type is not None:
+                return avro_type
+        return self.resolve(column.data_type, column.numeric_precision, column.numeric_scale)
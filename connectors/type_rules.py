@@ -0,0 +1,153 @@
+import json
+import math
+import os
+
+from avro_tools.avro_type import (AvroBoolean, AvroBytes, AvroDate, AvroDecimal, AvroDouble, AvroFloat, AvroInt,
+                                  AvroLong, AvroNull, AvroString, AvroTimeMillis, AvroTimestampMillis, AvroType)
+from avro_tools.type_registry import AvroTypeRegistry, TYPE_REGISTRY
+from connectors.csv.column import Column
+from connectors.type_resolver import TypeResolver
+
+# Avro type name, as used in rule files, to AvroType class
+AVRO_TYPES = {avro_class.name(): avro_class for avro_class in (
+    AvroBoolean, AvroBytes, AvroDate, AvroDecimal, AvroDouble, AvroFloat, AvroInt, AvroLong, AvroNull, AvroString,
+    AvroTimeMillis, AvroTimestampMillis
+)}
+
+# Rules compiled per file path, with the modification time of the file they were compiled from
+_RULES = {}
+
+
+class InvalidTypeRuleException(Exception):
+    def __init__(self, rule, reason: str):
+        self.msg = f"Invalid type rule {json.dumps(rule)}: {reason}"
+
+    def __str__(self):
+        return f"ERROR {self.msg}"
+
+
+class TypeRules:
+    """
+    Declarative data type mapping rules, which take precedence over the type mapper. A rule maps a data type to an
+    Avro type when the column matches its conditions on precision, scale, maximum length and nullability, e.g.:
+
+        {
+            "rules": [
+                {"type": "NUMBER", "when": {"scale": 0, "precision": {"max": 9}}, "avro": "int"},
+                {"type": "NUMBER", "when": {"scale": 0, "precision": {"max": 18}}, "avro": "long"},
+                {"type": "varchar", "when": {"length": -1}, "avro": "bytes"}
+            ],
+            "overrides": {
+                "dbo.orders.amount": {"avro": "decimal", "precision": 12, "scale": 2}
+            }
+        }
+
+    A condition is either a value or a {"min": .., "max": ..} range (both inclusive and optional). Rules of a data type
+    are evaluated in file order and the first match wins. Overrides are keyed by `schema.table.column` and apply
+    regardless of the data type. Names are case-insensitive.
+    The rules are compiled into a dispatch table from normalised data type name to a tuple of pre-evaluated conditions,
+    so resolving a column is a dictionary lookup followed by a few comparisons.
+    """
+    CONDITIONS = ('precision', 'scale', 'length', 'nullable')
+
+    def __init__(self, rules: list[dict], overrides: dict[str, str | dict] | None = None,
+                 registry: AvroTypeRegistry = TYPE_REGISTRY):
+        self._normalise = TypeResolver.normalise
+        self._registry = registry
+        # Normalised data type -> tuple of (precision range, scale range, length range, nullable, result)
+        self._table = {}
+        for rule in rules:
+            if 'type' not in rule:
+                raise InvalidTypeRuleException(rule, "missing `type`")
+            when = rule.get('when', {})
+            unknown = set(when) - set(self.CONDITIONS)
+            if unknown:
+                raise InvalidTypeRuleException(rule, f"unknown conditions {sorted(unknown)}")
+            compiled = (self._range(rule, when.get('precision')), self._range(rule, when.get('scale')),
+                        self._range(rule, when.get('length')), when.get('nullable'), self._result(rule))
+            name = self._normalise(rule['type'])
+            self._table[name] = self._table.get(name, ()) + (compiled,)
+        # (schema, table, column) -> result
+        self._overrides = {}
+        for key, target in (overrides or {}).items():
+            parts = key.lower().split('.')
+            if len(parts) != 3:
+                raise InvalidTypeRuleException(key, "overrides must be keyed by `schema.table.column`")
+            self._overrides[tuple(parts)] = self._result(target if isinstance(target, dict) else {'avro': target})
+        # Raw data type name -> compiled rules
+        self._by_raw = {}
+
+    @classmethod
+    def load(cls, path: str) -> 'TypeRules':
+        """
+        Reads and compiles a rule file. Each file is compiled once and shared, until it is modified.
+        :param path: Path of the JSON rule file.
+        :return: TypeRules instance.
+        """
+        mtime = os.stat(path).st_mtime_ns
+        cached = _RULES.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'r') as fh:
+            content = json.load(fh)
+        rules = cls(content.get('rules', []), content.get('overrides'))
+        _RULES[path] = (mtime, rules)
+        return rules
+
+    @staticmethod
+    def _range(rule, condition) -> tuple[float, float] | None:
+        if condition is None:
+            return None
+        if isinstance(condition, dict):
+            return condition.get('min', -math.inf), condition.get('max', math.inf)
+        if isinstance(condition, int) and not isinstance(condition, bool):
+            return condition, condition
+        raise InvalidTypeRuleException(rule, f"invalid condition {condition}")
+
+    def _result(self, rule: dict) -> AvroType | tuple:
+        """
+        Compiles the target of a rule: an interned AvroType, or (AvroDecimal, precision, scale) where None stands for
+        the precision or scale of the column.
+        """
+        avro_class = AVRO_TYPES.get(rule.get('avro'))
+        if avro_class is None:
+            raise InvalidTypeRuleException(rule, f"`avro` must be one of {sorted(AVRO_TYPES)}")
+        if avro_class is AvroDecimal:
+            return avro_class, rule.get('precision'), rule.get('scale')
+        return self._registry.get(avro_class)
+
+    @staticmethod
+    def _matches(value, value_range) -> bool:
+        return value_range is None or (value is not None and value_range[0] <= value <= value_range[1])
+
+    def _target(self, result: AvroType | tuple, column: Column) -> AvroType:
+        if isinstance(result, AvroType):
+            return result
+        avro_class, precision, scale = result
+        precision = precision if precision is not None else column.numeric_precision
+        scale = scale if scale is not None else column.numeric_scale
+        if precision is None:
+            raise ValueError(f"No precision for the decimal type of column {column.column_name}")
+        return self._registry.get(avro_class, precision=precision, scale=scale or 0)
+
+    def match(self, column: Column) -> AvroType | None:
+        """
+        Returns the AvroType of a column given by the overrides or the first matching rule.
+        :param column: Column instance.
+        :return: Interned AvroType instance, or None if no rule applies.
+        """
+        if self._overrides:
+            key = (str(column.table_schema).lower(), str(column.table_name).lower(), column.column_name.lower())
+            result = self._overrides.get(key)
+            if result is not None:
+                return self._target(result, column)
+
+        rules = self._by_raw.get(column.data_type)
+        if rules is None:
+            rules = self._by_raw[column.data_type] = self._table.get(self._normalise(column.data_type), ())
+        for precision, scale, length, nullable, result in rules:
+            if (self._matches(column.numeric_precision, precision) and self._matches(column.numeric_scale, scale)
+                    and self._matches(column.character_maximum_length, length)
+                    and (nullable is None or nullable == column.is_nullable)):
+                return self._target(result, column)
+        return None
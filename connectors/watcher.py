@@ -0,0 +1,123 @@
+import os
+import threading
+from typing import Callable, Iterator
+
+from configuration import Configuration
+from connectors.generic_connector import GenericConnector
+
+
+class CatalogWatcher:
+    """
+    Watches the catalog of an open connector for changes, to regenerate only the tables whose definition changed.
+    Connectors that read files (see GenericConnector.get_source_paths) are watched by polling the size and modification
+    time of the files, and only read again when they change; other connectors are polled for the modification date of
+    each table or, if they do not report it, for their whole catalog.
+    A burst of changes is reported once the source has not changed for the debounce period.
+    """
+
+    def __init__(self, connector: GenericConnector, config: Configuration, interval: float = 5,
+                 debounce: float = 2):
+        """
+        :param connector: Open connector (see GenericConnector.__enter__).
+        :param config: Configuration properties.
+        :param interval: Seconds between polls of the source.
+        :param debounce: Seconds the source must be unchanged before changes are reported.
+        """
+        self._connector = connector
+        self._config = config
+        self._interval = interval
+        self._debounce = debounce
+        self._stopped = threading.Event()
+        self._source = self.source_signature()
+        self._signatures = self.table_signatures()
+
+    def stop(self) -> None:
+        """Stops watching; `changes` returns as soon as it is waiting."""
+        self._stopped.set()
+
+    def source_signature(self) -> tuple | None:
+        """
+        Returns the size and modification time of the files the catalog is read from.
+        :return: Tuple of (path, size, modification time) tuples, or None if the catalog is not read from files.
+        """
+        paths = self._connector.get_source_paths(self._config)
+        if paths is None:
+            return None
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature.append((path, None, None))
+                continue
+            signature.append((path, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def table_signatures(self) -> dict[tuple[str, str], object]:
+        """
+        Returns a value that changes when the definition of a table changes, for every table.
+        :return: Dictionary of (db_schema, table_name) to signature.
+        """
+        modify_dates = self._connector.get_modify_dates(self._config)
+        if modify_dates is not None:
+            return modify_dates
+        catalog = self._connector.get_catalog(self._config)
+        if catalog is None:
+            raise NotImplementedError(f"Connector {self._config.connector} does not support watching the catalog.")
+        return {
+            (schema, table): tuple(
+                (c.ordinal_position, c.column_name, c.data_type, c.numeric_precision, c.numeric_scale, c.is_nullable,
+                 c.character_maximum_length)
+                for c in sorted(columns, key=lambda c: c.ordinal_position))
+            for schema, tables in catalog.items() for table, columns in tables.items()
+        }
+
+    def _settle(self, poll: Callable[[], object], value: object) -> tuple[bool, object]:
+        """Polls until the value is the same for the debounce period. Returns False if stopped while waiting."""
+        while True:
+            if self._stopped.wait(self._debounce):
+                return False, value
+            current = poll()
+            if current == value:
+                return True, value
+            value = current
+
+    def _poll_tables(self) -> dict[tuple[str, str], object]:
+        self._connector.refresh(self._config)
+        return self.table_signatures()
+
+    def changes(self) -> Iterator[tuple[list[tuple[str, str]], list[tuple[str, str]]]]:
+        """
+        Waits for changes of the catalog, until stopped. The connector is refreshed (see GenericConnector.refresh)
+        before changes are reported, so that it returns the current definition of the changed tables.
+        Errors reading the source are printed and the source is polled again.
+        :return: Iterator of tuples - sorted lists of the changed or added tables, and of the dropped tables.
+        """
+        while not self._stopped.wait(self._interval):
+            try:
+                if self._source is not None:
+                    source = self.source_signature()
+                    if source == self._source:
+                        continue
+                    settled, source = self._settle(self.source_signature, source)
+                    if not settled:
+                        return
+                    signatures = self._poll_tables()
+                    self._source = source
+                else:
+                    signatures = self._poll_tables()
+                    if signatures == self._signatures:
+                        continue
+                    settled, signatures = self._settle(self._poll_tables, signatures)
+                    if not settled:
+                        return
+            except Exception as e:
+                print(f"FAIL: catalog could not be read.\n\t{e}")
+                continue
+
+            changed = sorted(table for table, signature in signatures.items()
+                             if self._signatures.get(table) != signature)
+            dropped = sorted(table for table in self._signatures if table not in signatures)
+            self._signatures = signatures
+            if changed or dropped:
+                yield changed, dropped
@@ -1,18 +1,26 @@
 import argparse
+import contextlib
+import functools
 import json
 import os
 import sys
+import threading
 
 from configuration import Configuration, ConfigProperties
-from connectors.sql_server.connector import SqlServerConnector
-from connectors.csv.connector import CsvConnector
 from avro_tools.generator import AvroGenerator
+from avro_tools.state import GenerationState
+from avro_tools.writers import WRITERS, BackgroundWriter, get_writer, schema_file_name
+from connectors.generic_connector import GenericConnector
+from connectors.registry import ConnectorRegistry
 
-# Supported connectors
-CONNECTORS_MAP = {
-    "sqlserver": SqlServerConnector,
-    "csv": CsvConnector
-}
+# The modules of optional features (asyncio, the HTTP server, the Schema Registry client, the compatibility checker,
+# the catalog snapshot and watcher) are imported by the functions using them, to keep the startup of a run short.
+
+# Supported connectors, imported when selected
+CONNECTORS_MAP = ConnectorRegistry({
+    "sqlserver": "connectors.sql_server.connector:SqlServerConnector",
+    "csv": "connectors.csv.connector:CsvConnector"
+})
 
 
 def parse_args() -> dict:
@@ -31,9 +39,92 @@ def parse_args() -> dict:
     parser.add_argument('--server', type=str, dest=ConfigProperties.DB_SERVER, default=None)
     parser.add_argument('--database', type=str, dest=ConfigProperties.DB_NAME, default=None)
     parser.add_argument('--schema', type=str, dest=ConfigProperties.DB_SCHEMA, default=None)
-    parser.add_argument('--csv', type=str, dest=ConfigProperties.CSV_PATH, default=None)
+    parser.add_argument('--csv', type=str, dest=ConfigProperties.CSV_PATH, default=None,
+                        help="CSV file, directory or glob pattern with the catalog (optionally .gz or .zst "
+                             + "compressed).")
+    parser.add_argument('--csv-index', action='store_true', dest=ConfigProperties.CSV_INDEX,
+                        help="Index the CSV file by table (in a sidecar file next to it) and read only the requested "
+                             + "tables.")
+    parser.add_argument('--csv-jobs', type=int, dest=ConfigProperties.CSV_JOBS, default=1,
+                        help="Number of processes used to parse the CSV file.")
+    parser.add_argument('--type-rules', type=str, dest=ConfigProperties.TYPE_RULES, default=None,
+                        help="JSON file with data type mapping rules and per-column overrides, applied before the "
+                             + "data type mapper.")
     parser.add_argument('--out', type=str, dest=ConfigProperties.OUTPUT_DIR, default=os.getcwd())
     parser.add_argument('--nullable', type=bool, dest=ConfigProperties.ALL_NULLABLE, default=False)
+    parser.add_argument('--bulk', type=str, dest=ConfigProperties.BULK, default=None, choices=('schema', 'database'),
+                        help="Read the column catalog with one query per DB schema or for the whole database.")
+    parser.add_argument('--workers', type=int, dest=ConfigProperties.WORKERS, default=1,
+                        help="Number of tables introspected concurrently, each with its own DB connection.")
+    parser.add_argument('--include', type=str, dest=ConfigProperties.INCLUDE, default=None,
+                        help="Comma separated table name patterns (* and ? wildcards, optionally schema.table) to "
+                             + "include when discovering tables.")
+    parser.add_argument('--exclude', type=str, dest=ConfigProperties.EXCLUDE, default=None,
+                        help="Comma separated table name patterns to exclude when discovering tables.")
+    parser.add_argument('--min-rows', type=int, dest=ConfigProperties.MIN_ROWS, default=None,
+                        help="Only discover tables with at least this number of rows.")
+    parser.add_argument('--modified-since', type=str, dest=ConfigProperties.MODIFIED_SINCE, default=None,
+                        help="Only discover tables whose definition was modified since this date (YYYY-MM-DD).")
+    parser.add_argument('--page-size', type=int, dest=ConfigProperties.PAGE_SIZE, default=1000,
+                        help="Number of tables fetched per discovery query.")
+    parser.add_argument('--cache', type=str, dest=ConfigProperties.CACHE_PATH, default=None,
+                        help="Path of a local catalog snapshot (SQLite) to read the catalog from instead of the "
+                             + "source.")
+    parser.add_argument('--cache-ttl', type=float, dest=ConfigProperties.CACHE_TTL, default=3600,
+                        help="Seconds after which the catalog snapshot is refreshed from the source.")
+    parser.add_argument('--refresh-cache', action='store_true', dest=ConfigProperties.CACHE_REFRESH,
+                        help="Discard the catalog snapshot and read the catalog from the source.")
+    parser.add_argument('--offline', action='store_true', dest=ConfigProperties.OFFLINE,
+                        help="Generate schemas from the catalog snapshot only (defaults to .avro_catalog.sqlite), "
+                             + "regardless of its age, without connecting to the source.")
+    parser.add_argument('--incremental', action='store_true', dest=ConfigProperties.INCREMENTAL,
+                        help="Only introspect and rewrite the tables whose definition changed since the last run.")
+    parser.add_argument('--state', type=str, dest=ConfigProperties.STATE_PATH, default=None,
+                        help=f"State file of incremental runs. Defaults to {GenerationState.FILE_NAME} in the output "
+                             + "folder.")
+    parser.add_argument('--output-format', type=str, dest=ConfigProperties.OUTPUT_FORMAT, default='files',
+                        choices=tuple(WRITERS),
+                        help="Layout of the output: one file per schema (files), one file per schema in 256 "
+                             + "subdirectories (sharded), or a single bundle with an index (jsonl, tar).")
+    parser.add_argument('--compact', action='store_true', dest=ConfigProperties.COMPACT,
+                        help="Write schemas without indentation, using orjson if it is installed.")
+    parser.add_argument('--writers', type=int, dest=ConfigProperties.WRITERS, default=1,
+                        help="Number of background threads writing the output.")
+    parser.add_argument('--fsync', action='store_true', dest=ConfigProperties.FSYNC,
+                        help="Flush the output to disk before committing it.")
+    parser.add_argument('--compat-report', type=str, dest=ConfigProperties.COMPAT_REPORT, default=None,
+                        help="Path of a JSON report of the BACKWARD and FORWARD compatibility of the generated schemas "
+                             + "with the schema files already in the output folder.")
+    parser.add_argument('--validate', action='store_true', dest=ConfigProperties.VALIDATE,
+                        help="Validate the schemas before they are written or published. Invalid schemas are reported "
+                             + "as failures and not written.")
+    parser.add_argument('--registry', type=str, dest=ConfigProperties.REGISTRY_URL, default=None,
+                        help="URL of a Schema Registry to publish the schemas to, e.g. http://localhost:8081.")
+    parser.add_argument('--registry-subject', type=str, dest=ConfigProperties.REGISTRY_SUBJECT, default=None,
+                        help="Template of the subject names, with the fields {namespace}, {name}, {server}, "
+                             + "{database} and {schema}. Defaults to {namespace}.{name}-value.")
+    parser.add_argument('--registry-workers', type=int, dest=ConfigProperties.REGISTRY_WORKERS, default=4,
+                        help="Number of concurrent requests to the Schema Registry.")
+    parser.add_argument('--registry-refresh', action='store_true', dest=ConfigProperties.REGISTRY_REFRESH,
+                        help="Confirm that the schemas published by previous runs are still registered, instead of "
+                             + "skipping them, and register them again if they are not.")
+    parser.add_argument('--watch', action='store_true', dest=ConfigProperties.WATCH,
+                        help="Keep running and regenerate the schemas of the tables whose definition changes. The CSV "
+                             + "files are watched for changes; databases are polled. The catalog snapshot is not used.")
+    parser.add_argument('--watch-interval', type=float, dest=ConfigProperties.WATCH_INTERVAL, default=5,
+                        help="Seconds between checks of the catalog in watch mode.")
+    parser.add_argument('--watch-debounce', type=float, dest=ConfigProperties.WATCH_DEBOUNCE, default=2,
+                        help="Seconds the catalog must be unchanged before the changed tables are regenerated.")
+    parser.add_argument('--serve', type=str, dest=ConfigProperties.SERVE, default=None,
+                        help="Serve the schemas of the tables over HTTP on [HOST:]PORT, at "
+                             + "/schemas/<connector>/<schema>/<table>[?mapper=<mapper>], instead of writing them.")
+    parser.add_argument('--serve-cache-size', type=int, dest=ConfigProperties.SERVE_CACHE_SIZE, default=1024,
+                        help="Maximum number of schemas cached by the server.")
+    parser.add_argument('--serve-cache-ttl', type=float, dest=ConfigProperties.SERVE_CACHE_TTL, default=300,
+                        help="Seconds the server caches a schema.")
+    parser.add_argument('--prune', action='store_true', dest=ConfigProperties.PRUNE,
+                        help="Delete the schema files of tables that no longer exist. Only applies when all tables are "
+                             + "discovered and generated successfully.")
     return vars(parser.parse_args())
 
 
@@ -45,35 +136,357 @@ def write_schema_to_file(avro_schema: dict, output_path: str, indent: int = 4, *
     :param indent: indentation size in JSON file.
     :return: None.
     """
-    file_name = f"{avro_schema['namespace']}_{avro_schema['name']}".replace('.', '_') + '.avsc'
-    file_path = os.path.join(output_path, file_name)
+    file_path = os.path.join(output_path, schema_file_name(avro_schema))
     with open(file_path, 'w') as fh:
         json.dump(avro_schema, fh, indent=indent, **kwargs)
 
 
-def run(config: Configuration):
+def schema_scope(config: Configuration, table: tuple[str, str]) -> tuple[str, str, str]:
+    return config.db_server or '', config.db_name or '', table[0] or ''
+
+
+def configured_tables(config: Configuration) -> list[tuple[str, str]] | None:
+    """
+    Returns the tables specified in the configuration properties, if any.
+    :param config: Configuration properties.
+    :return: List of tuples - (db_schema, table_name) - or None if no tables are specified.
+    """
+    if not config.connector_tables:
+        return None
+    return [(config.db_schema, table) for table in config.connector_tables.split(',')]
+
+
+def get_publisher(config: Configuration) -> BackgroundWriter | None:
+    """
+    Returns the publisher of the schemas to the configured Schema Registry, if any.
+    :param config: Configuration properties.
+    :return: BackgroundWriter publishing through a SchemaPublisher, or None if no registry is configured.
+    """
+    if not config.registry_url:
+        return None
+    from avro_tools.registry import SchemaPublisher, SchemaRegistryClient
+
+    client = SchemaRegistryClient(config.registry_url, pool_size=config.registry_workers)
+    cache_path = os.path.join(config.avro_output_path, SchemaPublisher.CACHE_FILE_NAME)
+    return BackgroundWriter(SchemaPublisher(client, config.registry_subject, cache_path, config.registry_refresh),
+                            workers=config.registry_workers)
+
+
+def get_connector(config: Configuration) -> type[GenericConnector] | functools.partial | None:
+    """
+    Returns the connector factory for the configured connector, wrapped in a SnapshotConnector if a catalog snapshot
+    is to be used.
+    :param config: Configuration properties.
+    :return: Callable that creates the connector from the configuration; None if the connector is not supported.
+    """
     connector = CONNECTORS_MAP.get(config.connector)
-    if not connector:
-        print(f"Invalid connector: {config.connector}")
-        sys.exit()
-    with connector(config) as connector:
+    if connector and (config.connector_cache_path or config.connector_offline):
+        from connectors.snapshot import SnapshotConnector
+
+        return functools.partial(SnapshotConnector, connector)
+    return connector
+
+
+def run(config: Configuration, connector: GenericConnector | None = None,
+        tables: list[tuple[str, str]] | None = None) -> list[tuple[str, str]]:
+    """
+    Generates and writes the AVRO schemas of the configured tables. With more than one worker, tables are introspected
+    concurrently. Schemas are written in the background (see BackgroundWriter) while the next tables are generated.
+    :param config: Configuration properties.
+    :param connector: Open connector to reuse (see `watch`). If not specified, the configured connector is opened.
+    :param tables: Tables to generate, instead of the configured or discovered ones.
+    :return: List of tables whose schema could not be generated.
+    """
+    if connector is None:
+        connector_factory = get_connector(config)
+        if not connector_factory:
+            print(f"Invalid connector: {config.connector}")
+            sys.exit()
+        connector_context = connector_factory(config)
+    else:
+        connector_context = contextlib.nullcontext(connector)
+    # Files of other tables can only be told apart when every table is discovered, without filters.
+    partial = tables is not None or any((config.connector_tables, config.connector_include, config.connector_exclude,
+                                         config.connector_min_rows, config.connector_modified_since))
+    failed = []
+    state = None
+    writer = BackgroundWriter(get_writer(config), workers=config.avro_writers)
+    publisher = get_publisher(config)
+    validator = None
+    if config.avro_validate:
+        from avro_tools.validation import SchemaValidator
+
+        validator = SchemaValidator()
+    checker = None
+    if config.avro_compat_report:
+        if not writer.writer.INCREMENTAL:
+            raise ValueError(f"The compatibility report requires one file per schema, not {config.avro_output_format}.")
+        from avro_tools.compatibility import CompatibilityChecker
+
+        checker = CompatibilityChecker(config.avro_output_path)
+    if config.avro_incremental:
+        state = GenerationState.load(
+            config.avro_state_path or os.path.join(config.avro_output_path, GenerationState.FILE_NAME))
+
+    with connector_context as connector, writer, publisher or contextlib.nullcontext():
         # if TABLES is specified, generate avro schemas for those tables; else, get list of existing tables using
         # connector and generate avro schema for each identified table.
-        if config.connector_tables:
-            table_names = config.connector_tables.split(',')
-            tables = [(config.db_schema, table) for table in table_names]
+        if tables is None:
+            tables = configured_tables(config) or connector.get_tables(config)
+        modify_dates = connector.get_modify_dates(config) if state else None
+        seen = set()
+        discovered = 0
+        signature = GenerationState.signature(config) if state else None
+        # Names of the files of the tables of this run, written or not
+        produced = set()
+        # Unchanged schemas: skipped in incremental mode (main thread) and left as they were by the writer
+        skipped = 0
+        unchanged = 0
+        written = 0
+        published = 0
+        # Tables whose schema could not be written
+        unwritten = []
+        counts_lock = threading.Lock()
+
+        def pending(all_tables):
+            # In incremental mode, skip the tables whose definition did not change since the last run.
+            nonlocal skipped, discovered
+            for t in all_tables:
+                discovered += 1
+                if state:
+                    key = state.key(config, t)
+                    seen.add(key)
+                    if state.is_current(key, (modify_dates or {}).get(t), config.avro_output_path, signature):
+                        produced.add(state.file_name(key))
+                        skipped += 1
+                        continue
+                yield t
+
+        def report(table, e):
+            print(f"FAIL: table {table[0]}.{table[1]} could not be generated.\n\t{e}")
+            failed.append(table)
+
+        def done(table, is_written, e):
+            nonlocal written, unchanged
+            with counts_lock:
+                if e is not None:
+                    print(f"FAIL: schema of table {table[0]}.{table[1]} could not be written.\n\t{e}")
+                    if table not in failed:
+                        failed.append(table)
+                    unwritten.append(table)
+                elif is_written:
+                    written += 1
+                else:
+                    unchanged += 1
+
+        def done_publishing(table, is_published, e):
+            nonlocal published
+            with counts_lock:
+                if e is not None:
+                    print(f"FAIL: schema of table {table[0]}.{table[1]} could not be published.\n\t{e}")
+                    if table not in failed:
+                        failed.append(table)
+                elif is_published:
+                    published += 1
+
+        avro_gen = AvroGenerator(connector)
+        for table, avro_schema in avro_gen.iter_schemas(pending(tables), config, workers=config.connector_workers,
+                                                        on_error=report):
+            if validator:
+                is_valid, e = validator.validate(avro_schema)
+                if not is_valid:
+                    print(f"FAIL: schema of table {table[0]}.{table[1]} is not valid.\n\t{e}")
+                    failed.append(table)
+                    continue
+            if publisher:
+                publisher.submit(avro_schema, scope=schema_scope(config, table),
+                                 callback=functools.partial(done_publishing, table))
+            file_name = writer.writer.file_name(avro_schema)
+            produced.add(file_name)
+            if checker:
+                # The previous file is read before the schema is queued to overwrite it.
+                checker.check(avro_schema, file_name)
+            if state and not state.record(state.key(config, table), (modify_dates or {}).get(table), avro_schema,
+                                          file_name, config.avro_output_path, signature):
+                skipped += 1
+                continue
+            writer.submit(avro_schema, scope=schema_scope(config, table), callback=functools.partial(done, table))
+        writer.flush()
+        if publisher:
+            publisher.flush()
+        if not discovered and not partial:
+            # An empty discovery (e.g. a DB schema without tables, or a wrong one) cannot tell which files are stale.
+            print("No tables found: schema files of other tables are not checked.")
+            partial = True
+
+        # Files of other tables can only be told apart when every table was discovered and generated.
+        stale = writer.writer.stale(config, produced) if not partial and not failed else []
+        for file_name in stale:
+            print(f"{'REMOVED' if config.avro_prune else 'STALE'}: schema file {file_name} has no table.")
+        if config.avro_prune:
+            writer.writer.remove(stale)
+
+        if checker:
+            compat_report = checker.report(produced if not partial and not failed else None)
+            with open(config.avro_compat_report, 'w') as fh:
+                json.dump(compat_report, fh, indent=2)
+            print(f"{compat_report['summary']['backward_incompatible']} schemas not backward compatible, "
+                  + f"{compat_report['summary']['forward_incompatible']} not forward compatible "
+                  + f"(see {config.avro_compat_report}).")
+
+    if state:
+        # Tables are only known to be dropped if the connector reports every table, or if they were all discovered.
+        if modify_dates is not None:
+            dropped = state.drop_missing(config, {state.key(config, t) for t in modify_dates})
+        elif not partial:
+            dropped = state.drop_missing(config, seen)
         else:
-            tables = connector.get_tables(config)
+            dropped = []
+        for table in unwritten:
+            state.forget(state.key(config, table))
+        for entry in dropped:
+            print(f"DROPPED: table {entry['schema']}.{entry['table']} no longer exists (schema file {entry['file']}).")
+        state.save()
 
-        for table in tables:
-            table_name = table[1]
-            avro_gen = AvroGenerator(connector)
-            avro_schema = avro_gen.get_schema(table=table, avro_schema_name=table_name, config=config)
-            write_schema_to_file(avro_schema=avro_schema, output_path=config.avro_output_path)
+    summary = f"{written} schemas written, {skipped + unchanged} unchanged"
+    if state:
+        summary += f", {len(dropped)} dropped"
+    summary += f", {len(stale)} {'removed' if config.avro_prune else 'stale'}"
+    if publisher:
+        summary += f", {published} published"
+    summary += f", {len(failed)} failed"
+    print(summary)
+    return failed
+
+
+def watch(config: Configuration) -> None:
+    """
+    Generates the schemas of the configured tables (see `run`) and keeps watching the catalog, regenerating the tables
+    whose definition changes (see CatalogWatcher), until interrupted. The connector stays open between runs, so the
+    catalog of CSV files is only read again when they change. When tables are dropped, every table is generated again,
+    so that their schema files are reported (or removed, with --prune).
+    :param config: Configuration properties.
+    :return: None.
+    """
+    if config.connector_offline:
+        raise ValueError("The catalog cannot be watched offline.")
+    # The catalog snapshot is not used: the source itself is watched.
+    connector_class = CONNECTORS_MAP.get(config.connector)
+    if not connector_class:
+        print(f"Invalid connector: {config.connector}")
+        sys.exit()
+
+    if config.avro_output_format not in WRITERS:
+        raise ValueError(f"Invalid output format: {config.avro_output_format}. Valid options: {tuple(WRITERS)}")
+    from connectors.watcher import CatalogWatcher
+
+    with connector_class(config) as connector:
+        watcher = CatalogWatcher(connector, config, config.watch_interval, config.watch_debounce)
+        run(config, connector=connector)
+        print(f"WATCHING: catalog of {config.connector} every {config.watch_interval:g}s.")
+        for changed, dropped in watcher.changes():
+            for table in dropped:
+                print(f"DROPPED: table {table[0]}.{table[1]} no longer exists.")
+            if dropped or not WRITERS[config.avro_output_format].INCREMENTAL:
+                run(config, connector=connector)
+                continue
+            selected = set(configured_tables(config) or connector.get_tables(config))
+            tables = [table for table in changed if table in selected]
+            if tables:
+                print(f"CHANGED: {', '.join(f'{table[0]}.{table[1]}' for table in tables)}")
+                run(config, connector=connector, tables=tables)
+
+
+def serve(config: Configuration) -> None:
+    """
+    Serves the schemas of the tables of the configured source over HTTP (see SchemaServer), until interrupted.
+    :param config: Configuration properties, with the address to listen on as [HOST:]PORT.
+    :return: None.
+    """
+    from avro_tools.server import SchemaCache, SchemaServer
+
+    host, _, port = config.serve.rpartition(':')
+    cache = SchemaCache(config.serve_cache_size, config.serve_cache_ttl)
+    with SchemaServer((host or '127.0.0.1', int(port)), config, CONNECTORS_MAP, cache) as server:
+        print(f"SERVING: schemas at {server.url}/schemas/<connector>/<schema>/<table>")
+        server.serve_forever()
+
+
+async def run_async(config: Configuration) -> list[tuple[str, str]]:
+    """
+    Asynchronous counterpart of `run`, for embedding the generator in an asyncio application. Catalog queries run in a
+    thread pool limited to the configured number of workers, while schemas are composed and written as soon as their
+    columns are available. Incremental runs, publishing, the compatibility report and pruning are only supported by
+    `run`.
+    :param config: Configuration properties.
+    :return: List of tables whose schema could not be generated.
+    :raises ValueError: If the connector is not supported, or an option only supported by `run` is set.
+    """
+    unsupported = [option for option, value in (('--incremental', config.avro_incremental),
+                                                ('--registry', config.registry_url),
+                                                ('--compat-report', config.avro_compat_report),
+                                                ('--prune', config.avro_prune)) if value]
+    if unsupported:
+        raise ValueError(f"Options not supported by the asynchronous run: {', '.join(unsupported)}.")
+    import asyncio
+    from avro_tools.generator import AsyncAvroGenerator
+    from connectors.async_connector import AsyncConnector
+
+    connector = get_connector(config)
+    if not connector:
+        raise ValueError(f"Invalid connector: {config.connector}")
+    failed = []
+    writer = get_writer(config)
+    validator = None
+    if config.avro_validate:
+        from avro_tools.validation import SchemaValidator
+
+        validator = SchemaValidator()
+
+    async def process(table: tuple[str, str]):
+        try:
+            avro_gen = AsyncAvroGenerator(async_connector)
+            avro_schema = await avro_gen.get_schema_async(table=table, avro_schema_name=table[1], config=config)
+            if validator:
+                # Parsing the schema is CPU bound: it runs in a thread, not in the event loop.
+                is_valid, e = await asyncio.to_thread(validator.validate, avro_schema)
+                if not is_valid:
+                    print(f"FAIL: schema of table {table[0]}.{table[1]} is not valid.\n\t{e}")
+                    failed.append(table)
+                    return
+            await asyncio.to_thread(writer.write, avro_schema, scope=schema_scope(config, table))
+        except Exception as e:
+            print(f"FAIL: table {table[0]}.{table[1]} could not be generated.\n\t{e}")
+            failed.append(table)
+
+    connector_instance = await asyncio.to_thread(connector, config)
+    with writer:
+        async with AsyncConnector(connector_instance, concurrency=config.connector_workers) as async_connector:
+            tasks = []
+            if config.connector_tables:
+                tasks = [asyncio.create_task(process(table)) for table in configured_tables(config)]
+            else:
+                async for table in async_connector.get_tables(config):
+                    tasks.append(asyncio.create_task(process(table)))
+            await asyncio.gather(*tasks)
+    return failed
 
 
 if __name__ == '__main__':
     args = parse_args() if len(sys.argv) > 1 else {}
-    run(config=Configuration(props=args))
+    configuration = Configuration(props=args)
+    if configuration.serve:
+        try:
+            serve(configuration)
+        except KeyboardInterrupt:
+            pass
+        sys.exit()
+    if configuration.watch:
+        try:
+            watch(configuration)
+        except KeyboardInterrupt:
+            pass
+        sys.exit()
+    failed_tables = run(config=configuration)
 
-    sys.exit()
+    sys.exit(1 if failed_tables else None)
@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from avro_tools.compatibility import CompatibilityChecker, diff, readable
+from avro_tools.writers import DirectoryWriter
+
+DECIMAL = {"type": "bytes", "logicalType": "decimal", "precision": 18, "scale": 2}
+
+
+def record(*fields, name='ORDERS'):
+    return {"type": "record", "name": name, "namespace": "com.test", "fields": list(fields)}
+
+
+class TestCompatibility(unittest.TestCase):
+
+    def test_readable(self):
+        """Tests the schema resolution rules"""
+        self.assertTrue(readable('long', 'int'))
+        self.assertFalse(readable('int', 'long'))
+        self.assertTrue(readable(['null', 'int'], 'int'))
+        self.assertFalse(readable('int', ['null', 'int']))
+        self.assertTrue(readable({"type": "string"}, 'bytes'))
+        self.assertTrue(readable(DECIMAL, dict(DECIMAL)))
+        self.assertFalse(readable(DECIMAL, {**DECIMAL, "precision": 20}))
+        self.assertTrue(readable({"type": "array", "items": "double"}, {"type": "array", "items": "float"}))
+        self.assertFalse(readable({"type": "enum", "name": "E", "symbols": ["A"]},
+                                  {"type": "enum", "name": "E", "symbols": ["A", "B"]}))
+        # Named types only resolve by name (regardless of the namespace) or alias.
+        self.assertFalse(readable(record(name='ORDERS'), record(name='CUSTOMERS')))
+        self.assertTrue(readable({**record(name='ORDERS'), "namespace": "com.other"}, record(name='ORDERS')))
+        self.assertTrue(readable({**record(name='ORDERS'), "aliases": ["com.test.CUSTOMERS"]},
+                                 record(name='CUSTOMERS')))
+
+    def test_diff(self):
+        """Tests the report of added, removed and type-changed fields"""
+        previous = record({"name": "ID", "type": "int"}, {"name": "NAME", "type": "string"},
+                          {"name": "AMOUNT", "type": ["null", DECIMAL], "default": None})
+        current = record({"name": "ID", "type": "long"}, {"name": "AMOUNT", "type": ["null", DECIMAL], "default": None},
+                         {"name": "CREATED", "type": ["null", "long"], "default": None})
+        result = diff(previous, current)
+        self.assertEqual([{"name": "CREATED", "type": ["null", "long"], "default": True}], result['added_fields'])
+        self.assertEqual([{"name": "NAME", "type": "string", "default": False}], result['removed_fields'])
+        self.assertEqual([{"name": "ID", "from": "int", "to": "long", "backward": True, "forward": False}],
+                         result['changed_fields'])
+        # The new schema can read old data, but old readers cannot read ID as int nor do without NAME.
+        self.assertTrue(result['backward'])
+        self.assertFalse(result['forward'])
+
+        # A new field without a default cannot be read from old data.
+        self.assertFalse(diff(previous, record(*previous['fields'], {"name": "X", "type": "int"}))['backward'])
+
+    def test_checker(self):
+        """Tests the report against the previous output, where unchanged schemas are recognised by the manifest"""
+        orders = record({"name": "ID", "type": "int"})
+        customers = record({"name": "ID", "type": "int"}, name='CUSTOMERS')
+        items = record({"name": "ID", "type": "int"}, name='ITEMS')
+        with tempfile.TemporaryDirectory() as output_path:
+            with DirectoryWriter(output_path) as writer:
+                for avro_schema in (orders, customers, items):
+                    writer.write(avro_schema)
+            with open(os.path.join(output_path, 'com_test_BROKEN.avsc'), 'w') as fh:
+                fh.write('{')
+
+            checker = CompatibilityChecker(output_path)
+            self.assertIsNone(checker.check(orders, 'com_test_ORDERS.avsc'))
+            changed = checker.check(record({"name": "ID", "type": "string"}, name='CUSTOMERS'),
+                                    'com_test_CUSTOMERS.avsc')
+            self.assertEqual('changed', changed['status'])
+            self.assertFalse(changed['backward'])
+            self.assertEqual('added', checker.check(record(name='NEW'), 'com_test_NEW.avsc')['status'])
+            self.assertEqual('invalid', checker.check(record(name='BROKEN'), 'com_test_BROKEN.avsc')['status'])
+
+            report = checker.report(produced=set())
+            self.assertEqual({"unchanged": 1, "added": 1, "removed": 1, "changed": 1, "invalid": 1,
+                              "backward_incompatible": 2, "forward_incompatible": 2}, report['summary'])
+            self.assertEqual(['com_test_BROKEN.avsc', 'com_test_CUSTOMERS.avsc', 'com_test_ITEMS.avsc',
+                              'com_test_NEW.avsc'], [result['file'] for result in report['schemas']])
+            json.dumps(report)
+
+    def test_checker_renamed_files(self):
+        """Tests that schemas whose file name changed are compared with their previous version"""
+        orders = record({"name": "ID", "type": "int"})
+        with tempfile.TemporaryDirectory() as output_path:
+            with DirectoryWriter(output_path) as writer:
+                writer.write(orders)
+                writer.write(record({"name": "ID", "type": "int"}, name='CUSTOMERS'))
+
+            checker = CompatibilityChecker(output_path)
+            self.assertIsNone(checker.check(orders, '12/com_test_ORDERS.avsc'))
+            moved = {**record({"name": "ID", "type": "long"}, name='CUSTOMERS'), "namespace": "com.other"}
+            changed = checker.check(moved, 'com_other_CUSTOMERS.avsc')
+            self.assertEqual('changed', changed['status'])
+            self.assertEqual('com_test_CUSTOMERS.avsc', changed['previous_file'])
+            self.assertTrue(changed['backward'])
+            self.assertFalse(changed['forward'])
+
+            report = checker.report(produced={'12/com_test_ORDERS.avsc', 'com_other_CUSTOMERS.avsc'})
+            self.assertEqual({"unchanged": 1, "added": 0, "removed": 0, "changed": 1, "invalid": 0,
+                              "backward_incompatible": 0, "forward_incompatible": 1}, report['summary'])
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from avro_tools.fingerprint import content_fingerprint, crc64_avro, parsing_canonical_form, schema_fingerprint
+from avro_tools.manifest import SchemaManifest
+
+
+class TestFingerprint(unittest.TestCase):
+    SCHEMA = {
+        "type": "record",
+        "name": "ORDERS",
+        "namespace": "com.test",
+        "doc": "Orders",
+        "fields": [
+            {"name": "ID", "type": {"type": "long"}},
+            {"name": "AMOUNT", "type": ["null", {"type": "bytes", "logicalType": "decimal", "precision": 18,
+                                                 "scale": 2}], "default": None},
+            {"name": "STATUS", "type": {"type": "enum", "name": "Status", "symbols": ["NEW", "DONE"]}},
+            {"name": "PREVIOUS", "type": ["null", "Status"], "default": None},
+            {"name": "TAGS", "type": {"type": "map", "values": {"type": "array", "items": "string"}}}
+        ]
+    }
+
+    def test_canonical_form(self):
+        """Tests the Parsing Canonical Form of a schema with named types, logical types and references"""
+        self.assertEqual(
+            '{"name":"com.test.ORDERS","type":"record","fields":[{"name":"ID","type":"long"},'
+            + '{"name":"AMOUNT","type":["null","bytes"]},'
+            + '{"name":"STATUS","type":{"name":"com.test.Status","type":"enum","symbols":["NEW","DONE"]}},'
+            + '{"name":"PREVIOUS","type":["null","com.test.Status"]},'
+            + '{"name":"TAGS","type":{"type":"map","values":{"type":"array","items":"string"}}}]}',
+            parsing_canonical_form(self.SCHEMA))
+
+    def test_crc64_avro(self):
+        """Tests the fingerprints given by the Avro specification"""
+        self.assertEqual(0xc15d213aa4d7a795, crc64_avro(b''))
+        self.assertEqual(7195948357588979594, schema_fingerprint("null"))
+        self.assertEqual(schema_fingerprint("int"), schema_fingerprint({"type": "int"}))
+
+    def test_content_fingerprint(self):
+        """Tests that the content fingerprint covers the attributes left out of the canonical form"""
+        changed = json.loads(json.dumps(self.SCHEMA))
+        changed['fields'][1]['type'][1]['precision'] = 20
+        self.assertEqual(schema_fingerprint(self.SCHEMA), schema_fingerprint(changed))
+        self.assertNotEqual(content_fingerprint(self.SCHEMA), content_fingerprint(changed))
+        self.assertEqual(content_fingerprint(self.SCHEMA), content_fingerprint(dict(reversed(self.SCHEMA.items()))))
+
+
+class TestSchemaManifest(unittest.TestCase):
+
+    def test_update(self):
+        """Tests that a file is only written when its schema changes"""
+        with tempfile.TemporaryDirectory() as output_path:
+            writes = []
+
+            def write(file_path):
+                writes.append(file_path)
+                with open(file_path, 'w') as fh:
+                    json.dump(schema, fh)
+
+            schema = TestFingerprint.SCHEMA
+            manifest = SchemaManifest(output_path)
+            self.assertTrue(manifest.update(schema, 'orders.avsc', ('', '', 'dbo'), write))
+            manifest.save()
+
+            manifest = SchemaManifest.load(output_path)
+            self.assertFalse(manifest.update(schema, 'orders.avsc', ('', '', 'dbo'), write))
+            # Touched files are compared by content.
+            os.utime(os.path.join(output_path, 'orders.avsc'), ns=(0, 0))
+            self.assertFalse(manifest.update(schema, 'orders.avsc', ('', '', 'dbo'), write))
+            schema = {**schema, "doc": "Changed"}
+            self.assertTrue(manifest.update(schema, 'orders.avsc', ('', '', 'dbo'), write))
+            self.assertEqual(2, len(writes))
+
+
+if __name__ == '__main__':
+    pytest.main()
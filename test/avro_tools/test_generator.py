@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+
+import pytest
+
+from avro_tools.avro_type import AvroInt
+from avro_tools.field import AvroField
+from avro_tools.generator import AvroGenerator
+from configuration import ConfigProperties, Configuration
+from connectors.generic_connector import GenericConnector
+
+
+class SlowConnector(GenericConnector):
+    """Connector whose tables have a single column, with a delay inversely proportional to the table number"""
+
+    def __init__(self):
+        super().__init__()
+        self.requested = []
+        self.outstanding = 0
+        self.max_outstanding = 0
+        self._lock = threading.Lock()
+
+    def get_columns(self, table, config):
+        with self._lock:
+            self.requested.append(table)
+            self.outstanding += 1
+            self.max_outstanding = max(self.max_outstanding, self.outstanding)
+        try:
+            if table[1] == 'MISSING':
+                raise KeyError(table)
+            time.sleep(0.01 / int(table[1][1:]))
+            return [AvroField(name='ID', typ=AvroInt(), nullable=False)]
+        finally:
+            with self._lock:
+                self.outstanding -= 1
+
+
+class TestAvroGenerator(unittest.TestCase):
+    CONFIG = Configuration({ConfigProperties.NAMESPACE: 'com.test', ConfigProperties.CONNECTOR: 'csv'})
+
+    def test_iter_schemas(self):
+        """Tests that schemas are yielded in the order of the tables, whatever the number of workers"""
+        tables = [('dbo', f"T{i}") for i in range(1, 21)]
+        for workers in (1, 4):
+            schemas = list(AvroGenerator(SlowConnector()).iter_schemas(tables, self.CONFIG, workers=workers))
+            self.assertEqual(tables, [table for table, _ in schemas])
+            self.assertEqual(['T1', 'T2'], [avro_schema['name'] for _, avro_schema in schemas[:2]])
+            self.assertEqual('com.test', schemas[0][1]['namespace'])
+
+    def test_iter_schemas_prefetch(self):
+        """Tests that tables are consumed lazily, at most `prefetch` ahead of the consumer"""
+        connector = SlowConnector()
+        tables = (('dbo', f"T{i}") for i in range(1, 101))
+        schemas = AvroGenerator(connector).iter_schemas(tables, self.CONFIG, workers=2, prefetch=3)
+        self.assertEqual(('dbo', 'T1'), next(schemas)[0])
+        self.assertLessEqual(len(connector.requested), 4)
+        schemas.close()
+        self.assertLessEqual(connector.max_outstanding, 2)
+        self.assertEqual(('dbo', 'T5'), next(tables))
+
+    def test_iter_schemas_errors(self):
+        """Tests that failures are raised, or reported and skipped"""
+        tables = [('dbo', 'T1'), ('dbo', 'MISSING'), ('dbo', 'T2')]
+        with self.assertRaises(KeyError):
+            list(AvroGenerator(SlowConnector()).iter_schemas(tables, self.CONFIG))
+        failed = []
+        schemas = AvroGenerator(SlowConnector()).iter_schemas(
+            tables, self.CONFIG, workers=2, on_error=lambda table, e: failed.append(table))
+        self.assertEqual([('dbo', 'T1'), ('dbo', 'T2')], [table for table, _ in schemas])
+        self.assertEqual([('dbo', 'MISSING')], failed)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,151 @@
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from avro_tools.generator import AvroGenerator
+from avro_tools.server import SchemaCache, SchemaServer
+from configuration import Configuration, ConfigProperties
+from connectors.csv.connector import CsvConnector
+from connectors.registry import ConnectorRegistry
+from test import RESOURCES
+
+
+class TestSchemaCache(unittest.TestCase):
+
+    def test_lru_and_ttl(self):
+        """Tests eviction of the least recently used schema and expiry of old schemas"""
+        now = [0.0]
+        cache = SchemaCache(max_size=2, ttl=10, clock=lambda: now[0])
+        for key in ('a', 'b', 'a', 'c'):
+            cache.get((key,), lambda: {"name": key})
+        self.assertEqual({"name": "a"}, cache.get(('a',), lambda: None))
+        self.assertEqual({"name": "B"}, cache.get(('b',), lambda: {"name": "B"}))
+        now[0] = 20
+        self.assertEqual({"name": "A"}, cache.get(('a',), lambda: {"name": "A"}))
+        stats = cache.stats()
+        self.assertEqual((2, 5, 2, 1, 2), (stats['hits'], stats['misses'], stats['evicted'], stats['expired'],
+                                           stats['size']))
+
+    def test_coalescing(self):
+        """Tests that concurrent requests for the same key wait for a single generation"""
+        cache = SchemaCache()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def load():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"name": "a"}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(cache.get, ('a',), load)
+            started.wait(5)
+            others = [executor.submit(cache.get, ('a',), load) for _ in range(3)]
+            while cache.stats()['coalesced'] < 3:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in [first] + others]
+        self.assertEqual([{"name": "a"}] * 4, results)
+        self.assertEqual(1, len(calls))
+
+    def test_errors_not_cached(self):
+        """Tests that failed generations are raised to every waiting request and generated again next time"""
+        cache = SchemaCache()
+
+        def fail():
+            raise KeyError('a')
+
+        with self.assertRaises(KeyError):
+            cache.get(('a',), fail)
+        self.assertEqual({"name": "a"}, cache.get(('a',), lambda: {"name": "a"}))
+        self.assertEqual(1, cache.stats()['errors'])
+
+
+class TestSchemaServer(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Configuration(props={
+            ConfigProperties.CONNECTOR: 'csv',
+            ConfigProperties.MAPPER: 'jdbc',
+            ConfigProperties.DB_SYSTEM: 'snowflake',
+            ConfigProperties.CSV_PATH: os.path.join(RESOURCES, 'csv', 'catalog_snowflake.csv'),
+            ConfigProperties.NAMESPACE: 'com.test'
+        })
+        connectors = ConnectorRegistry({"csv": "connectors.csv.connector:CsvConnector"})
+        self.server = SchemaServer(('127.0.0.1', 0), self.config, connectors)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.connection = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+
+    def get(self, path: str) -> tuple[int, dict]:
+        self.connection.request('GET', path)
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_get_schema(self):
+        """Tests that the served schema matches the generated one, and that it is cached"""
+        with CsvConnector(self.config) as connector:
+            expected = AvroGenerator(connector).get_schema(('PUBLIC', 'ORDERS'), 'ORDERS', self.config)
+        self.assertEqual((200, expected), self.get('/schemas/csv/PUBLIC/ORDERS'))
+        self.assertEqual((200, expected), self.get('/schemas/csv/PUBLIC/ORDERS?mapper=jdbc'))
+        status, stats = self.get('/stats')
+        self.assertEqual(200, status)
+        self.assertEqual((1, 1, 1), (stats['hits'], stats['misses'], stats['size']))
+
+    def test_refresh(self):
+        """Tests that expired schemas are generated from the current catalog"""
+        now = [0]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config = Configuration(props={
+                ConfigProperties.CONNECTOR: 'csv',
+                ConfigProperties.MAPPER: 'jdbc',
+                ConfigProperties.DB_SYSTEM: 'snowflake',
+                ConfigProperties.CSV_PATH: os.path.join(tmp_dir, 'catalog.csv'),
+                ConfigProperties.NAMESPACE: 'com.test'
+            })
+            shutil.copy(os.path.join(RESOURCES, 'csv', 'catalog_snowflake.csv'), config.connector_csv_path)
+            connectors = ConnectorRegistry({"csv": "connectors.csv.connector:CsvConnector"})
+            server = SchemaServer(('127.0.0.1', 0), config, connectors, SchemaCache(ttl=10, clock=lambda: now[0]))
+            try:
+                fields = [f['name'] for f in server.get_schema('csv', 'PUBLIC', 'ORDERS')['fields']]
+                self.assertIn('DISCOUNT', fields)
+
+                with open(config.connector_csv_path) as fh:
+                    lines = [line for line in fh if 'DISCOUNT' not in line]
+                with open(config.connector_csv_path, 'w') as fh:
+                    fh.writelines(lines)
+                now[0] = 5
+                fields = [f['name'] for f in server.get_schema('csv', 'PUBLIC', 'ORDERS')['fields']]
+                self.assertIn('DISCOUNT', fields)
+                now[0] = 11
+                fields = [f['name'] for f in server.get_schema('csv', 'PUBLIC', 'ORDERS')['fields']]
+                self.assertNotIn('DISCOUNT', fields)
+            finally:
+                server.server_close()
+
+    def test_errors(self):
+        """Tests the responses to unknown tables, connectors and mappers"""
+        self.assertEqual(404, self.get('/schemas/csv/PUBLIC/MISSING')[0])
+        self.assertEqual(404, self.get('/schemas/csv/OTHER/ORDERS')[0])
+        self.assertEqual(400, self.get('/schemas/oracle/PUBLIC/ORDERS')[0])
+        self.assertEqual(400, self.get('/schemas/csv/PUBLIC/ORDERS?mapper=debezium')[0])
+        self.assertEqual(404, self.get('/tables')[0])
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -1,10 +1,15 @@
 import io
+import json
+import shutil
+import tempfile
 import unittest
 from contextlib import redirect_stdout
+from unittest.mock import patch
 
 import pytest
 
-from avro_tools.validation import AvroValidator, AvroValidationError
+from avro_tools.validation import AvroValidator, AvroValidationError, SchemaValidator, ValidationCache
+from avro_tools.writers import JsonLinesWriter
 from test import *
 
 
@@ -61,6 +66,114 @@ class TestAvroValidation(unittest.TestCase):
         self.assertEqual(2, msg.count('FAIL'))
         self.assertEqual(1, msg.count('SUCCESS'))
 
+    def test_validate_avro_schema_definition_dict(self):
+        """Tests validation of a parsed AVRO schema definition"""
+        avro = json.loads(self.read_avro_file("avro_schema_valid.avsc"))
+        success, exception = AvroValidator.validate_schema_definition(avro)
+        self.assertTrue(success)
+        self.assertIsNone(exception)
+
+    def test_validate_all_in_folder_jobs(self):
+        """Tests validation of all files in a folder in a pool of processes, in the same order as sequentially"""
+        folder = os.path.join(RESOURCES, 'avro')
+        sequential, parallel = io.StringIO(), io.StringIO()
+        with redirect_stdout(sequential):
+            AvroValidator.validate_all_in_folder(folder)
+        with redirect_stdout(parallel):
+            valid_files = AvroValidator.validate_all_in_folder(folder, jobs=2)
+        self.assertEqual(1, valid_files)
+        self.assertEqual(sequential.getvalue(), parallel.getvalue())
+
+    def test_validate_all_in_folder_invalid_jobs(self):
+        """Tests the validation of the number of jobs"""
+        with self.assertRaises(ValueError):
+            AvroValidator.validate_all_in_folder(os.path.join(RESOURCES, 'avro'), jobs=0)
+
+    def test_validate_all_in_folder_cache(self):
+        """Tests that only the files changed since the previous validation are validated again"""
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = os.path.join(tmp, 'avro')
+            shutil.copytree(os.path.join(RESOURCES, 'avro'), folder)
+            cache_path = os.path.join(tmp, 'cache.json')
+            with redirect_stdout(io.StringIO()):
+                with ValidationCache(cache_path) as cache:
+                    self.assertEqual(1, AvroValidator.validate_all_in_folder(folder, cache=cache))
+                self.assertEqual(0, cache.hits)
+
+                # Same content with a new modification time
+                valid_path = os.path.join(folder, "avro_schema_valid.avsc")
+                os.utime(valid_path, ns=(0, 0))
+                with open(os.path.join(folder, "avro_schema_invalid_json.avsc"), 'w') as fh:
+                    fh.write(self.read_avro_file("avro_schema_valid.avsc"))
+                stdout = io.StringIO()
+                with redirect_stdout(stdout), ValidationCache(cache_path) as cache:
+                    self.assertEqual(2, AvroValidator.validate_all_in_folder(folder, jobs=2, cache=cache))
+                self.assertEqual(2, cache.hits)
+                self.assertEqual(1, stdout.getvalue().count('FAIL'))
+
+                with ValidationCache(cache_path, force=True) as cache:
+                    self.assertEqual(2, AvroValidator.validate_all_in_folder(folder, cache=cache))
+                self.assertEqual(0, cache.hits)
+
+            with open(cache_path, 'r') as fh:
+                files = json.load(fh)['files']
+            self.assertEqual(['avro/avro_schema_invalid_avro.avsc', 'avro/avro_schema_invalid_json.avsc',
+                              'avro/avro_schema_valid.avsc'], sorted(files))
+            self.assertFalse(files['avro/avro_schema_invalid_avro.avsc']['valid'])
+
+    def test_iter_validate_folder(self):
+        """Tests the results of the validation of a folder, in order of file name"""
+        folder = os.path.join(RESOURCES, 'avro')
+        results = list(AvroValidator.iter_validate_folder(folder))
+        self.assertEqual(["avro_schema_invalid_avro.avsc", "avro_schema_invalid_json.avsc", "avro_schema_valid.avsc"],
+                         [os.path.basename(result.source) for result in results])
+        self.assertEqual([False, False, True], [result.valid for result in results])
+        self.assertIn(AvroValidationError.JSON_ERROR, results[1].to_dict()['error'])
+
+    def test_iter_validate_folder_max_errors(self):
+        """Tests that validation stops after the maximum number of errors, also in a pool of processes"""
+        folder = os.path.join(RESOURCES, 'avro')
+        self.assertEqual(1, len(list(AvroValidator.iter_validate_folder(folder, max_errors=1))))
+        with patch.object(AvroValidator, 'BATCH_SIZE', 1):
+            results = list(AvroValidator.iter_validate_folder(folder, jobs=2, max_errors=2))
+        self.assertEqual([False, False], [result.valid for result in results])
+        with self.assertRaises(ValueError):
+            AvroValidator.iter_validate_folder(folder, max_errors=0)
+
+    def test_iter_validate_bundle(self):
+        """Tests validation of a JSON Lines bundle, with the schema names from its index"""
+        schema = json.loads(self.read_avro_file("avro_schema_valid.avsc"))
+        with tempfile.TemporaryDirectory() as tmp:
+            with JsonLinesWriter(tmp) as writer:
+                writer.write(schema)
+                writer.write({**schema, "name": "Invalid", "fields": [{"name": "id", "type": "nope"}]})
+            results = list(AvroValidator.iter_validate_bundle(os.path.join(tmp, JsonLinesWriter.BUNDLE_NAME)))
+        self.assertEqual([True, False], [result.valid for result in results])
+        self.assertTrue(results[1].source.endswith("Invalid.avsc"))
+
+        lines = ["", json.dumps(schema), "{"]
+        results = list(AvroValidator.iter_validate_lines(lines, '<stdin>'))
+        self.assertEqual(['<stdin>:2', '<stdin>:3'], [result.source for result in results])
+        self.assertIn(AvroValidationError.JSON_ERROR, results[1].error)
+
+    def test_schema_validator(self):
+        """Tests in-memory validation, with the outcome of structurally identical schemas taken from the cache"""
+        schema = json.loads(self.read_avro_file("avro_schema_valid.avsc"))
+        validator = SchemaValidator()
+        self.assertEqual((True, None), validator.validate(schema))
+        self.assertEqual((True, None), validator.validate(json.loads(json.dumps(schema))))
+        success, exception = validator.validate({**schema, "fields": [{"name": "id", "type": "int"}] * 2})
+        self.assertFalse(success)
+        self.assertIn(AvroValidationError.AVRO_ERROR, exception.msg)
+        self.assertEqual(1, validator.hits)
+
+        # Records with the same structure share the outcome, but their names are validated.
+        self.assertEqual((True, None), validator.validate({**schema, "name": "Other", "namespace": "com.other"}))
+        self.assertEqual(2, validator.hits)
+        success, exception = validator.validate({**schema, "name": "BAD-TABLE"})
+        self.assertFalse(success)
+        self.assertIn("BAD-TABLE", exception.msg)
+
 
 if __name__ == '__main__':
     pytest.main()
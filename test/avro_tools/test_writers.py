@@ -0,0 +1,146 @@
+import json
+import os
+import tarfile
+import tempfile
+import threading
+import unittest
+
+import pytest
+
+from avro_tools.atomic import atomic_write
+from avro_tools.writers import (BackgroundWriter, DirectoryWriter, JsonLinesWriter, SchemaWriter, ShardedWriter,
+                                TarWriter, get_writer)
+from configuration import ConfigProperties, Configuration
+
+SCHEMAS = [
+    {"type": "record", "name": f"TABLE_{i}", "namespace": "com.test", "fields": [{"name": "ID", "type": "int"}]}
+    for i in range(10)
+]
+
+
+class TestWriters(unittest.TestCase):
+
+    def read_index(self, writer):
+        with open(writer.bundle_path + '.index.json') as fh:
+            return json.load(fh)['schemas']
+
+    def test_directory(self):
+        """Tests that schema files are indented as before by default, or compact"""
+        with tempfile.TemporaryDirectory() as output_path:
+            with DirectoryWriter(output_path) as writer:
+                self.assertTrue(writer.write(SCHEMAS[0]))
+            with open(os.path.join(output_path, 'com_test_TABLE_0.avsc')) as fh:
+                self.assertEqual(json.dumps(SCHEMAS[0], indent=4), fh.read())
+
+            with DirectoryWriter(output_path, compact=True) as writer:
+                # The schema is unchanged, so the file is not rewritten.
+                self.assertFalse(writer.write(SCHEMAS[0]))
+                self.assertTrue(writer.write(SCHEMAS[1]))
+            with open(os.path.join(output_path, 'com_test_TABLE_1.avsc')) as fh:
+                self.assertNotIn(' ', fh.read())
+
+    def test_sharded(self):
+        """Tests that schema files are spread over subdirectories"""
+        with tempfile.TemporaryDirectory() as output_path:
+            with ShardedWriter(output_path) as writer:
+                for avro_schema in SCHEMAS:
+                    writer.write(avro_schema)
+                file_names = [writer.file_name(avro_schema) for avro_schema in SCHEMAS]
+            self.assertGreater(len({os.path.dirname(file_name) for file_name in file_names}), 1)
+            for file_name, avro_schema in zip(file_names, SCHEMAS):
+                self.assertRegex(file_name, r'^[0-9a-f]{2}/com_test_TABLE_\d\.avsc$')
+                with open(os.path.join(output_path, file_name)) as fh:
+                    self.assertEqual(avro_schema, json.load(fh))
+
+    def test_jsonl(self):
+        """Tests that each schema can be read from the JSONL bundle at the position given by the index"""
+        with tempfile.TemporaryDirectory() as output_path:
+            with JsonLinesWriter(output_path) as writer:
+                for avro_schema in SCHEMAS:
+                    writer.write(avro_schema)
+            with open(writer.bundle_path, 'rb') as fh:
+                lines = fh.read().splitlines()
+                self.assertEqual(SCHEMAS, [json.loads(line) for line in lines])
+                for (file_name, offset, length), avro_schema in zip(self.read_index(writer), SCHEMAS):
+                    self.assertEqual(writer.file_name(avro_schema), file_name)
+                    fh.seek(offset)
+                    self.assertEqual(avro_schema, json.loads(fh.read(length)))
+
+    def test_tar(self):
+        """Tests that the tar bundle holds a member per schema, also readable at the position given by the index"""
+        with tempfile.TemporaryDirectory() as output_path:
+            with TarWriter(output_path) as writer:
+                for avro_schema in SCHEMAS:
+                    writer.write(avro_schema)
+            with tarfile.open(writer.bundle_path) as tar:
+                self.assertEqual([writer.file_name(avro_schema) for avro_schema in SCHEMAS], tar.getnames())
+                self.assertEqual(SCHEMAS[3], json.load(tar.extractfile('com_test_TABLE_3.avsc')))
+            with open(writer.bundle_path, 'rb') as fh:
+                for (file_name, offset, length), avro_schema in zip(self.read_index(writer), SCHEMAS):
+                    fh.seek(offset)
+                    self.assertEqual(avro_schema, json.loads(fh.read(length)))
+
+    def test_bundle_failure(self):
+        """Tests that the bundle of a failed run does not replace the previous one"""
+        with tempfile.TemporaryDirectory() as output_path:
+            with JsonLinesWriter(output_path) as writer:
+                writer.write(SCHEMAS[0])
+            with self.assertRaises(RuntimeError):
+                with JsonLinesWriter(output_path) as writer:
+                    writer.write(SCHEMAS[1])
+                    raise RuntimeError()
+            self.assertEqual(['schemas.jsonl', 'schemas.jsonl.index.json'], sorted(os.listdir(output_path)))
+            with open(writer.bundle_path) as fh:
+                self.assertEqual([SCHEMAS[0]], [json.loads(line) for line in fh])
+
+    def test_atomic_write(self):
+        """Tests that a failed write leaves neither a partial file nor a temporary file"""
+        with tempfile.TemporaryDirectory() as output_path:
+            file_path = os.path.join(output_path, 'schema.avsc')
+            atomic_write(file_path, b'{}', fsync=True)
+            with self.assertRaises(TypeError):
+                atomic_write(file_path, None)
+            self.assertEqual(['schema.avsc'], os.listdir(output_path))
+            with open(file_path) as fh:
+                self.assertEqual('{}', fh.read())
+
+    def test_background(self):
+        """Tests that the background writer bounds the queue and reports every result before flush returns"""
+        release = threading.Event()
+
+        class BlockingWriter(SchemaWriter):
+            def write(self, avro_schema, scope=('', '', '')):
+                release.wait()
+                if avro_schema['name'] == 'TABLE_3':
+                    raise OSError("disk full")
+                return True
+
+        results = []
+        with BackgroundWriter(BlockingWriter('.'), workers=2, queue_size=3) as writer:
+            futures = [writer.submit(avro_schema, callback=lambda written, e: results.append(e or written))
+                       for avro_schema in SCHEMAS[:3]]
+            blocked = threading.Thread(target=writer.submit, args=(SCHEMAS[3],),
+                                       kwargs={"callback": lambda written, e: results.append(e or written)})
+            blocked.start()
+            blocked.join(0.05)
+            # The queue is full until a schema is written.
+            self.assertTrue(blocked.is_alive())
+            release.set()
+            blocked.join()
+            writer.flush()
+            self.assertEqual(4, len(results))
+        self.assertEqual([True, True, True], [future.result() for future in futures])
+        self.assertEqual(1, sum(isinstance(result, OSError) for result in results))
+
+    def test_get_writer(self):
+        """Tests the selection of the writer and the output formats that do not support incremental runs"""
+        props = {ConfigProperties.CONNECTOR: 'csv', ConfigProperties.OUTPUT_FORMAT: 'tar'}
+        self.assertIsInstance(get_writer(Configuration(props)), TarWriter)
+        with self.assertRaises(ValueError):
+            get_writer(Configuration({**props, ConfigProperties.INCREMENTAL: True}))
+        with self.assertRaises(ValueError):
+            get_writer(Configuration({**props, ConfigProperties.OUTPUT_FORMAT: 'zip'}))
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import pytest
+
+from connectors.csv.column import Column
+
+HEADERS = ['TABLE_SCHEMA', 'TABLE_NAME', 'ORDINAL_POSITION', 'COLUMN_NAME', 'DATA_TYPE', 'NUMERIC_PRECISION',
+           'NUMERIC_SCALE', 'IS_NULLABLE', 'CHARACTER_MAXIMUM_LENGTH']
+
+
+def values(column: Column) -> tuple:
+    return (column.table_schema, column.table_name, column.ordinal_position, column.column_name, column.data_type,
+            column.numeric_precision, column.numeric_scale, column.is_nullable, column.character_maximum_length)
+
+
+class TestColumn(unittest.TestCase):
+
+    def test_from_row(self):
+        """Tests that CSV values are converted, and that rows match the keyword constructor"""
+        positions = Column.positions(HEADERS)
+        column = Column.from_row(['PUBLIC', 'ORDERS', '2', 'AMOUNT', 'NUMBER', '18', '2', 'YES', ''], positions)
+        self.assertEqual(('PUBLIC', 'ORDERS', 2, 'AMOUNT', 'NUMBER', 18, 2, True, None), values(column))
+        self.assertEqual(values(column), values(Column(**dict(zip(HEADERS, ['PUBLIC', 'ORDERS', '2', 'AMOUNT',
+                                                                            'NUMBER', '18', '2', 'YES', ''])))))
+
+        column = Column.from_row(['PUBLIC', 'NOTES', '1', 'BODY', 'TEXT', '', '', 'NO', '-1'], positions)
+        self.assertEqual(('PUBLIC', 'NOTES', 1, 'BODY', 'TEXT', None, None, False, -1), values(column))
+
+    def test_positions(self):
+        """Tests rows with reordered and missing headers"""
+        headers = ['COLUMN_NAME', 'DATA_TYPE', 'TABLE_NAME', 'ORDINAL_POSITION', 'TABLE_SCHEMA', 'IS_NULLABLE']
+        column = Column.from_row(['ID', 'INT', 'ORDERS', '1', 'PUBLIC', 'true'], Column.positions(headers))
+        self.assertEqual(('PUBLIC', 'ORDERS', 1, 'ID', 'INT', None, None, True, None), values(column))
+
+    def test_short_row(self):
+        """Tests that missing trailing values are None"""
+        column = Column.from_row(['PUBLIC', 'ORDERS', '1', 'ID', 'NUMBER', '9', '0', 'NO'], Column.positions(HEADERS))
+        self.assertEqual(('PUBLIC', 'ORDERS', 1, 'ID', 'NUMBER', 9, 0, False, None), values(column))
+
+    def test_from_values(self):
+        """Tests that converted values are kept as they are"""
+        column = Column.from_values('dbo', 'orders', 3, 'price', 'decimal', 18, 4, False, None)
+        self.assertEqual(('dbo', 'orders', 3, 'price', 'decimal', 18, 4, False, None), values(column))
+
+    def test_slots_and_interning(self):
+        """Tests that columns have no instance dictionary and share the repeated names"""
+        positions = Column.positions(HEADERS)
+        # Strings built at run time, as read by the CSV reader
+        first = Column.from_row([''.join(['PUB', 'LIC']), ''.join(['ORD', 'ERS']), '1', 'ID', ''.join(['NUM', 'BER']),
+                                 '9', '0', 'NO', ''], positions)
+        second = Column.from_row([''.join(['PUB', 'LIC']), ''.join(['ORD', 'ERS']), '2', 'QTY', ''.join(['NUM', 'BER']),
+                                  '9', '0', 'NO', ''], positions)
+        self.assertFalse(hasattr(first, '__dict__'))
+        with self.assertRaises(AttributeError):
+            first.comment = 'Not a column attribute'
+        self.assertIs(first.table_schema, second.table_schema)
+        self.assertIs(first.table_name, second.table_name)
+        self.assertIs(first.data_type, second.data_type)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,163 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+from configuration import Configuration, ConfigProperties
+from connectors.csv.connector import CsvConnector
+from connectors.csv.index import CsvTableIndex
+from connectors.csv.parallel import load_catalog
+from connectors.csv.sources import DuplicateTableException
+from test import RESOURCES
+
+CATALOG = os.path.join(RESOURCES, 'csv', 'catalog_snowflake.csv')
+
+
+class TestCsvConnector(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.folder, 'catalog.csv')
+        shutil.copy(CATALOG, self.csv_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def make_config(self, **props) -> Configuration:
+        return Configuration(props={
+            ConfigProperties.CONNECTOR: 'csv',
+            ConfigProperties.MAPPER: 'jdbc',
+            ConfigProperties.DB_SYSTEM: 'snowflake',
+            ConfigProperties.DB_SCHEMA: 'PUBLIC',
+            ConfigProperties.CSV_PATH: self.csv_path,
+            **props
+        })
+
+    @staticmethod
+    def read_schemas(config: Configuration) -> dict:
+        with CsvConnector(config) as connector:
+            return {
+                table: [field.to_dict() for field in connector.get_columns(table, config)]
+                for table in connector.get_tables(config)
+            }
+
+    def test_get_columns(self):
+        """Tests that columns are mapped and ordered by ordinal position"""
+        schemas = self.read_schemas(self.make_config())
+        self.assertEqual([('PUBLIC', 'ORDERS'), ('PUBLIC', 'CUSTOMERS')], list(schemas))
+        self.assertEqual(['ID', 'AMOUNT', 'CREATED_AT', 'DISCOUNT'], [f['name'] for f in schemas[('PUBLIC', 'ORDERS')]])
+        self.assertEqual({"type": "bytes", "scale": 2, "precision": 18, "logicalType": "decimal"},
+                         schemas[('PUBLIC', 'ORDERS')][1]['type'][1])
+
+    def test_indexed_matches_full_load(self):
+        """Tests that indexed mode reads the same tables and columns as a full load, and persists the index"""
+        expected = self.read_schemas(self.make_config())
+        config = self.make_config(**{ConfigProperties.CSV_INDEX: True})
+        self.assertEqual(expected, self.read_schemas(config))
+        self.assertTrue(os.path.isfile(CsvTableIndex.sidecar_path(self.csv_path)))
+        # Second run reads the sidecar
+        self.assertEqual(expected, self.read_schemas(config))
+
+    def test_refresh_while_reading(self):
+        """Tests that the previous catalog stays readable while the connector is refreshed"""
+        for props in ({}, {ConfigProperties.CSV_INDEX: True}):
+            config = self.make_config(**props)
+            with CsvConnector(config) as connector:
+                read = connector._read
+                during = []
+
+                def read_while_refreshing():
+                    result = read()
+                    during.append(len(connector.get_columns(('PUBLIC', 'ORDERS'), config)))
+                    return result
+
+                connector._read = read_while_refreshing
+                previous = connector.get_columns(('PUBLIC', 'ORDERS'), config)
+                connector.refresh(config)
+                self.assertEqual([len(previous)], during)
+                self.assertEqual(len(previous), len(connector.get_columns(('PUBLIC', 'ORDERS'), config)))
+
+    def test_empty_file(self):
+        """Tests that an empty CSV file has no tables"""
+        open(self.csv_path, 'w').close()
+        for props in ({}, {ConfigProperties.CSV_JOBS: 2}):
+            config = self.make_config(**props)
+            with CsvConnector(config) as connector:
+                self.assertEqual([], connector.get_tables(config))
+
+    def test_indexed_empty_file(self):
+        """Tests that an empty CSV file has no tables in indexed mode"""
+        open(self.csv_path, 'w').close()
+        config = self.make_config(**{ConfigProperties.CSV_INDEX: True})
+        with CsvConnector(config) as connector:
+            self.assertEqual([], connector.get_tables(config))
+
+    def test_index_ranges(self):
+        """Tests that non-contiguous rows of a table and quoted fields spanning lines are indexed"""
+        with open(self.csv_path, 'a', newline='') as fh:
+            fh.write('PUBLIC,NOTES,1,"BODY\nTEXT",TEXT,,,YES\n')
+            fh.write('PUBLIC,NOTES,2,"A ""quoted"", name",TEXT,,,YES\n')
+        index = CsvTableIndex.build(self.csv_path)
+        index.open()
+        try:
+            self.assertEqual(2, len(index._ranges[('PUBLIC', 'ORDERS')]))
+            notes = index.columns(('PUBLIC', 'NOTES'))
+            self.assertEqual(['BODY\nTEXT', 'A "quoted", name'], [col.column_name for col in notes])
+        finally:
+            index.close()
+
+    def test_parallel_load(self):
+        """Tests that parsing the CSV in several processes produces the same catalog as a sequential load"""
+        config = self.make_config()
+        with CsvConnector(config) as connector:
+            expected = connector.get_catalog(config)
+        catalog = load_catalog(self.csv_path, jobs=2, min_chunk_size=64)
+        self.assertEqual(list(expected['PUBLIC']), list(catalog['PUBLIC']))
+        for table, columns in expected['PUBLIC'].items():
+            self.assertEqual([(c.column_name, c.ordinal_position, c.data_type) for c in columns],
+                             [(c.column_name, c.ordinal_position, c.data_type) for c in catalog['PUBLIC'][table]])
+        self.assertIs(expected['PUBLIC']['ORDERS'][0].data_type, catalog['PUBLIC']['ORDERS'][0].data_type)
+
+    def write_shards(self, duplicate: bool = False) -> str:
+        """Splits the catalog into a plain and a gzip compressed shard, one per DB schema"""
+        shards = os.path.join(self.folder, 'shards')
+        os.mkdir(shards)
+        with open(self.csv_path) as fh:
+            header, *rows = fh.readlines()
+        with open(os.path.join(shards, 'public.csv'), 'w') as fh:
+            fh.writelines([header] + [row for row in rows if row.startswith('PUBLIC,')])
+        staging = [row for row in rows if row.startswith('STAGING,') or duplicate and ',ORDERS,' in row]
+        with gzip.open(os.path.join(shards, 'staging.csv.gz'), 'wt') as fh:
+            fh.writelines([header] + staging)
+        return shards
+
+    def test_shards(self):
+        """Tests reading a directory and a glob pattern of plain and compressed CSV files"""
+        expected = self.read_schemas(self.make_config())
+        shards = self.write_shards()
+        self.assertEqual(expected, self.read_schemas(self.make_config(**{ConfigProperties.CSV_PATH: shards})))
+        config = self.make_config(**{ConfigProperties.CSV_PATH: os.path.join(shards, '*.csv*'),
+                                     ConfigProperties.DB_SCHEMA: 'STAGING', ConfigProperties.CSV_JOBS: 2})
+        self.assertEqual([('STAGING', 'ORDERS_RAW')], list(self.read_schemas(config)))
+
+    def test_shards_duplicate_table(self):
+        """Tests that a table defined in more than one file is rejected"""
+        shards = self.write_shards(duplicate=True)
+        with self.assertRaises(DuplicateTableException) as ctx:
+            self.read_schemas(self.make_config(**{ConfigProperties.CSV_PATH: shards}))
+        self.assertEqual(('PUBLIC', 'ORDERS'), ctx.exception.duplicates[0][:2])
+
+    def test_stale_sidecar_is_rebuilt(self):
+        """Tests that a sidecar index is rebuilt when the CSV file changes"""
+        config = self.make_config(**{ConfigProperties.CSV_INDEX: True})
+        self.read_schemas(config)
+        with open(self.csv_path, 'a') as fh:
+            fh.write("PUBLIC,CUSTOMERS,4,EMAIL,TEXT,,,YES\n")
+        self.assertEqual(4, len(self.read_schemas(config)[('PUBLIC', 'CUSTOMERS')]))
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,188 @@
+import unittest
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pyodbc", exc_type=ImportError)
+
+from avro_tools.avro_type import AvroDecimal, AvroInt, AvroString
+from configuration import Configuration, ConfigProperties
+from connectors.sql_server.connector import SqlServerConnector
+from connectors.pool import ConnectionPool
+
+
+CATALOG_HEADERS = ('TABLE_SCHEMA', 'TABLE_NAME', 'ORDINAL_POSITION', 'COLUMN_NAME', 'DATA_TYPE', 'NUMERIC_PRECISION',
+                   'NUMERIC_SCALE', 'IS_NULLABLE')
+
+CATALOG_ROWS = [
+    ('dbo', 'orders', 1, 'id', 'int', 10, 0, 'NO'),
+    ('dbo', 'orders', 2, 'amount', 'decimal', 18, 2, 'YES'),
+    ('dbo', 'customers', 2, 'name', 'nvarchar', None, None, 'YES'),
+    ('dbo', 'customers', 1, 'id', 'int', 10, 0, 'NO'),
+    ('sales', 'invoices', 1, 'id', 'bigint', 19, 0, 'NO'),
+]
+
+# Rows of the ODBC columns catalog (SQLColumns)
+ODBC_ROWS = [
+    SimpleNamespace(ordinal_position=1, column_name='id', type_name='int identity', column_size=10, decimal_digits=0,
+                    nullable=0),
+    SimpleNamespace(ordinal_position=2, column_name='amount', type_name='decimal', column_size=18, decimal_digits=2,
+                    nullable=1),
+    SimpleNamespace(ordinal_position=3, column_name='code', type_name='nvarchar', column_size=20, decimal_digits=None,
+                    nullable=1),
+    SimpleNamespace(ordinal_position=4, column_name='notes', type_name='varchar', column_size=0, decimal_digits=None,
+                    nullable=1),
+    SimpleNamespace(ordinal_position=5, column_name='created', type_name='datetime2', column_size=27,
+                    decimal_digits=7, nullable=0),
+]
+
+TABLES = sorted([('dbo', f'table_{i:02d}') for i in range(25)] + [('sales', 'invoices')])
+
+
+class FakeCursor:
+    """DB-API cursor stand-in that answers the bulk catalog query from an in-memory list of rows."""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._rows = []
+        self.description = None
+
+    def execute(self, query, *params):
+        self._connection.queries.append((query, params))
+        if 'sys.tables' in query:
+            # Emulates the keyset pagination of the discovery query; the filters are not evaluated.
+            rows = TABLES
+            if 's.name > ?' in query:
+                last = (params[-3], params[-1])
+                rows = [row for row in rows if row > last]
+            self._rows = rows[:params[0]]
+        else:
+            self.description = [(header,) for header in CATALOG_HEADERS]
+            self._rows = [row for row in CATALOG_ROWS if not params or row[0] == params[0]]
+        return self
+
+    def columns(self, table, schema):
+        self._connection.queries.append(('SQLColumns', (schema, table)))
+        self._rows = ODBC_ROWS
+        return self
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class TestSqlServerConnectorBulk(unittest.TestCase):
+
+    @staticmethod
+    def make_connector(bulk: str) -> tuple[SqlServerConnector, Configuration, FakeConnection]:
+        config = Configuration(props={ConfigProperties.CONNECTOR: 'sqlserver', ConfigProperties.MAPPER: 'debezium',
+                                      ConfigProperties.BULK: bulk})
+        connector = SqlServerConnector(config)
+        connection = FakeConnection()
+        connector._pool = ConnectionPool(lambda: connection)
+        return connector, config, connection
+
+    def test_bulk_schema_single_query(self):
+        """Tests that all tables of a schema are served from a single catalog query"""
+        connector, config, connection = self.make_connector(SqlServerConnector.BULK_SCHEMA)
+        orders = connector.get_columns(('dbo', 'orders'), config)
+        customers = connector.get_columns(('dbo', 'customers'), config)
+        self.assertEqual(1, len(connection.queries))
+        self.assertEqual(('dbo',), connection.queries[0][1])
+        # Views are not part of the catalog, as they are not discovered.
+        self.assertIn("TABLE_TYPE = 'BASE TABLE' AND c.TABLE_SCHEMA = ?", connection.queries[0][0])
+        self.assertEqual(['id', 'amount'], [field.to_dict()['name'] for field in orders])
+        self.assertEqual(['id', 'name'], [field.to_dict()['name'] for field in customers])
+        self.assertEqual(["null", AvroDecimal(18, 2).obj()], orders[1].to_dict()['type'])
+        self.assertEqual(["null", AvroString.obj()], customers[1].to_dict()['type'])
+
+    def test_bulk_database_single_query(self):
+        """Tests that all schemas are served from a single catalog query"""
+        connector, config, connection = self.make_connector(SqlServerConnector.BULK_DATABASE)
+        connector.get_columns(('dbo', 'orders'), config)
+        invoices = connector.get_columns(('sales', 'invoices'), config)
+        self.assertEqual(1, len(connection.queries))
+        self.assertEqual((), connection.queries[0][1])
+        self.assertEqual(1, len(invoices))
+
+    def test_bulk_unknown_table(self):
+        """Tests that an unknown table has no columns"""
+        connector, config, _ = self.make_connector(SqlServerConnector.BULK_SCHEMA)
+        self.assertEqual([], connector.get_columns(('dbo', 'missing'), config))
+        self.assertEqual(AvroInt.obj(), connector.get_columns(('dbo', 'orders'), config)[0].to_dict()['type'])
+
+
+class TestSqlServerConnectorOdbc(unittest.TestCase):
+
+    def test_get_columns(self):
+        """Tests that the column size is only kept as the precision of numeric and the length of character types"""
+        config = Configuration(props={ConfigProperties.CONNECTOR: 'sqlserver', ConfigProperties.MAPPER: 'debezium'})
+        connector = SqlServerConnector(config)
+        columns = [connector._odbc_column('dbo', 'orders', row) for row in ODBC_ROWS]
+        self.assertEqual([(10, 0, None), (18, 2, None), (None, None, 20), (None, None, -1), (None, None, None)],
+                         [(c.numeric_precision, c.numeric_scale, c.character_maximum_length) for c in columns])
+
+        connection = FakeConnection()
+        connector._pool = ConnectionPool(lambda: connection)
+        fields = connector.get_columns(('dbo', 'orders'), config)
+        self.assertEqual([('SQLColumns', ('dbo', 'orders'))], connection.queries)
+        self.assertEqual(["null", AvroDecimal(18, 2).obj()], fields[1].to_dict()['type'])
+
+
+class TestSqlServerConnectorDiscovery(unittest.TestCase):
+
+    @staticmethod
+    def make_connector(**props) -> tuple[SqlServerConnector, Configuration, FakeConnection]:
+        config = Configuration(props={ConfigProperties.CONNECTOR: 'sqlserver', ConfigProperties.MAPPER: 'jdbc',
+                                      **props})
+        connector = SqlServerConnector(config)
+        connection = FakeConnection()
+        connector._pool = ConnectionPool(lambda: connection)
+        return connector, config, connection
+
+    def test_get_tables_paging(self):
+        """Tests that tables are streamed page by page"""
+        connector, config, connection = self.make_connector(**{ConfigProperties.PAGE_SIZE: 10})
+        tables = connector.get_tables(config)
+        self.assertEqual(TABLES[0], next(tables))
+        self.assertEqual(1, len(connection.queries))
+        self.assertEqual(TABLES, [TABLES[0]] + list(tables))
+        self.assertEqual(3, len(connection.queries))
+        self.assertEqual(('dbo', 'table_19'), connection.queries[-1][1][-3::2])
+
+    def test_invalid_page_size(self):
+        """Tests that pages must hold at least one table"""
+        for page_size in ('0', '-5'):
+            with self.assertRaises(ValueError):
+                self.make_connector(**{ConfigProperties.PAGE_SIZE: page_size})
+
+    def test_get_tables_filters(self):
+        """Tests that the discovery filters are pushed down to the query"""
+        connector, config, connection = self.make_connector(**{
+            ConfigProperties.DB_SCHEMA: 'dbo', ConfigProperties.INCLUDE: 'fact_*,dim.date_?',
+            ConfigProperties.EXCLUDE: '*_tmp', ConfigProperties.MIN_ROWS: 100,
+            ConfigProperties.MODIFIED_SINCE: '2024-01-01'})
+        list(connector.get_tables(config))
+        query, params = connection.queries[0]
+        self.assertIn("s.name = ?", query)
+        self.assertIn("NOT (t.name LIKE ?)", query)
+        self.assertIn("sys.partitions", query)
+        self.assertIn("t.modify_date >= ?", query)
+        self.assertEqual((1000, 'dbo', 'fact[_]%', 'dim', 'date[_]_', '%[_]tmp', 100, '2024-01-01'), params)
+
+
+if __name__ == '__main__':
+    pytest.main()
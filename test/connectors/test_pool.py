@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from connectors.pool import ConnectionPool
+
+
+class SlowConnection:
+    """Connection stand-in that tracks how many connections are in use at the same time."""
+    lock = threading.Lock()
+    in_use = 0
+    max_in_use = 0
+
+    def __init__(self):
+        self.closed = False
+
+    def query(self, latency: float):
+        with self.lock:
+            SlowConnection.in_use += 1
+            SlowConnection.max_in_use = max(SlowConnection.max_in_use, SlowConnection.in_use)
+        time.sleep(latency)
+        with self.lock:
+            SlowConnection.in_use -= 1
+        return id(self)
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def test_pool_size_is_respected(self):
+        """Tests that concurrent borrowers never use more connections than the pool size"""
+        created = []
+
+        def factory():
+            created.append(SlowConnection())
+            return created[-1]
+
+        pool = ConnectionPool(factory, size=2)
+
+        def borrow(_):
+            with pool.connection() as connection:
+                return connection.query(0.01)
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(borrow, range(12)))
+
+        self.assertEqual(12, len(results))
+        self.assertEqual(2, len(created))
+        self.assertLessEqual(SlowConnection.max_in_use, 2)
+
+        pool.close()
+        self.assertTrue(all(connection.closed for connection in created))
+
+    def test_connection_is_reused(self):
+        """Tests that a returned connection is handed out again"""
+        pool = ConnectionPool(SlowConnection, size=3)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+
+    def test_invalid_size(self):
+        """Tests that the pool must hold at least one connection"""
+        with self.assertRaises(ValueError):
+            ConnectionPool(SlowConnection, size=0)
+
+
+if __name__ == '__main__':
+    pytest.main()
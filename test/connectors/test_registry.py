@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import unittest
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+import pytest
+
+from connectors.csv.connector import CsvConnector
+from connectors.registry import ConnectorRegistry
+from test import TEST_PATH
+
+
+class TestConnectorRegistry(unittest.TestCase):
+
+    def test_lazy_import(self):
+        """Tests that connector modules, and their drivers, are only imported when the connector is selected"""
+        code = ("import sys, main; "
+                "assert 'pyodbc' not in sys.modules and 'connectors.csv.connector' not in sys.modules; "
+                "assert 'avro' not in sys.modules; "
+                "assert not {'asyncio', 'importlib.metadata', 'avro_tools.server', 'avro_tools.registry', "
+                "'connectors.pool', 'avro_tools.compatibility', 'connectors.snapshot', "
+                "'connectors.watcher'} & set(sys.modules); "
+                "main.CONNECTORS_MAP['csv']; "
+                "assert 'connectors.csv.connector' in sys.modules and 'pyodbc' not in sys.modules")
+        subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(TEST_PATH), check=True)
+
+    def test_get(self):
+        """Tests lookup of registered connectors by name"""
+        registry = ConnectorRegistry({"csv": "connectors.csv.connector:CsvConnector"})
+        self.assertIs(CsvConnector, registry['csv'])
+        self.assertIs(CsvConnector, registry.get('csv'))
+        self.assertIsNone(registry.get('oracle'))
+        self.assertNotIn('oracle', registry)
+
+        registry.register('other', CsvConnector)
+        self.assertIs(CsvConnector, registry['other'])
+        registry.register('invalid', 'connectors.csv.connector')
+        with self.assertRaises(ValueError):
+            registry.get('invalid')
+
+    def test_entry_points(self):
+        """Tests that connectors provided by other packages are found through entry points"""
+        plugin = EntryPoint('plugin', 'connectors.csv.connector:CsvConnector', ConnectorRegistry.ENTRY_POINT_GROUP)
+        registry = ConnectorRegistry({"csv": "connectors.csv.connector:CsvConnector"})
+        with patch('importlib.metadata.entry_points', return_value=[plugin]) as entry_points:
+            self.assertIs(CsvConnector, registry['csv'])
+            entry_points.assert_not_called()
+            self.assertIs(CsvConnector, registry['plugin'])
+            self.assertEqual(['csv', 'plugin'], sorted(registry))
+            entry_points.assert_called_once_with(group=ConnectorRegistry.ENTRY_POINT_GROUP)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+from configuration import Configuration, ConfigProperties
+from connectors.csv.connector import CsvConnector
+from connectors.snapshot import CatalogSnapshot, SnapshotConnector, SnapshotNotFoundException
+from test import RESOURCES
+
+
+class TestSnapshotConnector(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.folder, 'catalog.csv')
+        shutil.copy(os.path.join(RESOURCES, 'csv', 'catalog_snowflake.csv'), self.csv_path)
+        self.cache_path = os.path.join(self.folder, 'catalog.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def make_config(self, **props) -> Configuration:
+        return Configuration(props={
+            ConfigProperties.CONNECTOR: 'csv',
+            ConfigProperties.MAPPER: 'jdbc',
+            ConfigProperties.DB_SYSTEM: 'snowflake',
+            ConfigProperties.DB_SCHEMA: 'PUBLIC',
+            ConfigProperties.CSV_PATH: self.csv_path,
+            ConfigProperties.CACHE_PATH: self.cache_path,
+            **props
+        })
+
+    def test_snapshot_matches_source(self):
+        """Tests that the schemas generated from a snapshot match those generated from the source"""
+        config = self.make_config()
+        with CsvConnector(config) as source:
+            expected = [field.to_dict() for field in source.get_columns(('PUBLIC', 'ORDERS'), config)]
+        with SnapshotConnector(CsvConnector, config) as connector:
+            self.assertEqual([('PUBLIC', 'CUSTOMERS'), ('PUBLIC', 'ORDERS')], connector.get_tables(config))
+            self.assertEqual(expected, [field.to_dict() for field in connector.get_columns(('PUBLIC', 'ORDERS'),
+                                                                                              config)])
+
+    def test_type_rules(self):
+        """Tests that the type rules apply to the schemas generated from a snapshot"""
+        config = self.make_config(**{ConfigProperties.TYPE_RULES: os.path.join(RESOURCES, 'rules',
+                                                                               'snowflake_rules.json')})
+        with CsvConnector(config) as source:
+            expected = [field.to_dict() for field in source.get_columns(('PUBLIC', 'ORDERS'), config)]
+        with SnapshotConnector(CsvConnector, config) as connector:
+            fields = [field.to_dict() for field in connector.get_columns(('PUBLIC', 'ORDERS'), config)]
+        self.assertEqual(expected, fields)
+        self.assertEqual(12, fields[1]['type'][1]['precision'])
+
+    def test_get_tables_db_schema(self):
+        """Tests that the tables of a snapshot of every DB schema are filtered by the configured DB schema"""
+        config = self.make_config(**{ConfigProperties.DB_SCHEMA: None})
+        with SnapshotConnector(CsvConnector, config) as connector:
+            self.assertEqual([('PUBLIC', 'CUSTOMERS'), ('PUBLIC', 'ORDERS'), ('STAGING', 'ORDERS_RAW')],
+                             connector.get_tables(config))
+            config.db_schema = 'STAGING'
+            self.assertEqual([('STAGING', 'ORDERS_RAW')], connector.get_tables(config))
+
+    def test_get_tables_filters(self):
+        """Tests that the include and exclude patterns apply to the snapshot, and that other filters are rejected"""
+        config = self.make_config(**{ConfigProperties.DB_SCHEMA: None, ConfigProperties.INCLUDE: 'orders*',
+                                     ConfigProperties.EXCLUDE: 'staging.*'})
+        with SnapshotConnector(CsvConnector, config) as connector:
+            self.assertEqual([('PUBLIC', 'ORDERS')], connector.get_tables(config))
+            config.connector_include = 'PUBLIC.C?STOMERS,ORDERS_RAW'
+            config.connector_exclude = None
+            self.assertEqual([('PUBLIC', 'CUSTOMERS'), ('STAGING', 'ORDERS_RAW')], connector.get_tables(config))
+
+        for props in ({ConfigProperties.MIN_ROWS: 10}, {ConfigProperties.MODIFIED_SINCE: '2024-01-01'}):
+            with self.assertRaises(ValueError):
+                SnapshotConnector(CsvConnector, self.make_config(**props))
+
+    def test_snapshot_reused_offline(self):
+        """Tests that a snapshot is reused without reading the source"""
+        with SnapshotConnector(CsvConnector, self.make_config()):
+            pass
+        os.remove(self.csv_path)
+        config = self.make_config(**{ConfigProperties.OFFLINE: True, ConfigProperties.CACHE_TTL: 1e-9})
+        with SnapshotConnector(CsvConnector, config) as connector:
+            self.assertEqual(3, len(connector.get_columns(('PUBLIC', 'CUSTOMERS'), config)))
+
+    def test_snapshot_refresh(self):
+        """Tests that an expired or invalidated snapshot is read again from the source"""
+        with SnapshotConnector(CsvConnector, self.make_config()):
+            pass
+        with open(self.csv_path, 'a') as fh:
+            fh.write("PUBLIC,CUSTOMERS,4,EMAIL,TEXT,,,YES\n")
+
+        config = self.make_config()
+        with SnapshotConnector(CsvConnector, config) as connector:
+            self.assertEqual(3, len(connector.get_columns(('PUBLIC', 'CUSTOMERS'), config)))
+        config = self.make_config(**{ConfigProperties.CACHE_REFRESH: True})
+        with SnapshotConnector(CsvConnector, config) as connector:
+            self.assertEqual(4, len(connector.get_columns(('PUBLIC', 'CUSTOMERS'), config)))
+
+    def test_offline_without_snapshot(self):
+        """Tests that offline mode fails if there is no snapshot"""
+        CatalogSnapshot(self.cache_path).invalidate()
+        with self.assertRaises(SnapshotNotFoundException):
+            with SnapshotConnector(CsvConnector, self.make_config(**{ConfigProperties.OFFLINE: True})):
+                pass
+
+
+if __name__ == '__main__':
+    pytest.main()
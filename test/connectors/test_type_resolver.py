@@ -0,0 +1,50 @@
+import unittest
+
+import pytest
+
+from avro_tools.avro_type import AvroDecimal, AvroInt, AvroString, AvroTimestampMillis
+from avro_tools.type_registry import AvroTypeRegistry
+from connectors.snowflake.type_mappers import JDBC_DATATYPE_MAP as SNOWFLAKE_JDBC_MAPPER
+from connectors.sql_server.data_types import SqlServerTypes
+from connectors.sql_server.type_mappers import DEBEZIUM_DATATYPE_MAP
+from connectors.type_resolver import TypeResolver
+
+
+class TestTypeResolver(unittest.TestCase):
+
+    def test_normalise(self):
+        """Tests that Enum members and raw type names are normalised to the same name"""
+        for data_type in (SqlServerTypes.INT, 'int', 'INT', ' int ', 'int identity', 'int() identity'):
+            self.assertEqual('int', TypeResolver.normalise(data_type))
+        self.assertEqual('timestamp_tz', TypeResolver.normalise('TIMESTAMP_TZ'))
+
+    def test_resolve(self):
+        """Tests resolution of the type names of Enum and string keyed mappers"""
+        sql_server = TypeResolver(DEBEZIUM_DATATYPE_MAP, AvroTypeRegistry())
+        self.assertIsInstance(sql_server.resolve('int'), AvroInt)
+        self.assertIsInstance(sql_server.resolve('nvarchar'), AvroString)
+        self.assertEqual(AvroDecimal(18, 2).obj(), sql_server.resolve('decimal', 18, 2).obj())
+        snowflake = TypeResolver(SNOWFLAKE_JDBC_MAPPER, AvroTypeRegistry())
+        self.assertIsInstance(snowflake.resolve('TIMESTAMP_TZ'), AvroTimestampMillis)
+        with self.assertRaises(KeyError):
+            snowflake.resolve('GEOGRAPHY')
+
+    def test_types_are_interned(self):
+        """Tests that identical types are shared"""
+        registry = AvroTypeRegistry()
+        resolver = TypeResolver(DEBEZIUM_DATATYPE_MAP, registry)
+        self.assertIs(resolver.resolve('int'), resolver.resolve(SqlServerTypes.TINYINT))
+        self.assertIs(resolver.resolve('decimal', 18, 2), resolver.resolve('numeric', 18, 2))
+        self.assertIsNot(resolver.resolve('decimal', 18, 2), resolver.resolve('decimal', 18, 4))
+        self.assertIs(resolver.resolve('money', 19, 4), resolver.resolve('smallmoney', 19, 4))
+
+    def test_obj_is_copied(self):
+        """Tests that modifying the dictionary of an interned type does not change the type"""
+        resolver = TypeResolver(DEBEZIUM_DATATYPE_MAP, AvroTypeRegistry())
+        avro_type = resolver.resolve('decimal', 18, 2)
+        avro_type.obj()['precision'] = 10
+        self.assertEqual(AvroDecimal(18, 2).obj(), resolver.resolve('numeric', 18, 2).obj())
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from avro_tools.avro_type import AvroBytes, AvroDecimal, AvroInt, AvroLong, AvroString
+from avro_tools.type_registry import AvroTypeRegistry
+from configuration import ConfigProperties, Configuration
+from connectors.csv.column import Column
+from connectors.csv.connector import CsvConnector
+from connectors.snowflake.type_mappers import JDBC_DATATYPE_MAP as SNOWFLAKE_JDBC_MAPPER
+from connectors.type_resolver import TypeResolver
+from connectors.type_rules import InvalidTypeRuleException, TypeRules
+from test import RESOURCES
+
+
+def column(data_type, precision=None, scale=None, length=None, nullable=True, name='COL'):
+    return Column.from_values('PUBLIC', 'T', 1, name, data_type, precision, scale, nullable, length)
+
+
+class TestTypeRules(unittest.TestCase):
+    RULES = os.path.join(RESOURCES, 'rules', 'snowflake_rules.json')
+
+    def test_match(self):
+        """Tests that the first rule matching the precision, scale and length of a column applies"""
+        rules = TypeRules.load(self.RULES)
+        self.assertIsInstance(rules.match(column('NUMBER', 9, 0)), AvroInt)
+        self.assertIsInstance(rules.match(column('number', 18, 0)), AvroLong)
+        self.assertIsNone(rules.match(column('NUMBER', 38, 0)))
+        self.assertIsNone(rules.match(column('NUMBER', 10, 2)))
+        self.assertIsInstance(rules.match(column('TEXT', length=-1)), AvroBytes)
+        self.assertIsNone(rules.match(column('TEXT', length=255)))
+        self.assertIsNone(rules.match(column('TEXT')))
+
+    def test_nullable(self):
+        """Tests rules conditioned on the nullability of the column"""
+        rules = TypeRules([{"type": "BOOLEAN", "when": {"nullable": False}, "avro": "int"}])
+        self.assertIsInstance(rules.match(column('BOOLEAN', nullable=False)), AvroInt)
+        self.assertIsNone(rules.match(column('BOOLEAN', nullable=True)))
+
+    def test_decimal(self):
+        """Tests that decimal targets take the precision and scale of the column unless given by the rule"""
+        rules = TypeRules([
+            {"type": "NUMBER", "avro": "decimal"},
+            {"type": "MONEY", "avro": "decimal", "precision": 19, "scale": 4}
+        ], registry=AvroTypeRegistry())
+        self.assertEqual(AvroDecimal(38, 0).obj(), rules.match(column('NUMBER', 38, 0)).obj())
+        self.assertEqual(AvroDecimal(19, 4).obj(), rules.match(column('MONEY')).obj())
+        with self.assertRaises(ValueError):
+            rules.match(column('NUMBER'))
+
+    def test_overrides(self):
+        """Tests that per-column overrides apply regardless of the data type and case"""
+        rules = TypeRules.load(self.RULES)
+        amount = Column.from_values('PUBLIC', 'ORDERS', 2, 'AMOUNT', 'NUMBER', 18, 2, True)
+        self.assertEqual(AvroDecimal(12, 2).obj(), rules.match(amount).obj())
+        customer_id = Column.from_values('PUBLIC', 'CUSTOMERS', 1, 'ID', 'NUMBER', 38, 0, False)
+        self.assertIsInstance(rules.match(customer_id), AvroString)
+
+    def test_invalid(self):
+        """Tests that invalid rules are reported when compiled"""
+        invalid = (
+            {"avro": "int"},
+            {"type": "INT", "avro": "integer"},
+            {"type": "INT", "when": {"size": 1}, "avro": "int"},
+            {"type": "INT", "when": {"precision": "9"}, "avro": "int"}
+        )
+        for rule in invalid:
+            with self.assertRaises(InvalidTypeRuleException):
+                TypeRules([rule])
+        with self.assertRaises(InvalidTypeRuleException):
+            TypeRules([], {"orders.amount": "string"})
+
+    def test_resolver(self):
+        """Tests that the rules take precedence over the type mapper"""
+        resolver = TypeResolver(SNOWFLAKE_JDBC_MAPPER, rules=TypeRules.load(self.RULES))
+        self.assertIsInstance(resolver.resolve_column(column('NUMBER', 9, 0)), AvroInt)
+        self.assertEqual(AvroDecimal(38, 0).obj(), resolver.resolve_column(column('NUMBER', 38, 0)).obj())
+
+    def test_reload(self):
+        """Tests that a modified rule file is compiled again, with the resolvers using it"""
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'rules.json')
+            with open(path, 'w') as fh:
+                json.dump({"rules": [{"type": "NUMBER", "avro": "int"}]}, fh)
+            os.utime(path, ns=(0, 0))
+            rules = TypeRules.load(path)
+            resolver = CsvConnector.get_resolver('snowflake', 'jdbc', path)
+            self.assertIs(rules, TypeRules.load(path))
+            self.assertIs(resolver, CsvConnector.get_resolver('snowflake', 'jdbc', path))
+
+            with open(path, 'w') as fh:
+                json.dump({"rules": [{"type": "NUMBER", "avro": "long"}]}, fh)
+            os.utime(path, ns=(1, 1))
+            self.assertIsInstance(TypeRules.load(path).match(column('NUMBER', 9, 0)), AvroLong)
+            resolver = CsvConnector.get_resolver('snowflake', 'jdbc', path)
+            self.assertIsInstance(resolver.resolve_column(column('NUMBER', 9, 0)), AvroLong)
+
+    def test_connector(self):
+        """Tests the type rules of the CSV connector"""
+        config = Configuration({
+            ConfigProperties.CSV_PATH: os.path.join(RESOURCES, 'csv', 'catalog_snowflake.csv'),
+            ConfigProperties.DB_SYSTEM: 'snowflake',
+            ConfigProperties.MAPPER: 'jdbc',
+            ConfigProperties.DB_SCHEMA: 'PUBLIC',
+            ConfigProperties.TYPE_RULES: self.RULES
+        })
+        with CsvConnector(config) as connector:
+            fields = connector.get_columns(('PUBLIC', 'ORDERS'), config)
+        self.assertEqual(['null', AvroDecimal(12, 2).obj()], fields[1].to_dict()['type'])
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import pytest
+
+from configuration import Configuration, ConfigProperties
+from connectors.csv.connector import CsvConnector
+from connectors.watcher import CatalogWatcher
+from test import RESOURCES
+
+
+class TestCatalogWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.folder, 'catalog.csv')
+        shutil.copy(os.path.join(RESOURCES, 'csv', 'catalog_snowflake.csv'), self.csv_path)
+        self.config = Configuration(props={
+            ConfigProperties.CONNECTOR: 'csv',
+            ConfigProperties.MAPPER: 'jdbc',
+            ConfigProperties.DB_SYSTEM: 'snowflake',
+            ConfigProperties.DB_SCHEMA: 'PUBLIC',
+            ConfigProperties.CSV_PATH: self.csv_path
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def rewrite_csv(self, old: str, new: str) -> None:
+        with open(self.csv_path, 'r') as fh:
+            content = fh.read()
+        with open(self.csv_path, 'w') as fh:
+            fh.write(content.replace(old, new))
+
+    def test_changes(self):
+        """Tests that changed and dropped tables are reported once the CSV file changes"""
+        with CsvConnector(self.config) as connector:
+            watcher = CatalogWatcher(connector, self.config, interval=0.01, debounce=0.01)
+            changes = watcher.changes()
+
+            self.rewrite_csv("PUBLIC,ORDERS,1,ID,NUMBER,38,0,NO", "PUBLIC,ORDERS,1,ID,TEXT,,,NO")
+            self.assertEqual(([('PUBLIC', 'ORDERS')], []), next(changes))
+            # The connector returns the current definition of the changed table.
+            self.assertEqual('string', connector.get_columns(('PUBLIC', 'ORDERS'), self.config)[0].to_dict()['type'])
+
+            self.rewrite_csv("PUBLIC,CUSTOMERS", "PUBLIC,CLIENTS")
+            self.assertEqual(([('PUBLIC', 'CLIENTS')], [('PUBLIC', 'CUSTOMERS')]), next(changes))
+
+            threading.Timer(0.05, watcher.stop).start()
+            self.assertIsNone(next(changes, None))
+
+    def test_unchanged_file(self):
+        """Tests that touching the CSV file without changing any table reports nothing"""
+        with CsvConnector(self.config) as connector:
+            watcher = CatalogWatcher(connector, self.config, interval=0.01, debounce=0.01)
+            os.utime(self.csv_path, ns=(0, 0))
+            threading.Timer(0.2, watcher.stop).start()
+            self.assertEqual([], list(watcher.changes()))
+
+
+if __name__ == '__main__':
+    pytest.main()
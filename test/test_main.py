@@ -0,0 +1,293 @@
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import pytest
+
+import main
+from configuration import Configuration, ConfigProperties
+from test import RESOURCES
+
+
+class TestMain(unittest.TestCase):
+
+    @staticmethod
+    def make_config(output_path: str, **props) -> Configuration:
+        return Configuration(props={
+            ConfigProperties.CONNECTOR: 'csv',
+            ConfigProperties.MAPPER: 'jdbc',
+            ConfigProperties.DB_SYSTEM: 'snowflake',
+            ConfigProperties.DB_SCHEMA: 'PUBLIC',
+            ConfigProperties.CSV_PATH: os.path.join(RESOURCES, 'csv', 'catalog_snowflake.csv'),
+            ConfigProperties.NAMESPACE: 'com.test',
+            ConfigProperties.OUTPUT_DIR: output_path,
+            **props
+        })
+
+    @staticmethod
+    def read_output(output_path: str) -> dict:
+        outputs = {}
+        for file_name in sorted(os.listdir(output_path)):
+            if file_name.startswith('.'):
+                continue
+            with open(os.path.join(output_path, file_name)) as fh:
+                outputs[file_name] = fh.read()
+        return outputs
+
+    def test_run(self):
+        """Tests generation of the schemas of every table in the DB schema"""
+        with tempfile.TemporaryDirectory() as output_path:
+            failed = main.run(self.make_config(output_path, **{ConfigProperties.WORKERS: 2}))
+            self.assertEqual([], failed)
+            self.assertEqual(['com_test_CUSTOMERS.avsc', 'com_test_ORDERS.avsc'], list(self.read_output(output_path)))
+
+    def test_run_reports_failed_tables(self):
+        """Tests that a failing table is reported without aborting the run"""
+        with tempfile.TemporaryDirectory() as output_path:
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                failed = main.run(self.make_config(output_path, **{ConfigProperties.TABLES: 'MISSING,ORDERS'}))
+            self.assertEqual([('PUBLIC', 'MISSING')], failed)
+            self.assertIn('FAIL', stdout.getvalue())
+            self.assertEqual(['com_test_ORDERS.avsc'], list(self.read_output(output_path)))
+
+    def test_run_validate(self):
+        """Tests that invalid schemas are reported as failures and not written"""
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as output_path:
+            csv_path = os.path.join(tmp, 'catalog.csv')
+            with open(csv_path, 'w') as fh:
+                fh.write("TABLE_SCHEMA,TABLE_NAME,ORDINAL_POSITION,COLUMN_NAME,DATA_TYPE,NUMERIC_PRECISION,"
+                         + "NUMERIC_SCALE,IS_NULLABLE\n"
+                         + "PUBLIC,ORDERS,1,ID,NUMBER,38,0,NO\n"
+                         + "PUBLIC,BAD-TABLE,1,ID,NUMBER,38,0,NO\n")
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                failed = main.run(self.make_config(output_path, **{ConfigProperties.CSV_PATH: csv_path,
+                                                                   ConfigProperties.VALIDATE: True}))
+            self.assertEqual([('PUBLIC', 'BAD-TABLE')], failed)
+            self.assertIn('FAIL: schema of table PUBLIC.BAD-TABLE is not valid.', stdout.getvalue())
+            self.assertEqual(['com_test_ORDERS.avsc'], list(self.read_output(output_path)))
+
+    def test_zero_durations(self):
+        """Tests that durations of 0 are kept, and that missing durations take their default"""
+        zero = self.make_config('.', **{ConfigProperties.CACHE_TTL: 0, ConfigProperties.WATCH_INTERVAL: 0,
+                                        ConfigProperties.WATCH_DEBOUNCE: 0, ConfigProperties.SERVE_CACHE_TTL: 0})
+        self.assertEqual((0, 0, 0, 0), (zero.connector_cache_ttl, zero.watch_interval, zero.watch_debounce,
+                                        zero.serve_cache_ttl))
+        default = self.make_config('.')
+        self.assertEqual((3600, 5, 2, 300), (default.connector_cache_ttl, default.watch_interval,
+                                             default.watch_debounce, default.serve_cache_ttl))
+
+    def test_run_incremental(self):
+        """Tests that unchanged schemas are not rewritten and that dropped tables are reported"""
+        with tempfile.TemporaryDirectory() as output_path:
+            config = self.make_config(output_path, **{ConfigProperties.INCREMENTAL: True})
+            with redirect_stdout(io.StringIO()):
+                main.run(config)
+            file_path = os.path.join(output_path, 'com_test_ORDERS.avsc')
+            os.utime(file_path, ns=(0, 0))
+
+            catalog_path = os.path.join(output_path, 'catalog.csv')
+            with open(config.connector_csv_path) as src, open(catalog_path, 'w') as dst:
+                dst.writelines(line for line in src if 'CUSTOMERS' not in line)
+            config.connector_csv_path = catalog_path
+
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                main.run(config)
+            self.assertEqual(0, os.stat(file_path).st_mtime_ns)
+            self.assertIn("DROPPED: table PUBLIC.CUSTOMERS", stdout.getvalue())
+            self.assertIn("0 schemas written, 1 unchanged, 1 dropped", stdout.getvalue())
+
+    def test_run_incremental_settings(self):
+        """Tests that schemas are generated again when the generation settings change"""
+        from connectors.csv.connector import CsvConnector
+
+        class DatedConnector(CsvConnector):
+            def get_modify_dates(self, config):
+                return {('PUBLIC', 'ORDERS'): '2024-01-01', ('PUBLIC', 'CUSTOMERS'): '2024-01-01'}
+
+        with tempfile.TemporaryDirectory() as output_path:
+            config = self.make_config(output_path, **{ConfigProperties.INCREMENTAL: True,
+                                                      ConfigProperties.NAMESPACE: 'n1'})
+            with DatedConnector(config) as connector:
+                with redirect_stdout(io.StringIO()):
+                    main.run(config, connector=connector)
+                stdout = io.StringIO()
+                with redirect_stdout(stdout):
+                    main.run(config, connector=connector)
+                self.assertIn("0 schemas written, 2 unchanged", stdout.getvalue())
+
+                config.avro_namespace = 'n2'
+                stdout = io.StringIO()
+                with redirect_stdout(stdout):
+                    main.run(config, connector=connector)
+            self.assertIn("2 schemas written, 0 unchanged", stdout.getvalue())
+            self.assertIn('n2_ORDERS.avsc', self.read_output(output_path))
+
+    def test_run_skips_unchanged_files(self):
+        """Tests that files are only rewritten when their schema changes"""
+        with tempfile.TemporaryDirectory() as output_path:
+            config = self.make_config(output_path)
+            with redirect_stdout(io.StringIO()):
+                main.run(config)
+            orders_path = os.path.join(output_path, 'com_test_ORDERS.avsc')
+            customers_path = os.path.join(output_path, 'com_test_CUSTOMERS.avsc')
+            os.utime(orders_path, ns=(0, 0))
+            # A file modified outside the generator is rewritten.
+            with open(customers_path, 'w') as fh:
+                fh.write('{}')
+
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                main.run(config)
+            self.assertIn("1 schemas written, 1 unchanged, 0 stale, 0 failed", stdout.getvalue())
+            self.assertEqual(0, os.stat(orders_path).st_mtime_ns)
+
+    def test_run_prune(self):
+        """Tests that the files of tables that no longer exist are reported and pruned"""
+        with tempfile.TemporaryDirectory() as output_path:
+            config = self.make_config(output_path)
+            with redirect_stdout(io.StringIO()):
+                main.run(config)
+
+            catalog_path = os.path.join(output_path, 'catalog.csv')
+            with open(config.connector_csv_path) as src, open(catalog_path, 'w') as dst:
+                dst.writelines(line for line in src if 'CUSTOMERS' not in line)
+            config.connector_csv_path = catalog_path
+
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                main.run(config)
+            self.assertIn("STALE: schema file com_test_CUSTOMERS.avsc", stdout.getvalue())
+            self.assertIn('com_test_CUSTOMERS.avsc', self.read_output(output_path))
+
+            config.avro_prune = True
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                main.run(config)
+            self.assertIn("0 schemas written, 1 unchanged, 1 removed, 0 failed", stdout.getvalue())
+            self.assertNotIn('com_test_CUSTOMERS.avsc', self.read_output(output_path))
+
+    def test_run_prune_filtered(self):
+        """Tests that the files of tables left out by discovery filters are not pruned"""
+        with tempfile.TemporaryDirectory() as output_path:
+            config = self.make_config(output_path, **{ConfigProperties.PRUNE: True})
+            with redirect_stdout(io.StringIO()):
+                main.run(config)
+
+            # Discovery filtered down to ORDERS
+            catalog_path = os.path.join(output_path, 'catalog.csv')
+            with open(config.connector_csv_path) as src, open(catalog_path, 'w') as dst:
+                dst.writelines(line for line in src if 'CUSTOMERS' not in line)
+            config.connector_csv_path = catalog_path
+            config.connector_include = 'ORDERS'
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                main.run(config)
+            self.assertIn("0 schemas written, 1 unchanged, 0 removed, 0 failed", stdout.getvalue())
+            self.assertIn('com_test_CUSTOMERS.avsc', self.read_output(output_path))
+
+    def test_run_prune_no_tables(self):
+        """Tests that nothing is pruned when discovery finds no tables"""
+        with tempfile.TemporaryDirectory() as output_path:
+            config = self.make_config(output_path, **{ConfigProperties.PRUNE: True})
+            with redirect_stdout(io.StringIO()):
+                main.run(config)
+
+            config.db_schema = None
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                main.run(config)
+            self.assertIn("No tables found", stdout.getvalue())
+            self.assertIn("0 schemas written, 0 unchanged, 0 removed, 0 failed", stdout.getvalue())
+            self.assertEqual(['com_test_CUSTOMERS.avsc', 'com_test_ORDERS.avsc'], list(self.read_output(output_path)))
+
+    def test_run_bundle(self):
+        """Tests that all schemas are written to a single bundle with the jsonl output format"""
+        with tempfile.TemporaryDirectory() as output_path:
+            with redirect_stdout(io.StringIO()):
+                main.run(self.make_config(output_path, **{ConfigProperties.OUTPUT_FORMAT: 'jsonl'}))
+            outputs = self.read_output(output_path)
+            self.assertEqual(['schemas.jsonl', 'schemas.jsonl.index.json'], list(outputs))
+            self.assertEqual(['CUSTOMERS', 'ORDERS'],
+                             sorted(json.loads(line)['name'] for line in outputs['schemas.jsonl'].splitlines()))
+
+    def test_run_compat_report(self):
+        """Tests the compatibility report of the regenerated schemas against the previous output"""
+        with tempfile.TemporaryDirectory() as output_path:
+            config = self.make_config(output_path)
+            with redirect_stdout(io.StringIO()):
+                main.run(config)
+
+            catalog_path = os.path.join(output_path, 'catalog.csv')
+            with open(config.connector_csv_path) as src, open(catalog_path, 'w') as dst:
+                dst.writelines(line.replace('ORDERS,1,ID,NUMBER,38,0', 'ORDERS,1,ID,BOOLEAN,,') for line in src)
+            config.connector_csv_path = catalog_path
+            config.avro_compat_report = os.path.join(output_path, 'report.json')
+            with redirect_stdout(io.StringIO()):
+                main.run(config)
+
+            with open(config.avro_compat_report) as fh:
+                report = json.load(fh)
+            self.assertEqual(1, report['summary']['unchanged'])
+            self.assertEqual(['com_test_ORDERS.avsc'], [result['file'] for result in report['schemas']])
+            self.assertEqual('ID', report['schemas'][0]['changed_fields'][0]['name'])
+            self.assertFalse(report['schemas'][0]['backward'])
+
+    def test_watch(self):
+        """Tests that watch mode generates every table, then only the tables that changed, with the same connector"""
+        with tempfile.TemporaryDirectory() as output_path:
+            catalog_path = os.path.join(output_path, 'catalog.csv')
+            config = self.make_config(output_path, **{ConfigProperties.PRUNE: True})
+            shutil.copy(config.connector_csv_path, catalog_path)
+            config.connector_csv_path = catalog_path
+
+            class Watcher:
+                def __init__(self, connector, *args):
+                    self.connector = connector
+
+                def changes(self):
+                    with open(catalog_path) as fh:
+                        content = fh.read()
+                    with open(catalog_path, 'w') as fh:
+                        fh.write(content.replace('PUBLIC,ORDERS,1,ID,NUMBER,38,0,NO', 'PUBLIC,ORDERS,1,ID,TEXT,,,NO'))
+                    self.connector.refresh(config)
+                    yield [('PUBLIC', 'ORDERS'), ('STAGING', 'ORDERS_RAW')], []
+
+            stdout = io.StringIO()
+            with patch('connectors.watcher.CatalogWatcher', Watcher), redirect_stdout(stdout):
+                main.watch(config)
+            self.assertIn("CHANGED: PUBLIC.ORDERS\n", stdout.getvalue())
+            # The partial run does not remove the files of the other tables.
+            self.assertIn("1 schemas written, 0 unchanged, 0 removed, 0 failed", stdout.getvalue())
+            outputs = self.read_output(output_path)
+            self.assertEqual(['catalog.csv', 'com_test_CUSTOMERS.avsc', 'com_test_ORDERS.avsc'], list(outputs))
+            self.assertIn('"string"', outputs['com_test_ORDERS.avsc'])
+
+    def test_run_async(self):
+        """Tests that the asynchronous pipeline writes the same schemas as the synchronous one"""
+        with tempfile.TemporaryDirectory() as sync_path, tempfile.TemporaryDirectory() as async_path:
+            main.run(self.make_config(sync_path))
+            failed = asyncio.run(main.run_async(self.make_config(async_path, **{ConfigProperties.WORKERS: 3})))
+            self.assertEqual([], failed)
+            self.assertEqual(self.read_output(sync_path), self.read_output(async_path))
+
+    def test_run_async_unsupported(self):
+        """Tests that the options only supported by the synchronous run are rejected"""
+        with tempfile.TemporaryDirectory() as output_path:
+            config = self.make_config(output_path, **{ConfigProperties.INCREMENTAL: True, ConfigProperties.PRUNE: True})
+            with self.assertRaises(ValueError) as cm:
+                asyncio.run(main.run_async(config))
+            self.assertIn("--incremental, --prune", str(cm.exception))
+            self.assertEqual({}, self.read_output(output_path))
+
+
+if __name__ == '__main__':
+    pytest.main()